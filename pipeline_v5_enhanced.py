@@ -103,9 +103,13 @@ class PipelineV5Enhanced:
     - More data-dense presentations
     """
     
-    def __init__(self, verbose: bool = True):
+    def __init__(self, verbose: bool = True, image_deadline: float = 20.0,
+                 packs_only: bool = False):
         self.verbose = verbose
         self.results: List[PipelineResult] = []
+        self.image_deadline = image_deadline  # Max seconds the PPT stage waits for image prefetch
+        self.packs_only = packs_only  # Never fetch images; no pack means stored/placeholder images
+        self._image_tasks = set()  # Strong refs to in-flight prefetch tasks
         
         # Initialize generators
         self.output_dir = OUTPUT_DIR / "v5_enhanced"
@@ -195,6 +199,45 @@ class PipelineV5Enhanced:
         
         return info
     
+    def _start_image_prefetch(self, sector: str) -> Optional[asyncio.Task]:
+        """Launch sector image acquisition in the background (it only needs the sector)"""
+        if not self.image_fetcher or self.packs_only or self.image_fetcher.packs.has(sector):
+            return None
+        task = asyncio.create_task(self.image_fetcher.fetch_all_for_company_async(sector))
+        self._image_tasks.add(task)
+        task.add_done_callback(self._image_tasks.discard)
+        return task
+    
+    async def _collect_slide_images(self, task: Optional[asyncio.Task],
+                                    sector: str) -> Dict[str, List[Path]]:
+        """
+        Await the image prefetch for at most image_deadline seconds. If it is not
+        done, use stored or placeholder images; the prefetch keeps running and
+        fills the store for later companies in the sector.
+        """
+        images_dict = None
+        wait_start = time.time()
+        try:
+            images_dict = await asyncio.wait_for(asyncio.shield(task), timeout=self.image_deadline)
+        except asyncio.TimeoutError:
+            self.log(f"Image prefetch not done after {self.image_deadline:g}s - using stored/placeholder images", "WARN")
+        except Exception as e:
+            self.log(f"Image fetching failed: {e}", "WARN")
+        
+        if images_dict is None:
+            try:
+                images_dict = await asyncio.to_thread(self.image_fetcher.fallback_images_for_company, sector)
+            except Exception as e:
+                self.log(f"Fallback images failed: {e}", "WARN")
+                return {}
+        else:
+            self.log(f"Image prefetch ready (waited {time.time() - wait_start:.1f}s)", "SUCCESS")
+        
+        return {
+            slide_key: [img.path for img in fetched_images if img and img.path]
+            for slide_key, fetched_images in images_dict.items()
+        }
+    
     async def _enrich_with_gpu(self, raw_content: str, sector: str) -> ExtractedMetrics:
         """GPU-accelerated data enrichment"""
         try:
@@ -465,6 +508,7 @@ class PipelineV5Enhanced:
         print(f"📦 Processing: {company_name.upper()}")
         print(f"{'='*60}")
         
+        image_task = None
         try:
             # Step 1: Load Company Data
             self.log("Loading company data...", "STEP")
@@ -489,6 +533,12 @@ class PipelineV5Enhanced:
             
             self.log(f"Sector: {sector} / {sub_sector} (confidence: {confidence:.0%})", "SUCCESS")
             
+            # Step 2.5: Start sector image acquisition (unless a pack covers the sector);
+            # it overlaps with steps 3-6
+            image_task = self._start_image_prefetch(sector)
+            if image_task:
+                self.log("Prefetching sector images in the background...", "GPU")
+            
             # Step 3: Extract Basic Info
             self.log("Extracting basic information...", "STEP")
             basic_info = self._extract_basic_info(raw_content, company_data)
@@ -596,26 +646,28 @@ class PipelineV5Enhanced:
                 company_folder
             )
             
-            # Step 6.5: Fetch Sector Images (FREE - no API keys!)
+            # Step 6.5: Collect Sector Images (image pack, or prefetched since step 2.5)
             slide_images = {}
             if self.image_fetcher:
-                self.log("Fetching sector images (FREE web scraping)...", "GPU")
-                try:
-                    images_dict = self.image_fetcher.fetch_all_for_company(sector)
-                    
-                    # Convert to path list for each slide
-                    for slide_key, fetched_images in images_dict.items():
-                        slide_images[slide_key] = [img.path for img in fetched_images if img and img.path]
-                    
-                    total_images = sum(len(imgs) for imgs in slide_images.values())
-                    self.log(f"Fetched {total_images} sector-appropriate images", "SUCCESS")
-                    
-                    # Set images in generator
-                    self.ppt_generator.set_slide_images(slide_images)
-                    
-                except Exception as e:
-                    self.log(f"Image fetching failed: {e}", "WARN")
-                    slide_images = {}
+                slide_images = self.image_fetcher.images_from_pack(sector, teaser_data.codename)
+                if slide_images is not None:
+                    self.log(f"Using sector image pack (selection for {teaser_data.codename})", "SUCCESS")
+                elif image_task:
+                    self.log("Collecting prefetched sector images...", "STEP")
+                    slide_images = await self._collect_slide_images(image_task, sector)
+                else:
+                    self.log("No image pack for sector - using stored/placeholder images", "WARN")
+                    fallback = await asyncio.to_thread(self.image_fetcher.fallback_images_for_company, sector)
+                    slide_images = {
+                        slide_key: [img.path for img in imgs if img and img.path]
+                        for slide_key, imgs in fallback.items()
+                    }
+                
+                total_images = sum(len(imgs) for imgs in slide_images.values())
+                self.log(f"Using {total_images} sector-appropriate images", "SUCCESS")
+                
+                # Set images in generator
+                self.ppt_generator.set_slide_images(slide_images)
             else:
                 self.log("Image fetcher not available - skipping images", "WARN")
             
@@ -687,6 +739,8 @@ class PipelineV5Enhanced:
             return result
             
         except Exception as e:
+            if image_task:
+                image_task.cancel()  # No deck to put them in
             processing_time = time.time() - start_time
             error_msg = str(e)
             print(f"\n❌ ERROR: {error_msg}")
@@ -773,9 +827,14 @@ async def main():
     parser = argparse.ArgumentParser(description="Pipeline V5 - Enhanced PPT Generation")
     parser.add_argument("--company", type=str, help="Process specific company folder")
     parser.add_argument("--quiet", action="store_true", help="Minimal output")
+    parser.add_argument("--image-deadline", type=float, default=20.0,
+                        help="Seconds the PPT stage waits for the image prefetch")
+    parser.add_argument("--packs-only", action="store_true",
+                        help="Take images from sector image packs only (no image network access)")
     args = parser.parse_args()
     
-    pipeline = PipelineV5Enhanced(verbose=not args.quiet)
+    pipeline = PipelineV5Enhanced(verbose=not args.quiet, image_deadline=args.image_deadline,
+                                  packs_only=args.packs_only)
     
     if args.company:
         # Find matching folder
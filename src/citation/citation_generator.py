@@ -112,6 +112,35 @@ class CitationTracker:
             notes="Scraped from public website"
         )
     
+    def cite_web_facts(self, text: str, url: str, slide: str,
+                       kinds: List[str] = None, limit: int = 10) -> int:
+        """
+        Cite each statistic found in a scraped page, pointing at its
+        character offsets in the page text.
+        
+        Returns:
+            Number of citations added
+        """
+        from src.web_scraping.fact_extractor import extract_facts, STATISTIC_KINDS
+        
+        seen = set()
+        for fact in extract_facts(text, kinds or STATISTIC_KINDS):
+            if fact.text in seen:
+                continue
+            seen.add(fact.text)
+            self.collection.add(
+                claim=fact.text,
+                source_type='public_web',
+                source_reference=url,
+                section=slide,
+                line_or_sheet=f"Characters {fact.start}-{fact.end}",
+                notes=f"Extracted {fact.kind.replace('_', ' ')} from public web page"
+            )
+            if len(seen) >= limit:
+                break
+        
+        return len(seen)
+    
     def cite_sector_template(self, claim: str, slide: str) -> None:
         """Add citation for sector-specific template content"""
         self.collection.add(
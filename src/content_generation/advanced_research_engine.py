@@ -16,12 +16,21 @@ import re
 import json
 import asyncio
 import aiohttp
+import hashlib
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from urllib.parse import quote_plus, urlparse
-from bs4 import BeautifulSoup
 import time
 
+from src.web_scraping.fact_extractor import get_fact_extractor, STATISTIC_KINDS
+from src.web_scraping.content_dedup import NearDuplicateIndex
+from src.web_scraping.research_corpus import CorpusHit, get_research_corpus
+from src.web_scraping.http_replay import wrap_aiohttp_session
+from src.web_scraping.rate_limiter import HostRateLimiter
+from src.web_scraping.site_metadata import fetch_text, get_site_metadata_cache
+from src.web_scraping.text_extractor import extract_main_text
+from config.settings import OUTPUT_DIR
+
 # Import new ddgs package for DuckDuckGo search
 try:
     from ddgs import DDGS
@@ -106,6 +115,30 @@ class AdvancedResearchEngine:
         # Rate limiting
         self._last_request_time = 0
         self._min_request_interval = 0.5  # seconds
+        
+        # robots.txt rules and crawl-delays, shared with the other scrapers
+        self.site_cache = get_site_metadata_cache()
+        self.host_limiter = HostRateLimiter(base_interval=0.0, min_interval=0.0)
+        
+        # Near-duplicate index of fetched pages (persists across runs)
+        self.dedup_index = NearDuplicateIndex()
+        
+        # Local full-text corpus of every page read (queried before the web)
+        self.corpus = get_research_corpus()
+        self.corpus_max_age_days = 30
+        self.min_local_hits = 2  # Local hits needed to skip a web search
+        self.min_local_score = 1.0  # BM25 score a local hit needs to count
+        
+        # LLM synthesis: 'map_reduce' (per-source extraction + merge) or 'single'
+        self.synthesis_mode = "map_reduce"
+        self.llm_concurrency = 3
+        self._llm_semaphore: Optional[asyncio.Semaphore] = None
+        self.max_map_sources = 8
+        self.map_chunk_chars = 4000
+        self.max_chunks_per_source = 3
+        self.extraction_cache_path = OUTPUT_DIR / "research_cache" / "source_extractions.json"
+        self._extraction_cache: Optional[Dict[str, Dict]] = None
+        self._extraction_cache_dirty = False
     
     @property
     def janus_engine(self):
@@ -120,15 +153,17 @@ class AdvancedResearchEngine:
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30, connect=10)
             connector = aiohttp.TCPConnector(limit=10, limit_per_host=3)
-            self.session = aiohttp.ClientSession(
+            self.session = wrap_aiohttp_session(aiohttp.ClientSession(
                 timeout=timeout, 
                 connector=connector,
                 headers=self.headers
-            )
+            ))
         return self.session
     
     async def close(self):
         """Close the HTTP session"""
+        self.dedup_index.save()
+        self._save_extraction_cache()
         if self.session and not self.session.closed:
             await self.session.close()
     
@@ -175,18 +210,42 @@ class AdvancedResearchEngine:
         
         return results
     
-    async def fetch_webpage_content(self, url: str, max_chars: int = 15000) -> Optional[WebSource]:
+    def _source_from_hit(self, hit: CorpusHit) -> WebSource:
+        """Build a WebSource from a page stored in the local corpus"""
+        return WebSource(
+            url=hit.url,
+            title=hit.title,
+            domain=urlparse(hit.url).netloc,
+            content=hit.content,
+            snippet=hit.content[:300] + "..." if len(hit.content) > 300 else hit.content,
+            statistics=self._extract_statistics(hit.content),
+            relevance_score=hit.score
+        )
+    
+    async def fetch_webpage_content(self, url: str, max_chars: int = 15000,
+                                    sector: str = "") -> Optional[WebSource]:
         """
         Fetch and extract readable content from a webpage.
         This is key - we actually READ the pages like Gemini does.
+        Pages already in the local corpus are served from it.
         """
+        stored = self.corpus.get(url, max_age_days=self.corpus_max_age_days)
+        if stored:
+            return self._source_from_hit(stored)
+        
         await self._rate_limit()
         start_time = time.time()
         
         try:
             session = await self._get_session()
             
-            async with session.get(url, allow_redirects=True) as resp:
+            site = await self.site_cache.get(url, lambda u, t: fetch_text(session, u, t))
+            if not site.can_fetch(url, self.headers['User-Agent']):
+                return None
+            self.host_limiter.set_crawl_delay(url, site.crawl_delay(self.headers['User-Agent']))
+            
+            async with self.host_limiter.slot(url), \
+                    session.get(url, allow_redirects=True) as resp:
                 if resp.status != 200:
                     return None
                 
@@ -195,54 +254,31 @@ class AdvancedResearchEngine:
                     return None
                 
                 html = await resp.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                # Remove script, style, nav, footer, header elements
-                for tag in soup(['script', 'style', 'nav', 'footer', 'header', 
-                                'aside', 'iframe', 'noscript', 'form']):
-                    tag.decompose()
-                
-                # Get title
-                title = ""
-                title_tag = soup.find('title')
-                if title_tag:
-                    title = title_tag.get_text(strip=True)
-                
-                # Extract main content
-                # Try common content containers first
-                main_content = None
-                for selector in ['article', 'main', '.content', '.post-content', 
-                                '.article-body', '#content', '.entry-content']:
-                    main_content = soup.select_one(selector)
-                    if main_content:
-                        break
-                
-                if not main_content:
-                    main_content = soup.find('body')
-                
-                if not main_content:
-                    return None
-                
-                # Get text content
-                text = main_content.get_text(separator=' ', strip=True)
-                text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-                text = text[:max_chars]
-                
-                # Extract statistics from the content
-                statistics = self._extract_statistics(text)
-                
-                fetch_time = time.time() - start_time
-                
-                return WebSource(
-                    url=url,
-                    title=title,
-                    domain=urlparse(url).netloc,
-                    content=text,
-                    snippet=text[:300] + "..." if len(text) > 300 else text,
-                    statistics=statistics,
-                    fetch_time=fetch_time
-                )
-                
+            
+            # Main-content extraction is CPU-bound; keep it off the event loop
+            extracted = await asyncio.to_thread(extract_main_text, html, max_chars)
+            title = extracted.title
+            text = extracted.text
+            if not text:
+                return None
+            
+            # Extract statistics from the content
+            statistics = self._extract_statistics(text)
+            
+            fetch_time = time.time() - start_time
+            
+            self.corpus.add_page(url, title, text, sector=sector, source='advanced_research')
+            
+            return WebSource(
+                url=url,
+                title=title,
+                domain=urlparse(url).netloc,
+                content=text,
+                snippet=text[:300] + "..." if len(text) > 300 else text,
+                statistics=statistics,
+                fetch_time=fetch_time
+            )
+        
         except asyncio.TimeoutError:
             print(f"  ⚠ Timeout fetching: {urlparse(url).netloc}")
         except Exception as e:
@@ -251,45 +287,50 @@ class AdvancedResearchEngine:
         return None
     
     def _extract_statistics(self, text: str) -> List[str]:
-        """Extract meaningful statistics from text"""
-        stats = []
-        
-        patterns = [
-            # Market size patterns
-            (r'(?:market\s+size|market\s+valued|worth|estimated)\s*(?:at|of)?\s*'
-             r'[\$₹]?\s*[\d,.]+\s*(?:billion|million|trillion|crore|Bn|B|M|Cr)', 'market_size'),
-            
-            # CAGR patterns
-            (r'CAGR\s*(?:of)?\s*[\d.]+\s*%', 'cagr'),
-            (r'(?:growing|growth)\s*(?:at|of)?\s*[\d.]+\s*%\s*(?:CAGR|annually)?', 'growth'),
-            
-            # Revenue/financial
-            (r'(?:revenue|sales|turnover)\s*(?:of|at|reached)?\s*[\$₹]?\s*[\d,.]+\s*'
-             r'(?:billion|million|crore|Cr|B|M)', 'revenue'),
-            
-            # Margin patterns
-            (r'(?:EBITDA|operating|profit|net)\s*margin\s*(?:of|at)?\s*[\d.]+\s*%', 'margin'),
-            
-            # Market share
-            (r'(?:market\s+share|share)\s*(?:of|at)?\s*[\d.]+\s*%', 'share'),
-            
-            # Year projections
-            (r'(?:by|in|reach)\s*(?:20\d{2})\s*[\$₹]?\s*[\d,.]+\s*'
-             r'(?:billion|million|trillion|crore)', 'projection'),
-            
-            # Employee/scale
-            (r'[\d,]+\s*(?:employees|workforce|staff|professionals)', 'scale'),
-            
-            # Percentage changes
-            (r'(?:increased|grew|rose|declined)\s*(?:by)?\s*[\d.]+\s*%', 'change'),
-        ]
-        
-        for pattern, stat_type in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches[:3]:  # Limit per type
-                stats.append(match.strip())
-        
-        return list(set(stats))[:15]  # Dedupe and limit
+        """Extract meaningful statistics from text (single pass, shared engine)"""
+        return get_fact_extractor(STATISTIC_KINDS).extract_texts(
+            text, per_kind=3, limit=15  # Limit per type, dedupe and limit
+        )
+    
+    # =========================================================================
+    # NEAR-DUPLICATE HANDLING
+    # =========================================================================
+    
+    def _skip_known_duplicates(self, results: List[Dict]) -> List[Dict]:
+        """
+        Replace URLs known to be syndicated copies with their canonical URL,
+        so the same content is never fetched twice.
+        """
+        seen_urls = set()
+        filtered = []
+        for r in results:
+            canonical = self.dedup_index.canonical_for(r['url'])
+            if canonical:
+                r = {**r, 'url': canonical, 'domain': urlparse(canonical).netloc}
+            if r['url'] not in seen_urls:
+                seen_urls.add(r['url'])
+                filtered.append(r)
+        return filtered
+    
+    def _collapse_duplicates(self, sources: List[WebSource]) -> List[WebSource]:
+        """Drop fetched pages that are near-duplicates of another page in this batch"""
+        kept: Dict[str, WebSource] = {}
+        for source in sources:
+            # Copies share their canonical's key even when the canonical page
+            # itself is not in this batch (indexed by an earlier run)
+            key = self.dedup_index.add(source.url, source.content) or source.url
+            if key in kept:
+                # Keep any statistics the copy adds to the page already kept
+                original = kept[key]
+                original.statistics.extend([
+                    stat for stat in source.statistics if stat not in original.statistics
+                ])
+                continue
+            kept[key] = source
+        
+        if len(kept) < len(sources):
+            print(f"  🧬 Collapsed {len(sources) - len(kept)} near-duplicate pages")
+        return list(kept.values())
     
     # =========================================================================
     # LLM INTEGRATION FOR ANALYSIS
@@ -297,23 +338,59 @@ class AdvancedResearchEngine:
     
     async def _call_llm(self, prompt: str, max_tokens: int = 1500, 
                         temperature: float = 0.3) -> str:
-        """Call Janus Pro 7B with optimized parameters for factual extraction"""
+        """
+        Call Janus Pro 7B with optimized parameters for factual extraction.
+        The blocking Ollama request runs in a worker thread so concurrent
+        calls (bounded by llm_concurrency) overlap instead of stalling the loop.
+        """
+        if self._llm_semaphore is None:
+            self._llm_semaphore = asyncio.Semaphore(self.llm_concurrency)
+        
         try:
-            result = self.janus_engine.generate_text(prompt, temperature=temperature, max_tokens=max_tokens)
+            async with self._llm_semaphore:
+                result = await asyncio.to_thread(
+                    self.janus_engine.generate_text, prompt,
+                    temperature=temperature, max_tokens=max_tokens
+                )
             return result if result else ""
         except Exception as e:
             print(f"  ⚠ Janus LLM call error: {e}")
         
         return ""
     
+    @staticmethod
+    def _parse_json(response: str) -> Dict[str, Any]:
+        """Extract the JSON object from an LLM response"""
+        try:
+            json_match = re.search(r'\{[\s\S]+\}', response or "")
+            if json_match:
+                parsed = json.loads(json_match.group())
+                return parsed if isinstance(parsed, dict) else {}
+        except json.JSONDecodeError:
+            pass
+        return {}
+    
     async def synthesize_research(self, sources: List[WebSource], 
-                                   sector: str) -> Dict[str, Any]:
+                                   sector: str, mode: str = None) -> Dict[str, Any]:
         """
         Gemini-style synthesis: Read all sources and generate insights.
+        
+        Args:
+            sources: Fetched web sources
+            sector: Sector being researched
+            mode: 'map_reduce' (per-source extraction, then merge) or
+                  'single' (one combined prompt); defaults to self.synthesis_mode
         """
         if not sources:
             return {}
         
+        if (mode or self.synthesis_mode) == "single":
+            return await self._synthesize_single_prompt(sources, sector)
+        return await self._synthesize_map_reduce(sources, sector)
+    
+    async def _synthesize_single_prompt(self, sources: List[WebSource],
+                                        sector: str) -> Dict[str, Any]:
+        """Synthesize all sources in a single LLM prompt"""
         # Combine content from all sources
         combined_content = "\n\n---\n\n".join([
             f"SOURCE: {s.domain}\nTITLE: {s.title}\nCONTENT:\n{s.content[:3000]}"
@@ -352,16 +429,228 @@ RULES:
 OUTPUT JSON:"""
 
         response = await self._call_llm(prompt, max_tokens=1200, temperature=0.2)
-        
+        return self._coerce_fields(self._parse_json(response), self.SYNTHESIS_FIELDS)
+    
+    
+    # -------------------------------------------------------------------------
+    # Map-reduce synthesis
+    # -------------------------------------------------------------------------
+    
+    def _chunk_source(self, source: WebSource) -> List[str]:
+        """Split a source's content into map-sized chunks"""
+        content = source.content
+        size = self.map_chunk_chars
+        return [
+            content[start:start + size]
+            for start in range(0, len(content), size)
+        ][:self.max_chunks_per_source]
+    
+    def _extraction_key(self, url: str, chunk: str) -> str:
+        """Cache key for one source chunk (URL + content hash)"""
+        return hashlib.sha1(f"{url}\n{chunk}".encode('utf-8', 'ignore')).hexdigest()
+    
+    def _load_extraction_cache(self) -> Dict[str, Dict]:
+        if self._extraction_cache is None:
+            self._extraction_cache = {}
+            if self.extraction_cache_path.exists():
+                try:
+                    with open(self.extraction_cache_path, 'r', encoding='utf-8') as f:
+                        self._extraction_cache = json.load(f)
+                except Exception as e:
+                    print(f"  ⚠ Could not load extraction cache: {e}")
+        return self._extraction_cache
+    
+    def _save_extraction_cache(self) -> None:
+        if not self._extraction_cache_dirty:
+            return
         try:
-            # Extract JSON from response
-            json_match = re.search(r'\{[\s\S]+\}', response)
-            if json_match:
-                return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            pass
+            self.extraction_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.extraction_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self._extraction_cache, f, ensure_ascii=False)
+            self._extraction_cache_dirty = False
+        except Exception as e:
+            print(f"  ⚠ Could not save extraction cache: {e}")
+    
+    async def _extract_source_facts(self, source: WebSource, chunk: str,
+                                    sector: str) -> Dict[str, Any]:
+        """Map step: extract structured facts from one source chunk (cached)"""
+        cache = self._load_extraction_cache()
+        key = self._extraction_key(source.url, chunk)
+        if key in cache:
+            return self._coerce_fields(cache[key], self.MAP_FIELDS)
+        
+        prompt = f"""Extract investment-relevant facts about the {sector} sector from this web page.
+
+SOURCE: {source.domain}
+TITLE: {source.title}
+CONTENT:
+{chunk}
+
+OUTPUT FORMAT (JSON):
+{{
+    "market_size": "figure with currency and year, or null",
+    "market_cagr": "percentage with period, or null",
+    "trends": ["trend with specific data"],
+    "growth_drivers": ["driver with quantification"],
+    "statistics": {{"stat_name": "stat_value"}},
+    "competitors": ["company name"],
+    "implications": ["implication for investors"]
+}}
+
+RULES: Only use facts stated in the content. Use null or [] when absent.
+
+OUTPUT JSON:"""
         
-        return {}
+        response = await self._call_llm(prompt, max_tokens=500, temperature=0.1)
+        facts = self._coerce_fields(self._parse_json(response), self.MAP_FIELDS)
+        
+        # Only successful extractions are cached, so failures are retried
+        if facts:
+            cache[key] = facts
+            self._extraction_cache_dirty = True
+        return facts
+    
+    # Field types of a map extraction and of a synthesis result
+    MAP_FIELDS = {
+        'market_size': str, 'market_cagr': str, 'trends': list, 'growth_drivers': list,
+        'statistics': dict, 'competitors': list, 'implications': list,
+    }
+    SYNTHESIS_FIELDS = {
+        'market_size': str, 'market_cagr': str, 'key_trends': list, 'growth_drivers': list,
+        'key_statistics': dict, 'competitive_landscape': str, 'investment_implications': list,
+    }
+    
+    @staticmethod
+    def _coerce_fields(data: Any, fields: Dict[str, type]) -> Dict[str, Any]:
+        """
+        Keep only the expected fields of an LLM JSON result, coerced to their
+        types: text fields to str, lists to lists of str, dicts to str -> str.
+        Values that cannot be coerced are dropped.
+        """
+        def text(value) -> Optional[str]:
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+                value = str(value).strip()
+                return value if value.lower() not in ('', 'null', 'none', 'n/a') else None
+            return None
+        
+        if not isinstance(data, dict):
+            return {}
+        coerced = {}
+        for name, kind in fields.items():
+            value = data.get(name)
+            if kind is str:
+                value = text(value)
+            elif kind is list:
+                items = value if isinstance(value, list) else [value]
+                value = [item for item in map(text, items) if item]
+            else:
+                items = value.items() if isinstance(value, dict) else []
+                value = {str(k): v for k, v in ((k, text(v)) for k, v in items) if v}
+            if value:
+                coerced[name] = value
+        return coerced
+    
+    @staticmethod
+    def _merge_extractions(extractions: List[Tuple[WebSource, Dict]]) -> Dict[str, Any]:
+        """Rule-based merge of per-source facts (reduce fallback)"""
+        def valid(value) -> bool:
+            return bool(value) and str(value).lower() not in ('null', 'none', 'n/a')
+        
+        merged = {
+            'market_size': None, 'market_cagr': None, 'key_trends': [],
+            'growth_drivers': [], 'key_statistics': {},
+            'competitive_landscape': None, 'investment_implications': []
+        }
+        competitors = []
+        
+        for source, facts in extractions:
+            if not merged['market_size'] and valid(facts.get('market_size')):
+                merged['market_size'] = facts['market_size']
+            if not merged['market_cagr'] and valid(facts.get('market_cagr')):
+                merged['market_cagr'] = facts['market_cagr']
+            for field_name, target in (('trends', 'key_trends'),
+                                       ('growth_drivers', 'growth_drivers'),
+                                       ('implications', 'investment_implications')):
+                for item in facts.get(field_name) or []:
+                    if valid(item) and item not in merged[target]:
+                        merged[target].append(item)
+            for name, value in (facts.get('statistics') or {}).items():
+                if valid(value) and name not in merged['key_statistics']:
+                    merged['key_statistics'][name] = f"{value} (per {source.domain})"
+            competitors.extend(c for c in facts.get('competitors') or [] if valid(c))
+        
+        if competitors:
+            merged['competitive_landscape'] = "Key players include " + ", ".join(
+                list(dict.fromkeys(competitors))[:6]
+            )
+        return merged
+    
+    async def _synthesize_map_reduce(self, sources: List[WebSource],
+                                     sector: str) -> Dict[str, Any]:
+        """
+        Map: extract structured facts from every source chunk concurrently
+        (cached per URL + content hash). Reduce: merge the compact facts in a
+        small prompt, falling back to a rule-based merge.
+        """
+        jobs = [
+            (source, chunk)
+            for source in sources[:self.max_map_sources]
+            for chunk in self._chunk_source(source)
+        ]
+        results = await asyncio.gather(
+            *[self._extract_source_facts(source, chunk, sector) for source, chunk in jobs],
+            return_exceptions=True
+        )
+        self._save_extraction_cache()
+        
+        extractions = [
+            (source, facts) for (source, _), facts in zip(jobs, results)
+            if isinstance(facts, dict) and facts
+        ]
+        print(f"  🧩 Map step: {len(extractions)}/{len(jobs)} source chunks extracted")
+        if not extractions:
+            return {}
+        
+        merged = self._merge_extractions(extractions)
+        facts_block = "\n".join(
+            f"SOURCE {source.domain}: {json.dumps(facts, ensure_ascii=False)[:1200]}"
+            for source, facts in extractions
+        )
+        
+        prompt = f"""You are a senior M&A research analyst. Merge these per-source facts about the {sector} sector into one summary.
+
+FACTS BY SOURCE:
+{facts_block}
+
+OUTPUT FORMAT (JSON):
+{{
+    "market_size": "exact figure with currency and year",
+    "market_cagr": "percentage with period",
+    "key_trends": ["trend 1 with specific data", "trend 2", "trend 3"],
+    "growth_drivers": ["driver 1 with quantification", "driver 2", "driver 3"],
+    "key_statistics": {{"stat_name": "stat_value with source"}},
+    "competitive_landscape": "brief overview with market share data if available",
+    "investment_implications": ["implication 1 for investors", "implication 2"]
+}}
+
+RULES: Resolve conflicts in favour of the most specific, most recent, India-focused figure. Do not add facts. Use null when absent.
+
+OUTPUT JSON:"""
+        
+        try:
+            reduced = self._coerce_fields(
+                self._parse_json(await self._call_llm(prompt, max_tokens=800, temperature=0.2)),
+                self.SYNTHESIS_FIELDS
+            )
+        except Exception as e:
+            print(f"  ⚠ Reduce step failed ({e}); using rule-based merge")
+            reduced = {}
+        
+        # Fill anything the reduce step dropped from the rule-based merge
+        for key, value in merged.items():
+            if not reduced.get(key) and value:
+                reduced[key] = value
+        return reduced
     
     # =========================================================================
     # COMPREHENSIVE RESEARCH PIPELINE
@@ -396,9 +685,32 @@ OUTPUT JSON:"""
         if sub_sector:
             queries.append(f"{sub_sector} market size India growth")
         
+        max_pages = 8  # Pages read per research run (local + fetched)
+        
+        # Query the local corpus first; only go to the web for the gaps.
+        # Only pages this engine stored as market research count (not company
+        # pages from the scraper), and only when they match the query itself
+        local_sources: Dict[str, WebSource] = {}
+        web_queries = []
+        for query in queries[:4]:  # Limit to 4 queries
+            hits = self.corpus.search(query, limit=4, sector=sector,
+                                      max_age_days=self.corpus_max_age_days,
+                                      source='advanced_research',
+                                      min_score=self.min_local_score)
+            if len(hits) >= self.min_local_hits:
+                for hit in hits:
+                    if len(local_sources) < max_pages:
+                        local_sources.setdefault(hit.url, self._source_from_hit(hit))
+            else:
+                web_queries.append(query)
+        
+        if local_sources:
+            print(f"  📚 Local corpus answered {len(queries[:4]) - len(web_queries)} queries "
+                  f"({len(local_sources)} pages)")
+        
         # Collect all search results
         all_results = []
-        for query in queries[:4]:  # Limit to 4 queries
+        for query in web_queries:
             results = await self.search_duckduckgo(query, 6)
             all_results.extend(results)
         
@@ -410,21 +722,25 @@ OUTPUT JSON:"""
                 seen_urls.add(r['url'])
                 unique_results.append(r)
         
+        # Known syndicated copies are swapped for their canonical page
+        unique_results = self._skip_known_duplicates(unique_results)
+        
         print(f"  📄 Found {len(unique_results)} unique sources")
         
         # Fetch actual page content (parallel with limit)
         fetch_tasks = [
-            self.fetch_webpage_content(r['url']) 
-            for r in unique_results[:8]  # Limit to 8 pages
-        ]
+            self.fetch_webpage_content(r['url'], sector=sector) 
+            for r in unique_results if r['url'] not in local_sources
+        ][:max(0, max_pages - len(local_sources))]
         
         fetched_sources = await asyncio.gather(*fetch_tasks, return_exceptions=True)
         
         # Filter successful fetches
-        valid_sources = [
+        valid_sources = list(local_sources.values()) + [
             s for s in fetched_sources 
             if isinstance(s, WebSource) and s.content
         ]
+        valid_sources = self._collapse_duplicates(valid_sources)
         
         print(f"  📖 Successfully read {len(valid_sources)} pages")
         
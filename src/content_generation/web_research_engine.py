@@ -16,6 +16,52 @@ from dataclasses import dataclass, field
 from urllib.parse import quote_plus
 import time
 
+from src.web_scraping.fact_extractor import get_fact_extractor, NUMBER_KINDS
+from src.web_scraping.endpoint_health import get_endpoint_health
+from src.web_scraping.http_replay import wrap_aiohttp_session
+from src.web_scraping.rate_limiter import DDG_THROTTLE_STATUSES
+
+
+# Snippet patterns, compiled once and shared by all extractors
+_MARKET_SIZE_RE = re.compile(
+    r'(?:market\s+size|valued\s+at|worth|estimated\s+at)[^\d]*'
+    r'((?:\$|USD|₹|INR)?\s*[\d.,]+\s*(?:billion|million|trillion|crore|Bn|B|M|Cr))',
+    re.IGNORECASE
+)
+_CAGR_RE = re.compile(r'CAGR\s*(?:of\s*)?([\d.]+\s*%)', re.IGNORECASE)
+_PLAYERS_RE = re.compile(
+    r'(?:top|leading|major)\s+(?:players?|companies?).*?(?:include|are|:)?\s*'
+    r'([A-Z][a-zA-Z]+(?:\s*,\s*[A-Z][a-zA-Z]+)*)',
+    re.IGNORECASE
+)
+_MARGIN_RE = re.compile(r'(?:EBITDA|operating|profit)\s*margin[^\d]*([\d.]+\s*%)', re.IGNORECASE)
+_GROWTH_RE = re.compile(r'(?:revenue|sales)\s*growth[^\d]*([\d.]+\s*%)', re.IGNORECASE)
+_BENCHMARK_RE = re.compile(
+    r'\b(?:EBITDA|margins?|valuation|multiples?|EV\s*/|P\s*/\s*E|industry\s+average)\b',
+    re.IGNORECASE
+)
+
+# Research topics: search terms and result count. QUERY_GROUPS lists topics
+# whose searches overlap enough to be answered by one merged query.
+RESEARCH_TOPICS = {
+    'market_size': ('market size 2024 2025 billion CAGR', 10),
+    'key_players': ('top companies players market leaders', 6),
+    'trends': ('industry trends 2025 growth drivers', 8),
+    'benchmarks': ('industry average EBITDA margin profit margin valuation multiples', 8),
+}
+QUERY_GROUPS = (
+    ('market_size', 'key_players'),
+    ('trends', 'benchmarks'),
+)
+
+
+@dataclass
+class PlannedQuery:
+    """A search issued once on behalf of one or more research topics"""
+    query: str
+    num_results: int
+    topics: Tuple[str, ...]
+
 
 @dataclass
 class ResearchResult:
@@ -56,6 +102,8 @@ class WebResearchEngine:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
+        self.search_health = get_endpoint_health()
+        self._search_cache: Dict[str, List[Dict]] = {}  # query -> results, per engine
     
     @property
     def janus_engine(self):
@@ -69,7 +117,9 @@ class WebResearchEngine:
         """Get or create aiohttp session"""
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(timeout=timeout, headers=self.headers)
+            self.session = wrap_aiohttp_session(
+                aiohttp.ClientSession(timeout=timeout, headers=self.headers)
+            )
         return self.session
     
     async def close(self):
@@ -83,14 +133,24 @@ class WebResearchEngine:
         Returns list of {title, url, snippet}
         """
         results = []
+        endpoint = "https://html.duckduckgo.com/html/"
+        
+        # Skip rather than stall when the endpoint is in a long backoff
+        if not await self.search_health.wait(endpoint, max_wait=10.0):
+            print(f"  ⚠ DuckDuckGo backing off, skipping: {query[:40]}")
+            return results
         
         try:
             session = await self._get_session()
             
             # DuckDuckGo HTML search
-            search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
+            search_url = f"{endpoint}?q={quote_plus(query)}"
             
+            start = time.monotonic()
             async with session.get(search_url) as resp:
+                self.search_health.record(endpoint, resp.status, time.monotonic() - start,
+                                          resp.headers.get('Retry-After'),
+                                          throttle_statuses=DDG_THROTTLE_STATUSES)
                 if resp.status == 200:
                     html = await resp.text()
                     
@@ -122,6 +182,7 @@ class WebResearchEngine:
                         })
                         
         except Exception as e:
+            self.search_health.record_error(endpoint)
             print(f"  ⚠ DuckDuckGo search error: {e}")
         
         return results
@@ -134,117 +195,150 @@ class WebResearchEngine:
     
     def _extract_numbers(self, text: str) -> List[str]:
         """Extract meaningful numbers and statistics from text"""
-        patterns = [
-            r'\$[\d,]+(?:\.\d+)?(?:\s*(?:billion|million|trillion|B|M|T|Cr|cr|Bn|bn))?',  # Currency
-            r'₹[\d,]+(?:\.\d+)?(?:\s*(?:crore|lakh|Cr|L))?',  # Indian currency
-            r'\d+(?:\.\d+)?%',  # Percentages
-            r'(?:USD|INR|EUR)\s*[\d,]+(?:\.\d+)?(?:\s*(?:billion|million|B|M|Cr))?',
-            r'\d+(?:\.\d+)?\s*(?:billion|million|trillion|crore|lakh)',  # Large numbers
-            r'CAGR\s*(?:of\s*)?[\d.]+%',  # CAGR mentions
-            r'(?:FY|Q[1-4])\s*\d{2,4}',  # Fiscal years/quarters
-        ]
-        
-        numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            numbers.extend(matches)
-        
+        numbers = get_fact_extractor(NUMBER_KINDS).extract_texts(text)
         return list(set(numbers))[:10]
     
-    async def research_market_size(self, sector: str, sub_sector: str = "") -> Dict[str, str]:
+    # =========================================================================
+    # QUERY PLANNING
+    # =========================================================================
+    
+    def plan_queries(self, sector: str, sub_sector: str = "",
+                     topics: Tuple[str, ...] = None) -> List[PlannedQuery]:
         """
-        Research market size and CAGR for the sector.
-        Returns dict with market_size, cagr, and source.
+        Merge overlapping topic searches into as few unique queries as possible.
+        
+        Topics in the same QUERY_GROUPS entry share one query; repeated terms
+        are dropped and identical queries are issued once.
         """
-        query = f"{sector} {sub_sector} market size 2024 2025 India billion CAGR"
-        results = await self.search_duckduckgo(query, 10)
+        topics = topics or tuple(RESEARCH_TOPICS)
+        plan: Dict[str, PlannedQuery] = {}
         
-        market_data = {
-            'market_size': '',
-            'cagr': '',
-            'year': '',
-            'source': ''
-        }
+        grouped = [tuple(t for t in group if t in topics) for group in QUERY_GROUPS]
+        grouped += [(t,) for t in topics if not any(t in g for g in QUERY_GROUPS)]
+        
+        for group in grouped:
+            if not group:
+                continue
+            
+            # Shared context first, then each topic's terms without repeats
+            words = f"{sector} {sub_sector} India".split()
+            for topic in group:
+                words += RESEARCH_TOPICS[topic][0].split()
+            query = ' '.join(dict.fromkeys(w for w in words))
+            num_results = min(10, max(RESEARCH_TOPICS[t][1] for t in group) + 2 * (len(group) - 1))
+            
+            key = ' '.join(sorted(w.lower() for w in query.split()))
+            if key in plan:
+                merged = plan[key]
+                plan[key] = PlannedQuery(merged.query, max(merged.num_results, num_results),
+                                         merged.topics + group)
+            else:
+                plan[key] = PlannedQuery(query, num_results, group)
+        
+        return list(plan.values())
+    
+    async def _run_plan(self, plan: List[PlannedQuery]) -> List[Dict]:
+        """Issue each planned query once (cached per engine) and tag results with topics"""
+        async def run(planned: PlannedQuery) -> List[Dict]:
+            if planned.query not in self._search_cache:
+                self._search_cache[planned.query] = await self.search_duckduckgo(
+                    planned.query, planned.num_results
+                )
+            return self._search_cache[planned.query]
+        
+        batches = await asyncio.gather(*[run(p) for p in plan], return_exceptions=True)
+        
+        # Shared result set, deduplicated by URL
+        merged: Dict[str, Dict] = {}
+        for planned, results in zip(plan, batches):
+            if not isinstance(results, list):
+                continue
+            for result in results:
+                entry = merged.setdefault(result['url'], {**result, 'topics': set()})
+                entry['topics'].update(planned.topics)
+        return list(merged.values())
+    
+    def _scan_results(self, results: List[Dict]) -> Dict[str, Any]:
+        """Run every snippet extractor over the shared result set in one pass"""
+        market_data = {'market_size': '', 'cagr': '', 'year': '', 'source': ''}
+        trends: List[str] = []
+        players: List[str] = []
+        benchmarks: Dict[str, str] = {}
         
         for result in results:
-            text = f"{result['title']} {result['snippet']}"
+            snippet = result['snippet']
+            text = f"{result['title']} {snippet}"
+            topics = result.get('topics') or set(RESEARCH_TOPICS)
             
-            # Look for market size
             if not market_data['market_size']:
-                size_match = re.search(
-                    r'(?:market\s+size|valued\s+at|worth|estimated\s+at)[^\d]*'
-                    r'((?:\$|USD|₹|INR)?\s*[\d.,]+\s*(?:billion|million|trillion|crore|Bn|B|M|Cr))',
-                    text, re.IGNORECASE
-                )
+                size_match = _MARKET_SIZE_RE.search(text)
                 if size_match:
                     market_data['market_size'] = size_match.group(1).strip()
                     market_data['source'] = result['url']
             
-            # Look for CAGR
             if not market_data['cagr']:
-                cagr_match = re.search(
-                    r'CAGR\s*(?:of\s*)?([\d.]+\s*%)',
-                    text, re.IGNORECASE
-                )
+                cagr_match = _CAGR_RE.search(text)
                 if cagr_match:
                     market_data['cagr'] = cagr_match.group(1)
+            
+            # Whether a snippet reads as a trend depends on the query it answered;
+            # a merged trends + benchmarks search also returns margin/multiple pages
+            is_benchmark = 'benchmarks' in topics and _BENCHMARK_RE.search(text)
+            if 'trends' in topics and len(snippet) > 50 and not is_benchmark:
+                trends.append(snippet[:200] + "..." if len(snippet) > 200 else snippet)
+            
+            for match in _PLAYERS_RE.findall(snippet):
+                players.extend(c.strip() for c in match.split(','))
+            
+            if 'industry_ebitda_margin' not in benchmarks:
+                margin_match = _MARGIN_RE.search(snippet)
+                if margin_match:
+                    benchmarks['industry_ebitda_margin'] = margin_match.group(1)
+            
+            if 'industry_growth' not in benchmarks:
+                growth_match = _GROWTH_RE.search(snippet)
+                if growth_match:
+                    benchmarks['industry_growth'] = growth_match.group(1)
         
-        return market_data
+        return {
+            'market_size': market_data,
+            'trends': trends[:5],
+            'key_players': list(dict.fromkeys(players))[:5],
+            'benchmarks': benchmarks
+        }
+    
+    async def _research_topics(self, sector: str, sub_sector: str,
+                               topics: Tuple[str, ...]) -> Dict[str, Any]:
+        plan = self.plan_queries(sector, sub_sector, topics)
+        results = await self._run_plan(plan)
+        return self._scan_results(results)
+    
+    # =========================================================================
+    # TOPIC RESEARCH
+    # =========================================================================
+    
+    async def research_market_size(self, sector: str, sub_sector: str = "") -> Dict[str, str]:
+        """
+        Research market size and CAGR for the sector.
+        Returns dict with market_size, cagr, and source.
+        """
+        found = await self._research_topics(sector, sub_sector, ('market_size',))
+        return found['market_size']
     
     async def research_industry_trends(self, sector: str) -> List[str]:
         """Research current industry trends and growth drivers"""
-        query = f"{sector} industry trends 2025 growth drivers India"
-        results = await self.search_duckduckgo(query, 8)
-        
-        trends = []
-        for result in results:
-            snippet = result['snippet']
-            if len(snippet) > 50:
-                # Clean and truncate
-                trend = snippet[:200] + "..." if len(snippet) > 200 else snippet
-                trends.append(trend)
-        
-        return trends[:5]
+        found = await self._research_topics(sector, "", ('trends',))
+        return found['trends']
     
     async def research_key_players(self, sector: str, sub_sector: str = "") -> List[str]:
         """Find key players/competitors in the sector"""
-        query = f"{sector} {sub_sector} top companies players India market leaders"
-        results = await self.search_duckduckgo(query, 6)
-        
-        players = []
-        company_pattern = r'(?:top|leading|major)\s+(?:players?|companies?).*?(?:include|are|:)?\s*([A-Z][a-zA-Z]+(?:\s*,\s*[A-Z][a-zA-Z]+)*)'
-        
-        for result in results:
-            text = result['snippet']
-            matches = re.findall(company_pattern, text, re.IGNORECASE)
-            for match in matches:
-                companies = [c.strip() for c in match.split(',')]
-                players.extend(companies)
-        
-        # Deduplicate and return top 5
-        return list(dict.fromkeys(players))[:5]
+        found = await self._research_topics(sector, sub_sector, ('key_players',))
+        return found['key_players']
     
     async def research_financial_benchmarks(self, sector: str) -> Dict[str, str]:
         """Research industry financial benchmarks (margins, multiples)"""
-        query = f"{sector} India industry average EBITDA margin profit margin valuation multiples"
-        results = await self.search_duckduckgo(query, 8)
-        
-        benchmarks = {}
-        
-        for result in results:
-            text = result['snippet']
-            
-            # Look for margin data
-            margin_match = re.search(r'(?:EBITDA|operating|profit)\s*margin[^\d]*([\d.]+\s*%)', text, re.IGNORECASE)
-            if margin_match and 'ebitda_margin' not in benchmarks:
-                benchmarks['industry_ebitda_margin'] = margin_match.group(1)
-            
-            # Look for growth rates
-            growth_match = re.search(r'(?:revenue|sales)\s*growth[^\d]*([\d.]+\s*%)', text, re.IGNORECASE)
-            if growth_match and 'revenue_growth' not in benchmarks:
-                benchmarks['industry_growth'] = growth_match.group(1)
-        
-        return benchmarks
+        found = await self._research_topics(sector, "", ('benchmarks',))
+        return found['benchmarks']
     
     async def _summarize_with_llm(self, research_data: List[Dict], sector: str) -> str:
         """Use Janus Pro 7B to summarize research findings into investor-ready insights"""
@@ -284,39 +378,28 @@ class WebResearchEngine:
         
         research = MarketResearch()
         
-        # Parallel research tasks
-        tasks = [
-            self.research_market_size(sector, sub_sector),
-            self.research_industry_trends(sector),
-            self.research_key_players(sector, sub_sector),
-            self.research_financial_benchmarks(sector)
-        ]
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # One planned search per merged topic group, scanned once by all extractors
+        plan = self.plan_queries(sector, sub_sector)
+        try:
+            found = self._scan_results(await self._run_plan(plan))
+        except Exception as e:
+            print(f"  ⚠ Research error: {e}")
+            found = self._scan_results([])
         
         # Process market size
-        if isinstance(results[0], dict):
-            market_data = results[0]
-            if market_data.get('market_size'):
-                research.market_size = market_data['market_size']
-                research.statistics['Market Size'] = market_data['market_size']
-            if market_data.get('cagr'):
-                research.market_cagr = market_data['cagr']
-                research.statistics['Industry CAGR'] = market_data['cagr']
-            if market_data.get('source'):
-                research.sources.append(market_data['source'])
-        
-        # Process trends
-        if isinstance(results[1], list):
-            research.industry_trends = results[1]
-        
-        # Process key players
-        if isinstance(results[2], list):
-            research.key_players = results[2]
-        
-        # Process benchmarks
-        if isinstance(results[3], dict):
-            research.statistics.update(results[3])
+        market_data = found['market_size']
+        if market_data.get('market_size'):
+            research.market_size = market_data['market_size']
+            research.statistics['Market Size'] = market_data['market_size']
+        if market_data.get('cagr'):
+            research.market_cagr = market_data['cagr']
+            research.statistics['Industry CAGR'] = market_data['cagr']
+        if market_data.get('source'):
+            research.sources.append(market_data['source'])
+        
+        research.industry_trends = found['trends']
+        research.key_players = found['key_players']
+        research.statistics.update(found['benchmarks'])
         
         # Generate growth drivers from trends
         if research.industry_trends:
@@ -326,7 +409,7 @@ class WebResearchEngine:
         
         print(f"  ✓ Found: Market size={research.market_size or 'N/A'}, "
               f"CAGR={research.market_cagr or 'N/A'}, "
-              f"{len(research.statistics)} statistics")
+              f"{len(research.statistics)} statistics ({len(plan)} searches)")
         
         return research
 
@@ -7,10 +7,37 @@ from .image_sourcer import (
     ImageQueryGenerator,
     UnsplashClient,
     PexelsClient,
+    LocalImageProvider,
+    ProviderQuota,
     PlaceholderImageGenerator,
     ImageSourcer,
     source_images_for_sector
 )
+from .image_store import (
+    StoredImage,
+    ImageStore,
+    phash,
+    dhash
+)
+from .placeholder_renderer import PlaceholderRenderer
+from .crawler_service import (
+    CrawlJob,
+    CrawlerService
+)
+from .image_scoring import (
+    ImageScore,
+    ImageScorer
+)
+from .image_decode import (
+    DecodeLimits,
+    decode_bounded
+)
+from .image_packs import (
+    PackImage,
+    ImagePack,
+    ImagePackLibrary,
+    build_sector_pack
+)
 
 __all__ = [
     'ImageResult',
@@ -18,7 +45,24 @@ __all__ = [
     'ImageQueryGenerator',
     'UnsplashClient',
     'PexelsClient',
+    'LocalImageProvider',
+    'ProviderQuota',
     'PlaceholderImageGenerator',
     'ImageSourcer',
-    'source_images_for_sector'
+    'source_images_for_sector',
+    'StoredImage',
+    'ImageStore',
+    'phash',
+    'dhash',
+    'PlaceholderRenderer',
+    'CrawlJob',
+    'CrawlerService',
+    'ImageScore',
+    'ImageScorer',
+    'DecodeLimits',
+    'decode_bounded',
+    'PackImage',
+    'ImagePack',
+    'ImagePackLibrary',
+    'build_sector_pack'
 ]
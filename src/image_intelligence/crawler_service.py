@@ -0,0 +1,171 @@
+"""
+icrawler Worker Service
+=======================
+Long-lived Bing image crawler shared by all queries.
+
+- One crawler instance (and HTTP session) is reused across queries instead of
+  building a BingImageCrawler per query
+- Downloaded bytes are handed straight to a callback (the image store) through
+  a custom icrawler storage backend: no temp directories, no re-reading files
+- Jobs run on a dedicated worker thread fed by a bounded queue, so callers on
+  the pipeline's event loop await a future instead of blocking; when the queue
+  is full, submit() returns None and the caller falls back immediately
+"""
+import queue
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+try:
+    from icrawler.builtin import BingImageCrawler
+    from icrawler.storage import BaseStorage
+    HAS_ICRAWLER = True
+except ImportError:
+    HAS_ICRAWLER = False
+    BaseStorage = object
+
+
+# (bytes, job) -> stored result or None (e.g. rejected as a duplicate)
+ProcessBytes = Callable[[bytes, "CrawlJob"], Any]
+
+
+@dataclass
+class CrawlJob:
+    """One query for the crawler, with the context the store needs"""
+    query: str
+    max_num: int
+    sector_prefix: str = ""
+    slide_type: str = ""
+    future: Future = field(default_factory=Future)
+    results: List[Any] = field(default_factory=list)
+
+
+class _StreamingStorage(BaseStorage):
+    """icrawler storage backend that forwards downloads to the active job"""
+
+    def __init__(self, service: "CrawlerService"):
+        self.service = service
+        self._lock = threading.Lock()
+
+    def _full(self, job) -> bool:
+        with self._lock:
+            return len(job.results) >= job.max_num
+
+    def write(self, id, data):
+        job = self.service.active_job
+        if job is None or self._full(job):
+            return
+        # Processing runs unlocked; the limit is re-checked under the lock when appending
+        result = self.service.process_bytes(data, job)
+        if result is not None:
+            with self._lock:
+                if len(job.results) < job.max_num:
+                    job.results.append(result)
+
+    def exists(self, id):
+        return False  # Never skip a download by filename; the store dedups by content
+
+    def max_file_idx(self):
+        return 0
+
+
+class CrawlerService:
+    """
+    Single worker thread running icrawler jobs from a bounded queue.
+
+    Usage:
+        service = CrawlerService(process_bytes)
+        images = await service.crawl_async("factory floor", 3, timeout=60)
+    """
+
+    def __init__(self, process_bytes: ProcessBytes, max_queue: int = 8,
+                 downloader_threads: int = 4, min_size: Tuple[int, int] = (400, 300)):
+        self.process_bytes = process_bytes
+        self.downloader_threads = downloader_threads
+        self.min_size = min_size
+        self.jobs: "queue.Queue[Optional[CrawlJob]]" = queue.Queue(maxsize=max_queue)
+        self.active_job: Optional[CrawlJob] = None
+        self._crawler = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return HAS_ICRAWLER
+
+    def _ensure_worker(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="icrawler-worker",
+                                                daemon=True)
+                self._thread.start()
+
+    def _get_crawler(self):
+        if self._crawler is None:
+            self._crawler = BingImageCrawler(
+                downloader_threads=self.downloader_threads,
+                storage=_StreamingStorage(self),
+                log_level=50  # Suppress logs
+            )
+        return self._crawler
+
+    def _run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            if job.future.set_running_or_notify_cancel():
+                self.active_job = job
+                try:
+                    self._get_crawler().crawl(keyword=job.query, max_num=job.max_num,
+                                              min_size=self.min_size)
+                    job.future.set_result(job.results[:job.max_num])
+                except Exception as e:
+                    print(f"    ⚠ icrawler error: {e}")
+                    job.future.set_result(job.results[:job.max_num])
+                finally:
+                    self.active_job = None
+
+    def submit(self, query: str, max_num: int, sector_prefix: str = "",
+               slide_type: str = "") -> Optional[Future]:
+        """Queue a crawl; returns None when icrawler is missing or the queue is full"""
+        if not HAS_ICRAWLER:
+            return None
+        job = CrawlJob(query, max_num, sector_prefix, slide_type)
+        try:
+            self.jobs.put_nowait(job)
+        except queue.Full:
+            return None
+        self._ensure_worker()
+        return job.future
+
+    def crawl(self, query: str, max_num: int, sector_prefix: str = "", slide_type: str = "",
+              timeout: float = 120) -> List[Any]:
+        """Blocking crawl (for sync callers)"""
+        future = self.submit(query, max_num, sector_prefix, slide_type)
+        if future is None:
+            return []
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            return []
+
+    async def crawl_async(self, query: str, max_num: int, sector_prefix: str = "",
+                          slide_type: str = "", timeout: float = 120) -> List[Any]:
+        """Await a crawl without blocking the event loop"""
+        future = self.submit(query, max_num, sector_prefix, slide_type)
+        if future is None:
+            return []
+        try:
+            # Shielded so a timeout leaves the job queued/running; a late job still fills the store
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except Exception:
+            return []
+
+    def close(self) -> None:
+        """Stop the worker after queued jobs finish"""
+        if self._thread and self._thread.is_alive():
+            self.jobs.put(None)
@@ -7,6 +7,13 @@ Uses FREE sources to fetch sector-appropriate images:
 2. icrawler for bulk downloading
 3. Local Janus AI model for generation (fallback)
 
+fetch_all_for_company_async() searches for all slides concurrently and
+downloads through a bounded aiohttp pool with per-host limits; decoding and
+resizing run in worker threads so the event loop never blocks.
+
+Downloads are kept in a content-addressed ImageStore (image_store.py) that
+rejects perceptual near-duplicates and indexes images by sector and slide.
+
 This is the critical image sourcing layer for the M&A teaser pipeline.
 Each slide needs 3-4 high-quality, sector-appropriate images.
 """
@@ -15,13 +22,12 @@ import os
 import re
 import asyncio
 import hashlib
-import random
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
-import io
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # DuckDuckGo search
 try:
@@ -31,27 +37,23 @@ except ImportError:
     HAS_DDG = False
     print("⚠ duckduckgo-search not installed. Run: pip install duckduckgo-search")
 
-# icrawler for bulk downloads
-try:
-    from icrawler.builtin import BingImageCrawler, GoogleImageCrawler
-    from icrawler import ImageDownloader
-    HAS_ICRAWLER = True
-except ImportError:
-    HAS_ICRAWLER = False
-
-# PIL for image processing
-try:
-    from PIL import Image
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
-
 # Requests for downloading
 import requests
+import aiohttp
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config.settings import OUTPUT_DIR
+from src.web_scraping.http_replay import wrap_aiohttp_session, wrap_requests_session
+from src.web_scraping.rate_limiter import HostRateLimiter
+from src.image_intelligence.image_store import ImageStore, StoredImage
+from src.image_intelligence.placeholder_renderer import PlaceholderRenderer
+from src.image_intelligence.crawler_service import CrawlJob, CrawlerService
+from src.image_intelligence.image_scoring import ImageScorer
+from src.image_intelligence.image_decode import (
+    CHUNK_SIZE, HAS_PIL, BoundedBody, DecodeLimits, decode_bounded
+)
+from src.image_intelligence.image_packs import ImagePackLibrary
 
 
 @dataclass
@@ -66,6 +68,22 @@ class FetchedImage:
     license_info: str = ""
 
 
+def _content_length(headers) -> Optional[int]:
+    try:
+        return int(headers.get('content-length'))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class _AsyncFetchRun:
+    """Per-run async resources (bound to the running event loop)"""
+    session: Any
+    downloads: asyncio.Semaphore
+    hosts: HostRateLimiter
+    search: HostRateLimiter
+
+
 # ============================================================================
 # SECTOR-SPECIFIC IMAGE QUERIES
 # ============================================================================
@@ -263,15 +281,46 @@ class FreeImageFetcher:
     Last Resort: Placeholder generation
     """
     
-    def __init__(self, cache_dir: Path = None):
+    DDG_HOST = "https://duckduckgo.com/"
+    
+    def __init__(self, cache_dir: Path = None, max_downloads: int = 8,
+                 max_per_host: int = 2, search_interval: float = 1.5,
+                 decode_workers: int = 2, decode_limits: DecodeLimits = None):
         self.cache_dir = cache_dir or OUTPUT_DIR / "image_cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
-        # Track downloaded images to avoid duplicates
+        # Track downloaded bytes to skip decoding exact repeats within a run
+        # (shared by worker threads); near-duplicates are caught by the store
         self.downloaded_hashes = set()
+        self._hash_lock = threading.Lock()
+        self.store = ImageStore(self.cache_dir / "store") if HAS_PIL else None
+        self.placeholders = PlaceholderRenderer(self.cache_dir)
+        if self.store:
+            self._migrate_legacy_cache()
+        
+        # Prebuilt sector packs (memory-mapped; no network when a pack exists)
+        self.packs = ImagePackLibrary()
+        
+        # Candidates are over-fetched and the best ones picked by quality/relevance
+        self.scorer = ImageScorer()
+        self.candidate_factor = 2
+        
+        # Shared icrawler worker (streams into the store, bounded job queue)
+        self.crawler = CrawlerService(self._store_crawled_bytes)
+        self.crawl_timeout = 60.0
+        
+        # Bounded decode: byte/pixel caps, and at most decode_workers full bitmaps at once
+        self.decode_limits = decode_limits or DecodeLimits()
+        self.decode_pool = ThreadPoolExecutor(max_workers=decode_workers,
+                                              thread_name_prefix="image-decode")
+        
+        # Async download pool limits
+        self.max_downloads = max_downloads
+        self.max_per_host = max_per_host
+        self.search_interval = search_interval  # Spacing between image searches
         
         # Session for downloads
-        self.session = requests.Session()
+        self.session = wrap_requests_session(requests.Session())
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
@@ -291,225 +340,182 @@ class FreeImageFetcher:
             "industry innovation technology"
         ]
     
-    def _download_image(self, url: str, query: str, sector_prefix: str = "") -> Optional[Path]:
-        """Download image from URL with sector prefix for proper caching"""
-        if not HAS_PIL:
-            return None
-            
-        try:
-            response = self.session.get(url, timeout=10)
-            if response.status_code != 200:
-                return None
-            
-            # Check content type
-            content_type = response.headers.get('content-type', '')
-            if 'image' not in content_type:
-                return None
-            
-            # Load image
-            img_data = response.content
-            img_hash = hashlib.md5(img_data).hexdigest()[:12]
-            
-            # Skip duplicates
+    @staticmethod
+    def _sector_key(sector: str) -> str:
+        return re.sub(r'[^\w]', '_', sector.lower())[:30]
+    
+    def _migrate_legacy_cache(self) -> None:
+        """Move flat '{sector}_{query}_{hash}.jpg' cache files into the image store"""
+        sector_keys = sorted((self._sector_key(s) for s in SECTOR_IMAGE_QUERIES), key=len, reverse=True)
+        by_sector: Dict[str, List[Path]] = {}
+        for path in self.cache_dir.glob("*.jpg"):
+            for key in sector_keys:
+                if path.name.startswith(key + "_"):
+                    by_sector.setdefault(key, []).append(path)
+                    break
+        
+        for key, paths in by_sector.items():
+            imported = self.store.import_files(paths, key, delete_source=True)
+            print(f"  📦 Moved {imported}/{len(paths)} legacy cached images into the store ({key})")
+    
+    def _to_fetched(self, stored: StoredImage, source: str = None) -> FetchedImage:
+        return FetchedImage(
+            path=stored.path,
+            url=stored.source_url,
+            query=stored.query,
+            source=source or stored.source,
+            width=stored.width,
+            height=stored.height,
+            license_info=stored.license_info
+        )
+    
+    def _process_image_bytes(self, img_data: bytes, query: str, sector_prefix: str = "",
+                             slide_type: str = "", source: str = "", url: str = "",
+                             license_info: str = "") -> Optional[FetchedImage]:
+        """Validate and resize downloaded bytes, then add them to the image store"""
+        img_hash = hashlib.md5(img_data).hexdigest()[:12]
+        
+        # Skip exact repeats before decoding
+        with self._hash_lock:
             if img_hash in self.downloaded_hashes:
                 return None
             self.downloaded_hashes.add(img_hash)
-            
-            # Open and validate
-            img = Image.open(io.BytesIO(img_data))
-            
-            # Check minimum size
-            if img.width < 400 or img.height < 300:
+        
+        try:
+            # Size checks, then a draft-mode decode straight to PPT size (max 1920x1080)
+            img = decode_bounded(img_data, self.decode_limits)
+            if img is None:
                 return None
             
-            # Convert to RGB if needed
-            if img.mode in ('RGBA', 'P'):
-                img = img.convert('RGB')
+            # Store under the SECTOR key for proper isolation (near-duplicates rejected)
+            stored = self.store.add(
+                img, sector_prefix, slide_type, query,
+                source=source, source_url=url, license_info=license_info
+            )
+            return self._to_fetched(stored) if stored else None
             
-            # Resize for PPT (max 1920x1080)
-            max_size = (1920, 1080)
-            img.thumbnail(max_size, Image.LANCZOS)
+        except Exception:
+            return None
+    
+    def _download_image(self, url: str, query: str, sector_prefix: str = "",
+                        slide_type: str = "") -> Optional[FetchedImage]:
+        """Download image from URL into the store under the sector key"""
+        if not HAS_PIL:
+            return None
             
-            # Save with SECTOR PREFIX for proper isolation
-            safe_query = re.sub(r'[^\w\-]', '_', query)[:20]
-            # Use sector prefix to ensure images are sector-specific
-            filename = f"{sector_prefix}_{safe_query}_{img_hash}.jpg" if sector_prefix else f"{safe_query}_{img_hash}.jpg"
-            filepath = self.cache_dir / filename
+        try:
+            response = self.session.get(url, timeout=10, stream=True)
+            try:
+                if response.status_code != 200:
+                    return None
+                
+                # Check content type
+                content_type = response.headers.get('content-type', '')
+                if 'image' not in content_type:
+                    return None
+                
+                body = BoundedBody(self.decode_limits, _content_length(response.headers))
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if not body.feed(chunk):
+                        return None  # Dropped before downloading the rest
+            finally:
+                response.close()
+            if body.data is None:
+                return None
             
-            img.save(str(filepath), "JPEG", quality=85)
-            return filepath
+            return self.decode_pool.submit(
+                self._process_image_bytes, body.data, query, sector_prefix, slide_type,
+                'duckduckgo', url, "Web search result"
+            ).result()
             
-        except Exception as e:
+        except Exception:
             return None
     
-    def fetch_with_duckduckgo(self, query: str, max_images: int = 5, sector_prefix: str = "") -> List[FetchedImage]:
+    def _ddg_image_urls(self, query: str, max_results: int) -> List[str]:
+        """Blocking DuckDuckGo image search; returns image URLs"""
+        with DDGS() as ddgs:
+            results = list(ddgs.images(
+                query,
+                max_results=max_results,
+                safesearch='moderate',
+                size='large',
+                type_image='photo'
+            ))
+        return [r.get('image', '') for r in results if r.get('image')]
+    
+    def fetch_with_duckduckgo(self, query: str, max_images: int = 5, sector_prefix: str = "",
+                              slide_type: str = "") -> List[FetchedImage]:
         """Fetch images using DuckDuckGo (FREE, no API key)"""
         if not HAS_DDG:
             return []
         
         images = []
         try:
-            with DDGS() as ddgs:
-                results = list(ddgs.images(
-                    query,
-                    max_results=max_images * 3,  # Fetch more in case some fail
-                    safesearch='moderate',
-                    size='large',
-                    type_image='photo'
-                ))
+            # Fetch more in case some fail
+            for url in self._ddg_image_urls(query, max_images * 3):
+                if len(images) >= max_images:
+                    break
                 
-                for result in results:
-                    if len(images) >= max_images:
-                        break
-                        
-                    url = result.get('image', '')
-                    if not url:
-                        continue
-                    
-                    # Download with sector prefix for isolation
-                    filepath = self._download_image(url, query, sector_prefix)
-                    if filepath:
-                        with Image.open(filepath) as img:
-                            images.append(FetchedImage(
-                                path=filepath,
-                                url=url,
-                                query=query,
-                                source='duckduckgo',
-                                width=img.width,
-                                height=img.height,
-                                license_info="Web search result"
-                            ))
-                        print(f"    ✓ Downloaded: {filepath.name}")
+                # Download with sector prefix for isolation
+                image = self._download_image(url, query, sector_prefix, slide_type)
+                if image:
+                    images.append(image)
+                    print(f"    ✓ Downloaded: {image.path.name}")
                         
         except Exception as e:
             print(f"    ⚠ DuckDuckGo error: {e}")
         
         return images
     
-    def fetch_with_icrawler(self, query: str, max_images: int = 5, sector_prefix: str = "") -> List[FetchedImage]:
+    def _store_crawled_bytes(self, data: bytes, job: CrawlJob) -> Optional[FetchedImage]:
+        """Crawler storage callback: validate and store bytes as they arrive"""
+        image = self.decode_pool.submit(
+            self._process_image_bytes, data, job.query, job.sector_prefix, job.slide_type, 'bing'
+        ).result()
+        if image:
+            print(f"    ✓ Crawled: {image.path.name}")
+        return image
+    
+    def fetch_with_icrawler(self, query: str, max_images: int = 5, sector_prefix: str = "",
+                            slide_type: str = "") -> List[FetchedImage]:
         """Fetch images using icrawler (Bing) - no API key needed"""
-        if not HAS_ICRAWLER:
+        if not self.crawler.available:
             return []
-        
-        images = []
-        try:
-            # Create temp directory for this query
-            safe_query = re.sub(r'[^\w\-]', '_', query)[:30]
-            temp_dir = self.cache_dir / f"temp_{safe_query}"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Use Bing crawler (no API key needed)
-            crawler = BingImageCrawler(
-                storage={'root_dir': str(temp_dir)},
-                log_level=50  # Suppress logs
-            )
-            crawler.crawl(keyword=query, max_num=max_images)
-            
-            # Process downloaded images
-            for img_file in temp_dir.glob("*.*"):
-                if img_file.suffix.lower() in ['.jpg', '.jpeg', '.png', '.webp']:
-                    try:
-                        img = Image.open(img_file)
-                        if img.width >= 400 and img.height >= 300:
-                            # Move to cache
-                            new_name = f"{safe_query}_{img_file.stem}.jpg"
-                            new_path = self.cache_dir / new_name
-                            
-                            if img.mode in ('RGBA', 'P'):
-                                img = img.convert('RGB')
-                            img.save(str(new_path), "JPEG", quality=85)
-                            
-                            images.append(FetchedImage(
-                                path=new_path,
-                                url="",
-                                query=query,
-                                source='bing',
-                                width=img.width,
-                                height=img.height
-                            ))
-                            print(f"    ✓ Crawled: {new_path.name}")
-                    except:
-                        pass
-                    finally:
-                        img_file.unlink(missing_ok=True)
-            
-            # Cleanup temp dir
-            temp_dir.rmdir()
-            
-        except Exception as e:
-            print(f"    ⚠ icrawler error: {e}")
-        
-        return images
+        return self.crawler.crawl(query, max_images, sector_prefix, slide_type,
+                                  timeout=self.crawl_timeout)
+    
+    # Sector-specific placeholder colors
+    PLACEHOLDER_COLORS = {
+        'manufacturing': ((27, 54, 93), (75, 108, 183)),
+        'electronics': ((45, 52, 94), (88, 86, 161)),
+        'pharma': ((0, 128, 128), (0, 191, 179)),
+        'technology': ((55, 66, 250), (135, 91, 247)),
+        'logistics': ((255, 107, 53), (255, 165, 89)),
+        'entertainment': ((232, 75, 138), (255, 150, 100))
+    }
     
-    def create_placeholder(self, query: str, sector: str) -> FetchedImage:
-        """Create a placeholder image with sector branding"""
+    def create_placeholder(self, query: str, sector: str, variant: int = 0) -> FetchedImage:
+        """
+        Create a placeholder image with sector branding.
+        Memoised per (sector, query, variant): repeat calls reuse the rendered file.
+        """
         if not HAS_PIL:
             return None
             
         try:
-            from PIL import ImageDraw, ImageFont
-            
-            # Create gradient background
             width, height = 1200, 800
-            img = Image.new('RGB', (width, height))
-            draw = ImageDraw.Draw(img)
-            
-            # Sector-specific colors
-            sector_colors = {
-                'manufacturing': ((27, 54, 93), (75, 108, 183)),
-                'electronics': ((45, 52, 94), (88, 86, 161)),
-                'pharma': ((0, 128, 128), (0, 191, 179)),
-                'technology': ((55, 66, 250), (135, 91, 247)),
-                'logistics': ((255, 107, 53), (255, 165, 89)),
-                'entertainment': ((232, 75, 138), (255, 150, 100))
-            }
             
             # Find matching color
-            color1, color2 = ((27, 54, 93), (75, 108, 183))  # Default
-            for key, colors in sector_colors.items():
+            colors = ((27, 54, 93), (75, 108, 183))  # Default
+            for key, sector_colors in self.PLACEHOLDER_COLORS.items():
                 if key in sector.lower():
-                    color1, color2 = colors
+                    colors = sector_colors
                     break
             
-            # Draw gradient
-            for y in range(height):
-                ratio = y / height
-                r = int(color1[0] + (color2[0] - color1[0]) * ratio)
-                g = int(color1[1] + (color2[1] - color1[1]) * ratio)
-                b = int(color1[2] + (color2[2] - color1[2]) * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Add decorative elements
-            for i in range(5):
-                x = random.randint(50, width - 150)
-                y_pos = random.randint(50, height - 150)
-                size = random.randint(50, 150)
-                opacity = random.randint(20, 60)
-                overlay_color = (255, 255, 255)
-                draw.ellipse([x, y_pos, x + size, y_pos + size], 
-                            fill=(*overlay_color, opacity))
-            
-            # Add text
-            try:
-                font = ImageFont.truetype("arial.ttf", 36)
-                font_small = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
-                font_small = font
-            
-            # Sector name
-            draw.text((width//2, height//2 - 30), sector[:40], 
-                     fill=(255, 255, 255), font=font, anchor="mm")
-            
-            # Query hint
-            draw.text((width//2, height//2 + 30), query[:60], 
-                     fill=(200, 200, 200), font=font_small, anchor="mm")
-            
-            # Save
-            safe_query = re.sub(r'[^\w\-]', '_', query)[:25]
-            filename = f"placeholder_{safe_query}_{random.randint(1000, 9999)}.jpg"
-            filepath = self.cache_dir / filename
-            img.save(str(filepath), "JPEG", quality=90)
+            filepath = self.placeholders.render(
+                sector, (width, height), variant=f"{query}#{variant}", colors=colors,
+                title=sector[:40], subtitle=query[:60]
+            )
             
             return FetchedImage(
                 path=filepath,
@@ -540,108 +546,292 @@ class FreeImageFetcher:
         """
         print(f"  📷 Fetching {images_needed} images for {slide_type}...")
         
-        queries = self._get_sector_queries(sector, slide_type)
-        all_images = []
+        async def _run():
+            run = self._open_run()
+            try:
+                return await self._fetch_for_slide_async(run, sector, slide_type, images_needed)
+            finally:
+                await run.session.close()
         
-        # Create sector prefix for file naming (ensures proper isolation)
-        sector_prefix = re.sub(r'[^\w]', '_', sector.lower())[:30]
+        return asyncio.run(_run())
+    
+    # ========================================================================
+    # ASYNC ACQUISITION
+    # ========================================================================
+    
+    def _open_run(self) -> _AsyncFetchRun:
+        """Session and limits for one async fetch (must be called inside the loop)"""
+        session = wrap_aiohttp_session(aiohttp.ClientSession(
+            headers={'User-Agent': self.session.headers.get('User-Agent', '')}
+        ))
+        return _AsyncFetchRun(
+            session=session,
+            downloads=asyncio.Semaphore(self.max_downloads),
+            hosts=HostRateLimiter(base_interval=0.1, max_per_host=self.max_per_host),
+            search=HostRateLimiter(base_interval=self.search_interval,
+                                   min_interval=self.search_interval, max_per_host=1)
+        )
+    
+    async def _search_images_async(self, run: _AsyncFetchRun, query: str,
+                                   max_results: int) -> List[str]:
+        """Image search in a worker thread, spaced out without blocking the loop"""
+        if not HAS_DDG:
+            return []
+        async with run.search.slot(self.DDG_HOST):
+            try:
+                return await asyncio.to_thread(self._ddg_image_urls, query, max_results)
+            except Exception as e:
+                run.search.record(self.DDG_HOST, 429)  # DDGS signals rate limits as errors
+                print(f"    ⚠ DuckDuckGo error: {e}")
+                return []
+    
+    async def _download_image_async(self, run: _AsyncFetchRun, url: str, query: str,
+                                    sector_prefix: str, slide_type: str) -> Optional[FetchedImage]:
+        """Stream through the bounded pool, then decode/resize on the decode pool"""
+        try:
+            async with run.downloads, run.hosts.slot(url):
+                async with run.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                    run.hosts.record(url, resp.status, resp.headers.get('Retry-After'))
+                    if resp.status != 200 or 'image' not in resp.headers.get('content-type', ''):
+                        return None
+                    # Stream within the byte cap; header checked before the rest is read
+                    body = BoundedBody(self.decode_limits, _content_length(resp.headers))
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        if not body.feed(chunk):
+                            return None
+            img_data = body.data
+            if img_data is None:
+                return None
+        except Exception:
+            return None
+        
+        image = await asyncio.get_running_loop().run_in_executor(
+            self.decode_pool, self._process_image_bytes, img_data, query, sector_prefix,
+            slide_type, 'duckduckgo', url, "Web search result"
+        )
+        if image:
+            print(f"    ✓ Downloaded: {image.path.name}")
+        return image
+    
+    async def _gather_candidates_async(self, run: _AsyncFetchRun, sector: str, slide_type: str,
+                                       wanted: int) -> List[FetchedImage]:
+        """Download up to `wanted` candidate images for a slide (no placeholders)"""
+        queries = self._get_sector_queries(sector, slide_type)
+        sector_prefix = self._sector_key(sector)
+        all_images: List[FetchedImage] = []
         
-        # Try each query until we have enough images
         for query in queries:
-            if len(all_images) >= images_needed:
+            if len(all_images) >= wanted:
                 break
             
-            remaining = images_needed - len(all_images)
+            remaining = wanted - len(all_images)
             print(f"    🔍 Searching: '{query}'")
-            
-            # Try DuckDuckGo first (free, no rate limits) - with sector prefix!
-            images = self.fetch_with_duckduckgo(query, remaining, sector_prefix)
-            all_images.extend(images)
-            
-            # Add delay to avoid rate limiting
-            time.sleep(1.5)
-            
-            # If not enough, try icrawler
-            if len(all_images) < images_needed:
-                remaining = images_needed - len(all_images)
-                images = self.fetch_with_icrawler(query, remaining, sector_prefix)
+            urls = await self._search_images_async(run, query, remaining * 3)
+            
+            # Download candidates concurrently; keep the first ones that pass
+            tasks = [
+                asyncio.create_task(self._download_image_async(run, url, query, sector_prefix, slide_type))
+                for url in urls
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                image = await next_done
+                if image:
+                    all_images.append(image)
+                if len(all_images) >= wanted:
+                    break
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # If not enough, queue an icrawler job and await it off the event loop
+            if len(all_images) < wanted and self.crawler.available:
+                remaining = wanted - len(all_images)
+                images = await self.crawler.crawl_async(
+                    query, remaining, sector_prefix, slide_type, timeout=self.crawl_timeout
+                )
                 all_images.extend(images)
         
-        # If still not enough, create placeholders
-        while len(all_images) < images_needed:
-            placeholder = self.create_placeholder(
-                queries[0] if queries else "business",
-                sector
-            )
-            if placeholder:
-                all_images.append(placeholder)
-                print(f"    📌 Created placeholder")
-        
-        return all_images[:images_needed]
+        return all_images[:wanted]
     
-    def fetch_all_for_company(self, sector: str) -> Dict[str, List[FetchedImage]]:
+    def _fill_placeholders(self, images: List[FetchedImage], sector: str, slide_type: str,
+                           images_needed: int) -> List[FetchedImage]:
+        """Top a slide's images up to images_needed with placeholders"""
+        queries = self._get_sector_queries(sector, slide_type)
+        while len(images) < images_needed:
+            placeholder = self.create_placeholder(queries[0] if queries else "business", sector,
+                                                  len(images))
+            if not placeholder:
+                break
+            images.append(placeholder)
+            print("    📌 Created placeholder")
+        return images
+    
+    def _rank_candidates(self, sector: str, candidates: Dict[str, List[Any]],
+                         needed: Dict[str, int],
+                         weights: Dict[str, List[float]] = None) -> Dict[str, List[Any]]:
+        """Best candidates per slide, scored in one batch across all slides"""
+        return self.scorer.select(
+            candidates, needed, self.SLOT_ASPECTS,
+            prompt=f"a professional photograph of the {sector} industry",
+            weights=weights
+        )
+    
+    async def _fetch_for_slide_async(self, run: _AsyncFetchRun, sector: str, slide_type: str,
+                                     images_needed: int = 3) -> List[FetchedImage]:
+        """Async counterpart of fetch_for_slide"""
+        candidates = await self._gather_candidates_async(
+            run, sector, slide_type, images_needed * self.candidate_factor
+        )
+        ranked = await asyncio.to_thread(
+            self._rank_candidates, sector, {slide_type: candidates}, {slide_type: images_needed}
+        )
+        return await asyncio.to_thread(
+            self._fill_placeholders, ranked[slide_type], sector, slide_type, images_needed
+        )
+    
+    async def fetch_all_for_company_async(self, sector: str) -> Dict[str, List[FetchedImage]]:
         """
         Fetch all images needed for a company's teaser (all 4 slides).
-        Uses caching to avoid re-downloading same sector images.
+        Slides are searched concurrently and downloads share one bounded pool.
         
         Returns:
             Dict with keys 'slide1', 'slide2', 'slide3', 'slide4'
-            Each containing 3-4 images
         """
         print(f"\n🖼️ FETCHING IMAGES FOR SECTOR: {sector}")
         print("=" * 50)
         
+        cached = await asyncio.to_thread(self._load_cached_sector_images, sector)
+        if cached is not None:
+            return cached
+        
+        run = self._open_run()
+        try:
+            gathered = await asyncio.gather(*[
+                self._gather_candidates_async(run, sector, slide_type, count * self.candidate_factor)
+                for _, slide_type, count in self.SLIDE_TYPES
+            ])
+        finally:
+            await run.session.close()
+        
+        # Rank every candidate in one batch; a picture is used on one slide only
+        ranked = await asyncio.to_thread(
+            self._rank_candidates, sector,
+            {slide_key: images for (slide_key, _, _), images in zip(self.SLIDE_TYPES, gathered)},
+            {slide_key: count for slide_key, _, count in self.SLIDE_TYPES}
+        )
+        
         results = {}
+        for slide_key, slide_type, count in self.SLIDE_TYPES:
+            results[slide_key] = await asyncio.to_thread(
+                self._fill_placeholders, ranked[slide_key], sector, slide_type, count
+            )
+            print(f"  ✓ {slide_key}: {len(results[slide_key])} images")
         
-        # Check if we have cached images for this SPECIFIC sector ONLY
-        sector_cache_key = re.sub(r'[^\w]', '_', sector.lower())[:30]
+        total = sum(len(imgs) for imgs in results.values())
+        print(f"\n✅ Total images fetched: {total}")
         
-        slide_types = [
-            ('slide1', 'slide1_cover', 2),    # Cover needs fewer images
-            ('slide2', 'slide2_business', 2),  # Business overview (reduced)
-            ('slide3', 'slide3_finance', 1),   # Financial (charts dominate)
-            ('slide4', 'slide4_highlights', 2) # Investment highlights
-        ]
+        return results
+    
+    # (slide key, query set, images needed)
+    SLIDE_TYPES = [
+        ('slide1', 'slide1_cover', 2),    # Cover needs fewer images
+        ('slide2', 'slide2_business', 2),  # Business overview (reduced)
+        ('slide3', 'slide3_finance', 1),   # Financial (charts dominate)
+        ('slide4', 'slide4_highlights', 2) # Investment highlights
+    ]
+    
+    # Width/height of the main image box on each slide (see EnhancedKelpGenerator)
+    SLOT_ASPECTS = {'slide1': 1.375, 'slide2': 1.78, 'slide3': 1.95, 'slide4': 1.78}
+    
+    def _load_cached_sector_images(self, sector: str) -> Optional[Dict[str, List[FetchedImage]]]:
+        """Distribute stored images of THIS sector across slides, if there are enough"""
+        if not self.store:
+            return None
         
-        # ONLY use cached images that match THIS SPECIFIC sector
+        # ONLY use stored images indexed under this SPECIFIC sector
         # This prevents entertainment images appearing on manufacturing slides!
-        cached_images = list(self.cache_dir.glob(f"{sector_cache_key}*.jpg"))
-        
-        if len(cached_images) >= 7:
-            print(f"  📁 Using {len(cached_images)} sector-specific cached images")
-            # Distribute cached images across slides (DON'T randomly shuffle to keep consistency)
-            idx = 0
-            for slide_key, slide_type, count in slide_types:
-                slide_imgs = []
-                for i in range(count):
-                    if idx < len(cached_images):
-                        img_path = cached_images[idx]
-                        try:
-                            with Image.open(img_path) as img:
-                                slide_imgs.append(FetchedImage(
-                                    path=img_path,
-                                    url="",
-                                    query="cached",
-                                    source="cache",
-                                    width=img.width,
-                                    height=img.height
-                                ))
-                        except:
-                            pass
-                        idx += 1
-                results[slide_key] = slide_imgs
-                print(f"  ✓ {slide_key}: {len(slide_imgs)} images (cached)")
-        else:
-            # Fetch new images for THIS sector
-            for slide_key, slide_type, count in slide_types:
-                images = self.fetch_for_slide(sector, slide_type, count)
-                results[slide_key] = images
-                print(f"  ✓ {slide_key}: {len(images)} images")
+        sector_key = self._sector_key(sector)
+        needed = sum(count for _, _, count in self.SLIDE_TYPES)
+        if self.store.count(sector_key) < needed:
+            return None
+        
+        print("  📁 Using sector-specific stored images")
+        results = self._distribute_stored(sector_key)
+        for slide_key, slide_imgs in results.items():
+            print(f"  ✓ {slide_key}: {len(slide_imgs)} images (cached)")
         
         total = sum(len(imgs) for imgs in results.values())
         print(f"\n✅ Total images fetched: {total}")
+        return results
+    
+    def _distribute_stored(self, sector_key: str) -> Dict[str, List[FetchedImage]]:
+        """Spread the best stored images of a sector over the slides (may leave slides short)"""
+        if not self.store:
+            return {slide_key: [] for slide_key, _, _ in self.SLIDE_TYPES}
+        
+        spare = self.store.find(sector_key)  # Fills slides short of their own images
+        candidates, weights = {}, {}
+        for slide_key, slide_type, _ in self.SLIDE_TYPES:
+            own = self.store.find(sector_key, slide_type)
+            own_digests = {stored.digest for stored in own}
+            others = [stored for stored in spare if stored.digest not in own_digests]
+            candidates[slide_key] = [self._to_fetched(stored, source="cache") for stored in own + others]
+            # Prefer images fetched for each slide
+            weights[slide_key] = [1.0] * len(own) + [0.85] * len(others)
         
+        results = self._rank_candidates(
+            sector_key.replace('_', ' '), candidates,
+            {slide_key: count for slide_key, _, count in self.SLIDE_TYPES}, weights
+        )
+        used = {self._digest_of(img.path) for imgs in results.values() for img in imgs}
+        if used:
+            self.store.touch(list(used))  # Keep images in use ahead of LRU eviction
         return results
+    
+    @staticmethod
+    def _digest_of(path: Path) -> str:
+        return Path(path).stem  # Store objects are named by their digest
+    
+    def images_from_pack(self, sector: str, codename: str) -> Optional[Dict[str, List[Path]]]:
+        """
+        Slide image paths from the sector's image pack, chosen deterministically
+        for the codename; None if the sector has no pack.
+        """
+        pack = self.packs.get(sector)
+        if pack is None:
+            return None
+        selected = pack.select(codename, {slide_type: count for _, slide_type, count in self.SLIDE_TYPES})
+        return {slide_key: selected[slide_type] for slide_key, slide_type, _ in self.SLIDE_TYPES}
+    
+    def fallback_images_for_company(self, sector: str) -> Dict[str, List[FetchedImage]]:
+        """
+        Images for all 4 slides without any network access: whatever is stored
+        for the sector, topped up with placeholders. Used when a prefetch misses
+        its deadline.
+        """
+        results = self._distribute_stored(self._sector_key(sector))
+        for slide_key, slide_type, count in self.SLIDE_TYPES:
+            slide_imgs = results[slide_key]
+            queries = self._get_sector_queries(sector, slide_type)
+            while len(slide_imgs) < count:
+                placeholder = self.create_placeholder(queries[0] if queries else "business",
+                                                      sector, len(slide_imgs))
+                if not placeholder:
+                    break
+                slide_imgs.append(placeholder)
+        return results
+    
+    def fetch_all_for_company(self, sector: str) -> Dict[str, List[FetchedImage]]:
+        """
+        Fetch all images needed for a company's teaser (all 4 slides).
+        Uses caching to avoid re-downloading same sector images.
+        Blocking wrapper around fetch_all_for_company_async for sync callers.
+        
+        Returns:
+            Dict with keys 'slide1', 'slide2', 'slide3', 'slide4'
+            Each containing 3-4 images
+        """
+        return asyncio.run(self.fetch_all_for_company_async(sector))
 
 
 # ============================================================================
@@ -652,83 +842,50 @@ class JanusImageGenerator:
     """
     Uses local Janus AI model to GENERATE sector images.
     This is a fallback when web scraping fails.
+
+    Generation goes through the shared BatchImageGenerator: the model stays
+    resident across companies and outputs are cached by (prompt, seed, size).
     """
     
     def __init__(self, cache_dir: Path = None):
         self.cache_dir = cache_dir or OUTPUT_DIR / "janus_images"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.model_loaded = False
-        self.model = None
-        self.processor = None
+        self.generator = None
     
     def _load_model(self):
-        """Load Janus model if available"""
-        if self.model_loaded:
-            return True
-            
-        try:
-            import torch
-            from transformers import AutoModelForCausalLM, AutoProcessor
-            
-            print("  🔄 Loading Janus-Pro-7B model...")
-            
-            # Check for model
-            model_path = "deepseek-ai/Janus-Pro-7B"
-            
-            self.processor = AutoProcessor.from_pretrained(model_path)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                model_path,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                trust_remote_code=True
-            )
-            
-            self.model_loaded = True
-            print("  ✓ Janus model loaded!")
-            return True
-            
-        except Exception as e:
-            print(f"  ⚠ Janus not available: {e}")
-            return False
+        """Attach the resident Janus batch generator if available"""
+        if self.generator is None:
+            try:
+                from src.vision.janus_image_batch import BatchImageGenerator  # src.vision needs torch
+            except ImportError as e:
+                print(f"  ⚠ Janus not available: {e}")
+                return False
+            self.generator = BatchImageGenerator(cache_dir=self.cache_dir)
+        return self.generator.available
+    
+    @staticmethod
+    def _full_prompt(prompt: str) -> str:
+        return f"Generate a professional photograph for business presentation: {prompt}. Style: corporate, high quality, no text or logos."
     
-    def generate_sector_image(self, prompt: str, sector: str) -> Optional[Path]:
+    def generate_sector_images(self, prompts: List[str], sector: str, seed: int = 0) -> List[Optional[Path]]:
+        """Generate images for several prompts in shared forward batches"""
+        if not self._load_model():
+            return [None] * len(prompts)
+        return self.generator.generate([self._full_prompt(p) for p in prompts], [seed] * len(prompts))
+    
+    def generate_sector_image(self, prompt: str, sector: str, seed: int = 0) -> Optional[Path]:
         """Generate an image using Janus"""
+        return self.generate_sector_images([prompt], sector, seed)[0]
+    
+    def pregenerate_library(self, seeds_per_prompt: int = 1):
+        """Fill the image cache for every sector query in the background (returns a Future)"""
         if not self._load_model():
             return None
-        
-        try:
-            import torch
-            
-            # Build generation prompt
-            full_prompt = f"Generate a professional photograph for business presentation: {prompt}. Style: corporate, high quality, no text or logos."
-            
-            # Generate
-            inputs = self.processor(full_prompt, return_tensors="pt").to(self.model.device)
-            
-            with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    max_new_tokens=1024,
-                    do_sample=True,
-                    temperature=0.7
-                )
-            
-            # Extract image from outputs
-            # Note: This depends on Janus output format
-            # May need adjustment based on actual model API
-            
-            safe_prompt = re.sub(r'[^\w\-]', '_', prompt)[:30]
-            filename = f"janus_{safe_prompt}_{random.randint(1000, 9999)}.png"
-            filepath = self.cache_dir / filename
-            
-            # Save generated image
-            # (Implementation depends on Janus output format)
-            
-            return filepath
-            
-        except Exception as e:
-            print(f"  ⚠ Janus generation failed: {e}")
-            return None
+        library = {
+            sector: [self._full_prompt(q) for queries in slides.values() for q in queries]
+            for sector, slides in SECTOR_IMAGE_QUERIES.items()
+        }
+        return self.generator.pregenerate_library(library, seeds_per_prompt)
 
 
 # ============================================================================
@@ -0,0 +1,141 @@
+"""
+Memory-Bounded Image Decode
+===========================
+Download and decode limits for web images, so a few large camera JPEGs in
+flight cannot spike memory.
+
+- Bodies are streamed in chunks: a Content-Length over the byte cap is
+  refused before reading, and the image header is probed from the first
+  chunks, so undersized or oversized (pixel count) images are dropped
+  before the rest of the body is downloaded
+- JPEGs are decoded with PIL draft mode, which downscales in the DCT domain
+  (by up to 8x) instead of materialising the full-resolution bitmap
+- The final resize uses reducing_gap, so large non-JPEG images are first
+  reduced by an integer factor before the LANCZOS pass
+
+Decoding itself runs on a small dedicated worker pool in the fetcher, which
+bounds how many decoded bitmaps exist at once.
+"""
+import io
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class DecodeLimits:
+    """Per-image limits for download and decode"""
+    max_bytes: int = 8 * 1024 * 1024          # Body cap
+    max_pixels: int = 50_000_000              # Source pixel cap (checked from the header)
+    min_size: Tuple[int, int] = (400, 300)    # Smaller images are not worth a slide
+    target: Tuple[int, int] = (1920, 1080)    # Decoded images fit inside this box
+    probe_bytes: int = 256 * 1024             # Header must be found within this prefix
+
+    def accepts(self, width: int, height: int) -> bool:
+        return (width >= self.min_size[0] and height >= self.min_size[1]
+                and width * height <= self.max_pixels)
+
+
+def probe_header(head: bytes) -> Optional[Tuple[str, int, int]]:
+    """(format, width, height) from the start of an image, or None if not readable yet"""
+    try:
+        with Image.open(io.BytesIO(head)) as img:
+            return img.format, img.width, img.height
+    except Exception:
+        return None
+
+
+class BoundedBody:
+    """
+    Collects a streamed response body within DecodeLimits.
+
+    feed() returns False as soon as the download should be abandoned: body
+    over the byte cap, image dimensions outside the limits, or no image
+    header within probe_bytes.
+    """
+
+    def __init__(self, limits: DecodeLimits, content_length: Optional[int] = None):
+        self.limits = limits
+        self.buffer = bytearray()
+        self.header: Optional[Tuple[str, int, int]] = None
+        self.rejected = content_length is not None and content_length > limits.max_bytes
+
+    def feed(self, chunk: bytes) -> bool:
+        if self.rejected:
+            return False
+        self.buffer += chunk
+        if len(self.buffer) > self.limits.max_bytes:
+            self.rejected = True
+        elif self.header is None:
+            self.header = probe_header(bytes(self.buffer))
+            if self.header is not None:
+                self.rejected = not self.limits.accepts(self.header[1], self.header[2])
+            elif len(self.buffer) >= self.limits.probe_bytes:
+                self.rejected = True
+        return not self.rejected
+
+    @property
+    def data(self) -> Optional[bytes]:
+        """Complete body, or None if it was rejected or never looked like an image"""
+        if self.rejected or self.header is None:
+            return None
+        return bytes(self.buffer)
+
+
+def decode_bounded(data: bytes, limits: DecodeLimits = None) -> Optional["Image.Image"]:
+    """
+    Decode image bytes to an RGB image that fits limits.target, without a
+    full-resolution decode for JPEGs. None if the image is outside the limits
+    or cannot be decoded.
+    """
+    limits = limits or DecodeLimits()
+    try:
+        img = Image.open(io.BytesIO(data))
+        width, height = img.size
+        if not limits.accepts(width, height):
+            return None
+
+        scale = min(limits.target[0] / width, limits.target[1] / height, 1.0)
+        if img.format == 'JPEG' and scale < 1.0:
+            # Decoder picks the smallest 1/2, 1/4 or 1/8 scale that still covers this size
+            img.draft('RGB', (math.ceil(width * scale), math.ceil(height * scale)))
+
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        img.thumbnail(limits.target, Image.LANCZOS, reducing_gap=3.0)
+        return img
+    except Exception:
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import resource
+
+    # Peak memory of decoding one large camera-sized JPEG, bounded vs full decode
+    source = Image.new('RGB', (6000, 4000), (90, 120, 160))
+    buf = io.BytesIO()
+    source.save(buf, "JPEG", quality=90)
+    data = buf.getvalue()
+    del source, buf
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else "bounded"
+    start = time.perf_counter()
+    if mode == "full":
+        img = Image.open(io.BytesIO(data)).convert('RGB')
+        img.thumbnail((1920, 1080), Image.LANCZOS)
+    else:
+        img = decode_bounded(data)
+    elapsed = (time.perf_counter() - start) * 1000
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode}: {img.size} in {elapsed:.0f} ms, peak RSS {peak_mb:.0f} MB")
@@ -0,0 +1,326 @@
+"""
+Sector Image Packs
+==================
+Curated, pre-sized image library per sector in a single archive, so
+production runs need no network access for images.
+
+Pack file (<sector_key>.kpack):
+    b"KELPPACK" | version u32 | index offset u64 | index length u64
+    JPEG blobs, back to back
+    JSON index: sector, build time, and per image its slide type, blob
+    offset/length, size, sha1, query, source and licence
+
+Packs are built from the image store (FreeImageFetcher downloads and
+ImageSourcer results), ranked by ImageScorer and resized to fit 1600x900.
+Readers memory-map the pack and copy out only the images a deck uses.
+
+Selection is deterministic per company codename (rendezvous hashing of
+codename and image hash), so a deck always gets the same images, different
+companies spread across the pack, and adding images to a pack only moves
+a few selections.
+
+    python src/image_intelligence/image_packs.py build --sector "Pharmaceuticals" [--offline]
+    python src/image_intelligence/image_packs.py build --all
+    python src/image_intelligence/image_packs.py list
+"""
+import io
+import re
+import json
+import mmap
+import time
+import struct
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+import sys
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+MAGIC = b"KELPPACK"
+VERSION = 1
+_HEADER = struct.Struct("<8sIQQ")
+
+PACK_DIR = OUTPUT_DIR / "image_packs"
+PACK_IMAGE_SIZE = (1600, 900)  # Largest slot at 150 DPI is ~5.5in wide
+
+
+@dataclass
+class PackImage:
+    """Index entry of one image in a pack"""
+    sha1: str
+    slide_type: str
+    offset: int
+    length: int
+    width: int
+    height: int
+    query: str = ""
+    source: str = ""
+    source_url: str = ""
+    license_info: str = ""
+
+
+def pack_path(sector: str, pack_dir: Path = None) -> Path:
+    """Pack file for a sector (same sector key as the image store)"""
+    sector_key = re.sub(r'[^\w]', '_', sector.lower())[:30]
+    return (pack_dir or PACK_DIR) / f"{sector_key}.kpack"
+
+
+# ============================================================================
+# READER
+# ============================================================================
+
+class ImagePack:
+    """
+    Memory-mapped reader for one sector pack.
+
+    Usage:
+        pack = ImagePack(pack_path("Pharmaceuticals"))
+        paths = pack.select("AURORA", {"slide1_cover": 2, "slide3_finance": 1})
+    """
+
+    def __init__(self, path: Path, extract_dir: Path = None):
+        self.path = Path(path)
+        self.extract_dir = extract_dir or self.path.parent / "extracted"
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, index_offset, index_length = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{self.path.name} is not a version {VERSION} image pack")
+            index = json.loads(self._map[index_offset:index_offset + index_length])
+        except Exception:
+            self._file.close()
+            raise
+        self.sector = index['sector']
+        self.built_at = index['built_at']
+        self.images = [PackImage(**entry) for entry in index['images']]
+
+    def read(self, image: PackImage) -> memoryview:
+        """Image bytes straight from the mapping (no copy)"""
+        return memoryview(self._map)[image.offset:image.offset + image.length]
+
+    def extract(self, image: PackImage) -> Path:
+        """File for an image, written once under extract_dir (content-addressed)"""
+        path = self.extract_dir / f"{image.sha1}.jpg"
+        if not path.exists():
+            self.extract_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            with open(tmp, 'wb') as f, self.read(image) as view:
+                f.write(view)
+            tmp.replace(path)
+        return path
+
+    def select(self, codename: str, counts: Dict[str, int]) -> Dict[str, List[Path]]:
+        """
+        Deterministic images per slide type for a codename. Slide types short
+        of their own images borrow from the rest of the pack; an image is used
+        once per deck.
+        """
+        def rank(images: List[PackImage]) -> List[PackImage]:
+            return sorted(images, key=lambda im: hashlib.sha1(
+                f"{codename}|{im.sha1}".encode('utf-8')).digest())
+
+        used = set()
+        selected: Dict[str, List[Path]] = {}
+        everything = rank(self.images)
+        for slide_type, count in counts.items():
+            own = rank([im for im in self.images if im.slide_type == slide_type])
+            picks = []
+            for image in own + everything:
+                if len(picks) >= count:
+                    break
+                if image.sha1 not in used:
+                    used.add(image.sha1)
+                    picks.append(image)
+            selected[slide_type] = [self.extract(image) for image in picks]
+        return selected
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+class ImagePackLibrary:
+    """Opens sector packs on demand and keeps them mapped for the process"""
+
+    def __init__(self, pack_dir: Path = None):
+        self.pack_dir = pack_dir or PACK_DIR
+        self._packs: Dict[str, Optional[ImagePack]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, sector: str) -> Optional[ImagePack]:
+        path = pack_path(sector, self.pack_dir)
+        with self._lock:
+            if path.name not in self._packs:
+                pack = None
+                if path.exists():
+                    try:
+                        pack = ImagePack(path)
+                    except Exception as e:
+                        print(f"  ⚠ Image pack {path.name} unreadable: {e}")
+                self._packs[path.name] = pack
+            return self._packs[path.name]
+
+    def has(self, sector: str) -> bool:
+        return self.get(sector) is not None
+
+
+# ============================================================================
+# BUILDER
+# ============================================================================
+
+def write_pack(path: Path, sector: str, images: List[Tuple[bytes, Dict]]) -> int:
+    """
+    Write a pack from (jpeg bytes, metadata) pairs; metadata holds slide_type,
+    width, height and optionally query/source/source_url/license_info.
+    Returns the number of images written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    entries = []
+    seen = set()
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        for data, meta in images:
+            digest = hashlib.sha1(data).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            entries.append(PackImage(sha1=digest, offset=f.tell(), length=len(data), **meta))
+            f.write(data)
+
+        index = json.dumps({
+            'sector': sector,
+            'built_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'images': [asdict(entry) for entry in entries],
+        }).encode('utf-8')
+        index_offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, index_offset, len(index)))
+    tmp.replace(path)
+    return len(entries)
+
+
+def _presized_jpeg(path: Path, quality: int = 85) -> Optional[Tuple[bytes, int, int]]:
+    try:
+        with Image.open(path) as img:
+            img.draft('RGB', PACK_IMAGE_SIZE)
+            img = img.convert('RGB')
+        img.thumbnail(PACK_IMAGE_SIZE, Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=quality, optimize=True)
+        return buf.getvalue(), img.width, img.height
+    except Exception as e:
+        print(f"    ⚠ Skipping {Path(path).name}: {e}")
+        return None
+
+
+# ImageSourcer slide keys -> FreeImageFetcher slide types
+_SOURCER_SLIDES = {"slide1": "slide1_cover", "slide2": "slide2_business", "slide3": "slide4_highlights"}
+
+
+def build_sector_pack(sector: str, fetcher=None, sourcer=None, per_slide: int = 6,
+                      offline: bool = False, pack_dir: Path = None) -> Optional[Path]:
+    """
+    Build (or rebuild) a sector's pack.
+
+    Unless offline, the sector is first fetched live (FreeImageFetcher) and
+    ImageSourcer results are downloaded into the image store. The pack then
+    takes the best `per_slide` stored images per slide type.
+    """
+    from src.image_intelligence.free_image_fetcher import FreeImageFetcher
+    from src.image_intelligence.image_sourcer import ImageSourcer
+
+    if not HAS_PIL:
+        return None
+    fetcher = fetcher or FreeImageFetcher()
+    if not fetcher.store:
+        return None
+    sector_key = fetcher._sector_key(sector)
+
+    if not offline:
+        fetcher.fetch_all_for_company(sector)
+        sourcer = sourcer or ImageSourcer()
+        for slide_key, results in sourcer.get_sector_images(sector).items():
+            for result in results:
+                if result.source != 'placeholder':
+                    fetcher._download_image(result.download_url or result.url, result.description,
+                                            sector_key, _SOURCER_SLIDES.get(slide_key, ""))
+
+    stored = fetcher.store.find(sector_key)
+    if not stored:
+        print(f"  ⚠ No stored images for {sector}; nothing to pack")
+        return None
+
+    # Best images per slide type; untyped images (e.g. legacy cache) go to every slide
+    slide_types = [slide_type for _, slide_type, _ in fetcher.SLIDE_TYPES]
+    candidates = {
+        slide_type: [fetcher._to_fetched(s) for s in stored if s.slide_type in (slide_type, "")]
+        for slide_type in slide_types
+    }
+    slot_aspects = {slide_type: fetcher.SLOT_ASPECTS[slide_key]
+                    for slide_key, slide_type, _ in fetcher.SLIDE_TYPES}
+    ranked = fetcher.scorer.select(
+        candidates, {slide_type: per_slide for slide_type in slide_types}, slot_aspects,
+        prompt=f"a professional photograph of the {sector} industry"
+    )
+
+    images = []
+    for slide_type, picks in ranked.items():
+        for image in picks:
+            sized = _presized_jpeg(image.path)
+            if sized:
+                data, width, height = sized
+                images.append((data, {
+                    'slide_type': slide_type, 'width': width, 'height': height,
+                    'query': image.query, 'source': image.source,
+                    'source_url': image.url, 'license_info': image.license_info
+                }))
+
+    path = pack_path(sector, pack_dir)
+    count = write_pack(path, sector, images)
+    print(f"  📦 {path.name}: {count} images, {path.stat().st_size / 1e6:.1f} MB")
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sector image packs")
+    parser.add_argument("command", choices=["build", "list"])
+    parser.add_argument("--sector", help="Sector name (build)")
+    parser.add_argument("--all", action="store_true", help="Build every known sector")
+    parser.add_argument("--per-slide", type=int, default=6, help="Images per slide type")
+    parser.add_argument("--offline", action="store_true",
+                        help="Pack only what is already in the image store")
+    parser.add_argument("--dir", type=Path, default=PACK_DIR, help="Pack directory")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for path in sorted(args.dir.glob("*.kpack")):
+            pack = ImagePack(path)
+            by_slide: Dict[str, int] = {}
+            for image in pack.images:
+                by_slide[image.slide_type] = by_slide.get(image.slide_type, 0) + 1
+            print(f"{path.name}: {pack.sector} | {len(pack.images)} images | built {pack.built_at} | {by_slide}")
+            pack.close()
+    else:
+        from src.image_intelligence.free_image_fetcher import FreeImageFetcher, SECTOR_IMAGE_QUERIES
+        sectors = list(SECTOR_IMAGE_QUERIES) if args.all else [args.sector]
+        if not sectors[0]:
+            parser.error("build needs --sector or --all")
+        fetcher = FreeImageFetcher()
+        for sector in sectors:
+            build_sector_pack(sector, fetcher, per_slide=args.per_slide,
+                              offline=args.offline, pack_dir=args.dir)
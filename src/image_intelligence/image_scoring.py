@@ -0,0 +1,290 @@
+"""
+Image Quality and Relevance Scoring
+===================================
+Ranks candidate images for slide slots from cheap features, computed for all
+candidates at once on small square thumbnails:
+
+- sharpness:   variance of the Laplacian (blurred images score low)
+- entropy:     colour histogram entropy (flat, blank or clip-art images score low)
+- aspect fit:  fraction of the image that survives cropping to the slot
+- uniqueness:  pHash distance to images already picked for the deck
+- relevance:   optional CLIP similarity to the sector prompt (CPU), enabled
+               with use_clip=True or KELP_IMAGE_CLIP=1 when transformers and
+               torch are installed
+
+Each image is decoded once (JPEG draft mode). Everything after that is
+batched NumPy over the stacked thumbnails.
+"""
+import os
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import sys
+
+try:
+    import numpy as np
+    from PIL import Image
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import torch
+    from transformers import CLIPModel, CLIPProcessor
+    HAS_CLIP = True
+except Exception:  # A broken torch install raises more than ImportError
+    HAS_CLIP = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from src.image_intelligence.image_store import HASH_SIZE, _dct_matrix
+
+
+THUMB_SIZE = 256     # Feature thumbnails (square; large enough to see blur)
+CLIP_SIZE = 224
+CLIP_MODEL = "openai/clip-vit-base-patch32"
+
+# Relative weights of the quality terms (relevance only when CLIP is on)
+WEIGHTS = {'sharpness': 0.30, 'entropy': 0.20, 'aspect_fit': 0.25, 'relevance': 0.25}
+
+
+@dataclass
+class ImageScore:
+    """Features and final score of one candidate"""
+    path: Path
+    sharpness: float             # Laplacian variance on the grey thumbnail
+    entropy: float               # Colour entropy in bits (0-9)
+    aspect_fit: float            # 0-1, share of the image kept when cropped to the slot
+    uniqueness: float            # 0-1, pHash distance to the nearest other image / 16
+    relevance: Optional[float]   # CLIP cosine similarity, None when disabled
+    total: float
+
+
+# ============================================================================
+# BATCH FEATURES
+# ============================================================================
+
+def laplacian_variance(grey: "np.ndarray") -> "np.ndarray":
+    """Per-image variance of the 4-neighbour Laplacian, for (N, H, W) arrays"""
+    lap = (grey[:, :-2, 1:-1] + grey[:, 2:, 1:-1] + grey[:, 1:-1, :-2] + grey[:, 1:-1, 2:]
+           - 4 * grey[:, 1:-1, 1:-1])
+    return lap.reshape(len(grey), -1).var(axis=1)
+
+
+def colour_entropy(rgb: "np.ndarray") -> "np.ndarray":
+    """Entropy (bits) of a 512-bin colour histogram per image, for (N, H, W, 3) uint8"""
+    n = len(rgb)
+    bins = ((rgb[..., 0] >> 5).astype(np.int32) << 6) | ((rgb[..., 1] >> 5) << 3) | (rgb[..., 2] >> 5)
+    offsets = (np.arange(n, dtype=np.int64) * 512)[:, None]
+    counts = np.bincount((bins.reshape(n, -1) + offsets).ravel(), minlength=n * 512).reshape(n, 512)
+    p = counts / counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -np.nansum(np.where(p > 0, p * np.log2(p), 0.0), axis=1)
+
+
+def aspect_fit(aspects: "np.ndarray", target: float) -> "np.ndarray":
+    """Share of each image kept when centre-cropped to the target aspect ratio"""
+    return np.minimum(aspects / target, target / aspects)
+
+
+def batch_phash(grey32: "np.ndarray") -> "np.ndarray":
+    """pHash bits for (N, 32, 32) grey arrays as an (N, 64) bool array"""
+    m = _dct_matrix(grey32.shape[1])
+    low = np.einsum('ij,njk,lk->nil', m, grey32, m)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(grey32), -1)
+    return low > np.median(low[:, 1:], axis=1, keepdims=True)
+
+
+def hamming_matrix(bits: "np.ndarray") -> "np.ndarray":
+    """Pairwise Hamming distances between rows of an (N, 64) bool array"""
+    b = bits.astype(np.int16)
+    return b @ (1 - b).T + (1 - b) @ b.T
+
+
+# ============================================================================
+# SCORER
+# ============================================================================
+
+class ImageScorer:
+    """
+    Ranks candidate images per slide in one batch.
+
+    Usage:
+        scorer = ImageScorer()
+        picked = scorer.select({'slide1': candidates}, {'slide1': 2},
+                               {'slide1': 1.6}, prompt="manufacturing plant")
+    """
+
+    def __init__(self, use_clip: bool = None, clip_model: str = CLIP_MODEL,
+                 min_distance: int = 6):
+        if use_clip is None:
+            use_clip = os.environ.get('KELP_IMAGE_CLIP', '') == '1'
+        self.use_clip = use_clip and HAS_CLIP and HAS_NUMPY
+        self.clip_model_name = clip_model
+        self.min_distance = min_distance  # Candidates this close to a picked image are skipped
+        self._clip = None
+
+    @property
+    def available(self) -> bool:
+        return HAS_NUMPY
+
+    def _load(self, paths: Sequence[Path]):
+        """Decode each image once into feature and (optional) CLIP thumbnails"""
+        rgb, grey32, aspects, clip_images, ok = [], [], [], [], []
+        draft_size = CLIP_SIZE if self.use_clip else THUMB_SIZE
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    aspect = img.width / img.height
+                    img.draft('RGB', (draft_size, draft_size))
+                    img = img.convert('RGB')
+                side = min(img.size)  # Central square, so edges are not stretched
+                box = ((img.width - side) // 2, (img.height - side) // 2,
+                       (img.width + side) // 2, (img.height + side) // 2)
+                thumb = img.resize((THUMB_SIZE, THUMB_SIZE), Image.BILINEAR, box=box)
+                small = thumb.convert('L').resize((32, 32), Image.BILINEAR)
+                clip_img = img.resize((CLIP_SIZE, CLIP_SIZE), Image.BICUBIC) if self.use_clip else None
+                rgb.append(np.asarray(thumb))
+                grey32.append(np.asarray(small))
+                aspects.append(aspect)
+                clip_images.append(clip_img)
+                ok.append(True)
+            except Exception:
+                rgb.append(np.zeros((THUMB_SIZE, THUMB_SIZE, 3), np.uint8))
+                grey32.append(np.zeros((32, 32), np.uint8))
+                aspects.append(1.0)
+                clip_images.append(Image.new('RGB', (CLIP_SIZE, CLIP_SIZE)))
+                ok.append(False)
+        return (np.stack(rgb), np.stack(grey32).astype(np.float64),
+                np.asarray(aspects), clip_images, np.asarray(ok))
+
+    def _relevance(self, images: List["Image.Image"], prompt: str) -> Optional["np.ndarray"]:
+        """CLIP cosine similarity of every image to the prompt (one forward pass)"""
+        try:
+            if self._clip is None:
+                self._clip = (CLIPModel.from_pretrained(self.clip_model_name).eval(),
+                              CLIPProcessor.from_pretrained(self.clip_model_name))
+            model, processor = self._clip
+            inputs = processor(text=[prompt], images=images, return_tensors="pt", padding=True)
+            with torch.inference_mode():
+                out = model(**inputs)
+            img = torch.nn.functional.normalize(out.image_embeds, dim=-1)
+            txt = torch.nn.functional.normalize(out.text_embeds, dim=-1)
+            return (img @ txt.T).squeeze(-1).numpy()
+        except Exception as e:
+            print(f"    ⚠ CLIP scoring unavailable: {e}")
+            self.use_clip = False
+            return None
+
+    def features(self, paths: Sequence[Path], prompt: str = "") -> Dict[str, "np.ndarray"]:
+        """Quality features for all paths in one batch (aspect ratios, not slot fit)"""
+        rgb, grey32, aspects, clip_images, ok = self._load(paths)
+        grey = rgb.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        feats = {
+            'ok': ok,
+            'aspect': aspects,
+            'sharpness': laplacian_variance(grey),
+            'entropy': colour_entropy(rgb),
+            'phash': batch_phash(grey32),
+            'relevance': None,
+        }
+        if self.use_clip and prompt:
+            feats['relevance'] = self._relevance(clip_images, prompt)
+        return feats
+
+    @staticmethod
+    def quality(feats: Dict[str, "np.ndarray"], target_aspect: float) -> Dict[str, "np.ndarray"]:
+        """Normalised 0-1 terms for one slot aspect ratio"""
+        terms = {
+            'sharpness': 1 - np.exp(-feats['sharpness'] / 100.0),
+            'entropy': np.clip(feats['entropy'] / 6.0, 0, 1),
+            'aspect_fit': aspect_fit(feats['aspect'], target_aspect),
+        }
+        if feats['relevance'] is not None:
+            terms['relevance'] = np.clip((feats['relevance'] - 0.15) / 0.15, 0, 1)
+        return terms
+
+    def select(self, candidates: Dict[str, List[Any]], needed: Dict[str, int],
+               slot_aspects: Dict[str, float] = None, prompt: str = "",
+               weights: Dict[str, List[float]] = None) -> Dict[str, List[Any]]:
+        """
+        Pick the best `needed[slide]` candidates for each slide.
+
+        Candidates are objects with a .path (the same file may be offered to
+        several slides; features are computed once per file). Slides are
+        filled in order and a file, or anything within min_distance of an
+        already picked image, is used at most once per deck. `weights`
+        optionally scales scores per candidate (e.g. to prefer images fetched
+        for that slide).
+        """
+        if not HAS_NUMPY:
+            return {slide: items[:needed.get(slide, 0)] for slide, items in candidates.items()}
+
+        unique: Dict[Path, int] = {}
+        for items in candidates.values():
+            for item in items:
+                unique.setdefault(Path(item.path), len(unique))
+        if not unique:
+            return {slide: [] for slide in candidates}
+
+        feats = self.features(list(unique), prompt)
+        distances = hamming_matrix(feats['phash'])
+        picked_idx: List[int] = []
+        selected: Dict[str, List[Any]] = {}
+
+        for slide, items in candidates.items():
+            idx = np.array([unique[Path(item.path)] for item in items], dtype=np.int64)
+            terms = self.quality(feats, (slot_aspects or {}).get(slide, 1.6))
+            total_weight = sum(WEIGHTS[k] for k in terms)
+            base = sum(WEIGHTS[k] * terms[k] for k in terms) / total_weight
+            scores = base[idx] * np.asarray((weights or {}).get(slide, [1.0] * len(items)))
+            scores[~feats['ok'][idx]] = -1
+
+            chosen = []
+            for order in np.argsort(-scores, kind='stable'):
+                if len(chosen) >= needed.get(slide, 0) or scores[order] < 0:
+                    break
+                i = idx[order]
+                if picked_idx and distances[i, picked_idx].min() <= self.min_distance:
+                    continue  # Same picture (or a near copy) is already in the deck
+                picked_idx.append(i)
+                chosen.append(items[order])
+            selected[slide] = chosen
+        return selected
+
+    def score(self, paths: Sequence[Path], target_aspect: float = 1.6,
+              prompt: str = "") -> List[ImageScore]:
+        """Scores for a list of images, best first (for inspection and tuning)"""
+        feats = self.features(paths, prompt)
+        terms = self.quality(feats, target_aspect)
+        total_weight = sum(WEIGHTS[k] for k in terms)
+        base = sum(WEIGHTS[k] * terms[k] for k in terms) / total_weight
+        distances = hamming_matrix(feats['phash'])
+        np.fill_diagonal(distances, 64)
+        results = [
+            ImageScore(
+                path=Path(path),
+                sharpness=float(feats['sharpness'][i]),
+                entropy=float(feats['entropy'][i]),
+                aspect_fit=float(terms['aspect_fit'][i]),
+                uniqueness=float(min(distances[i].min(), 16) / 16) if len(paths) > 1 else 1.0,
+                relevance=float(feats['relevance'][i]) if feats['relevance'] is not None else None,
+                total=float(base[i]) if feats['ok'][i] else 0.0
+            )
+            for i, path in enumerate(paths)
+        ]
+        return sorted(results, key=lambda s: s.total, reverse=True)
+
+
+if __name__ == "__main__":
+    import time
+
+    paths = [Path(p) for p in sys.argv[1:]]
+    if not paths:
+        print("Usage: python src/image_intelligence/image_scoring.py IMAGE [IMAGE ...]")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    scores = ImageScorer().score(paths)
+    print(f"Scored {len(paths)} images in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    for s in scores:
+        print(f"{s.total:.2f}  sharp={s.sharpness:7.1f}  entropy={s.entropy:.2f}  "
+              f"fit={s.aspect_fit:.2f}  unique={s.uniqueness:.2f}  {s.path.name}")
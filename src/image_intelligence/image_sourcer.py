@@ -1,20 +1,31 @@
 """
 Image Intelligence Module - Sources and manages images for investment teasers
 Uses free APIs (Unsplash, Pexels) to source sector-appropriate generic images
+
+Providers are queried concurrently and the first N good results win, so a
+search takes as long as the fastest providers rather than all of them in
+turn. Results are cached on disk per query with a TTL, and each provider's
+hourly request quota is tracked across runs. LocalImageProvider is an
+offline stand-in with the same interface for tests and benchmarks.
 """
 import os
 import re
 import json
+import time
 import hashlib
-import urllib.request
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 import sys
 
+import requests
+
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from config.settings import IMAGE_CONFIG, SECTOR_CONFIGS
+from config.settings import IMAGE_CONFIG, SECTOR_CONFIGS, OUTPUT_DIR
+from src.web_scraping.http_replay import wrap_requests_session
 
 
 @dataclass
@@ -114,10 +125,14 @@ class UnsplashClient:
     """Client for Unsplash API"""
     
     BASE_URL = "https://api.unsplash.com"
+    name = "unsplash"
+    quota_limit = 50  # Requests per hour (demo apps)
     
     def __init__(self, access_key: str = None):
         self.access_key = access_key or os.environ.get('UNSPLASH_ACCESS_KEY')
         self.available = bool(self.access_key)
+        self.session = wrap_requests_session(requests.Session())
+        self.rate_limit_remaining: Optional[int] = None  # From the last response
     
     def search(self, query: str, per_page: int = 3) -> List[ImageResult]:
         """Search for images"""
@@ -125,15 +140,15 @@ class UnsplashClient:
             return []
         
         try:
-            url = f"{self.BASE_URL}/search/photos"
-            params = f"query={urllib.parse.quote(query)}&per_page={per_page}&orientation=landscape"
-            full_url = f"{url}?{params}"
-            
-            req = urllib.request.Request(full_url)
-            req.add_header('Authorization', f'Client-ID {self.access_key}')
-            
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
+            response = self.session.get(
+                f"{self.BASE_URL}/search/photos",
+                params={'query': query, 'per_page': per_page, 'orientation': 'landscape'},
+                headers={'Authorization': f'Client-ID {self.access_key}'},
+                timeout=10
+            )
+            self.rate_limit_remaining = _remaining_quota(response)
+            response.raise_for_status()
+            data = response.json()
                 
             results = []
             for photo in data.get('results', []):
@@ -159,10 +174,14 @@ class PexelsClient:
     """Client for Pexels API"""
     
     BASE_URL = "https://api.pexels.com/v1"
+    name = "pexels"
+    quota_limit = 200  # Requests per hour
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.environ.get('PEXELS_API_KEY')
         self.available = bool(self.api_key)
+        self.session = wrap_requests_session(requests.Session())
+        self.rate_limit_remaining: Optional[int] = None  # From the last response
     
     def search(self, query: str, per_page: int = 3) -> List[ImageResult]:
         """Search for images"""
@@ -170,15 +189,15 @@ class PexelsClient:
             return []
         
         try:
-            url = f"{self.BASE_URL}/search"
-            params = f"query={urllib.parse.quote(query)}&per_page={per_page}&orientation=landscape"
-            full_url = f"{url}?{params}"
-            
-            req = urllib.request.Request(full_url)
-            req.add_header('Authorization', self.api_key)
-            
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode())
+            response = self.session.get(
+                f"{self.BASE_URL}/search",
+                params={'query': query, 'per_page': per_page, 'orientation': 'landscape'},
+                headers={'Authorization': self.api_key},
+                timeout=10
+            )
+            self.rate_limit_remaining = _remaining_quota(response)
+            response.raise_for_status()
+            data = response.json()
                 
             results = []
             for photo in data.get('photos', []):
@@ -200,6 +219,84 @@ class PexelsClient:
             return []
 
 
+class LocalImageProvider:
+    """
+    Offline provider with the client interface, for tests and benchmarks.
+    Serves fixed results per query (or deterministic synthetic ones) after
+    a simulated latency.
+    """
+    
+    def __init__(self, name: str = "local", results: Dict[str, List[ImageResult]] = None,
+                 latency: float = 0.0, fail: bool = False, quota_limit: int = 1000,
+                 width: int = 1600, height: int = 1067):
+        self.name = name
+        self.results = results
+        self.latency = latency
+        self.fail = fail
+        self.quota_limit = quota_limit
+        self.width, self.height = width, height
+        self.available = True
+        self.rate_limit_remaining: Optional[int] = None
+        self.calls: List[str] = []
+    
+    def search(self, query: str, per_page: int = 3) -> List[ImageResult]:
+        """Search for images"""
+        self.calls.append(query)
+        time.sleep(self.latency)
+        if self.fail:
+            return []
+        if self.results is not None:
+            return list(self.results.get(query, []))[:per_page]
+        
+        digest = hashlib.sha1(f"{self.name}|{query}".encode()).hexdigest()[:12]
+        return [
+            ImageResult(
+                url=f"https://{self.name}.local/{digest}/{i}.jpg",
+                thumbnail_url=f"https://{self.name}.local/{digest}/{i}_thumb.jpg",
+                width=self.width,
+                height=self.height,
+                description=query,
+                photographer=f"{self.name} stand-in",
+                source=self.name
+            )
+            for i in range(per_page)
+        ]
+
+
+def _remaining_quota(response) -> Optional[int]:
+    """Requests left in the provider's window, from its rate-limit header"""
+    try:
+        return int(response.headers.get('X-Ratelimit-Remaining'))
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ProviderQuota:
+    """Requests made to one provider in the current hourly window"""
+    limit: int
+    window: float = 3600.0
+    window_start: float = 0.0
+    used: int = 0
+    remaining: Optional[int] = None  # Last value the provider reported
+    
+    def _roll(self, now: float) -> None:
+        if now - self.window_start >= self.window:
+            self.window_start = now
+            self.used = 0
+            self.remaining = None
+    
+    def allows(self, now: float = None) -> bool:
+        self._roll(now or time.time())
+        if self.remaining is not None and self.remaining <= 0:
+            return False
+        return self.used < self.limit
+    
+    def spend(self, now: float = None) -> None:
+        self._roll(now or time.time())
+        self.used += 1
+
+
 class PlaceholderImageGenerator:
     """Generates placeholder images when APIs are unavailable"""
     
@@ -251,37 +348,133 @@ class PlaceholderImageGenerator:
 class ImageSourcer:
     """Main class for sourcing images"""
     
-    def __init__(self):
-        self.unsplash = UnsplashClient()
-        self.pexels = PexelsClient()
+    def __init__(self, providers: List = None, cache_path: Path = None,
+                 cache_ttl: float = 7 * 24 * 3600, stale_ttl: float = 30 * 24 * 3600,
+                 timeout: float = 12.0):
+        self.providers = providers if providers is not None else [UnsplashClient(), PexelsClient()]
         self.placeholder = PlaceholderImageGenerator()
         self.query_generator = ImageQueryGenerator()
-        self._cache: Dict[str, List[ImageResult]] = {}
+        self.cache_path = cache_path or OUTPUT_DIR / "image_cache" / "sourcer_cache.json"
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl  # Past cache_ttl, entries only serve as a fallback until this age
+        self.timeout = timeout  # Max wait for the race as a whole
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.providers)),
+                                        thread_name_prefix="image-sourcer")
+        
+        self._cache: Dict[str, Dict] = {}
+        self._dirty = False  # Cache or quotas changed since the last save
+        saved_quotas: Dict[str, Dict] = {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            self._cache = saved.get('queries', {})
+            saved_quotas = saved.get('quotas', {})
+        except (OSError, ValueError):
+            pass
+        self.quotas: Dict[str, ProviderQuota] = {}
+        for provider in self.providers:
+            quota = ProviderQuota(limit=provider.quota_limit)
+            for key, value in saved_quotas.get(provider.name, {}).items():
+                setattr(quota, key, value)
+            quota.limit = provider.quota_limit
+            self.quotas[provider.name] = quota
     
     def _get_cache_key(self, query: str) -> str:
         """Generate cache key for query"""
-        return hashlib.md5(query.encode()).hexdigest()
+        return hashlib.md5(query.lower().strip().encode()).hexdigest()
     
-    def search(self, query: str, count: int = 2) -> List[ImageResult]:
-        """Search for images using available APIs"""
-        cache_key = self._get_cache_key(query)
+    def _save(self) -> None:
+        """Persist query cache and quota counters if they changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            cutoff = time.time() - self.stale_ttl
+            self._cache = {key: entry for key, entry in self._cache.items()
+                           if entry['time'] >= cutoff}
+            state = {
+                'queries': self._cache,
+                'quotas': {name: asdict(q) for name, q in self.quotas.items()}
+            }
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            tmp.replace(self.cache_path)
+            self._dirty = False
+    
+    @staticmethod
+    def _is_good(result: ImageResult) -> bool:
+        return bool(result.url) and result.width >= IMAGE_CONFIG.min_width \
+            and result.height >= IMAGE_CONFIG.min_height
+    
+    def _record_call(self, provider, future) -> None:
+        """Done-callback: keep the provider's reported quota (runs for late finishers too)"""
+        remaining = getattr(provider, 'rate_limit_remaining', None)
+        if remaining is not None:
+            with self._lock:
+                self.quotas[provider.name].remaining = remaining
+                self._dirty = True
+    
+    def _race(self, query: str, count: int) -> List[ImageResult]:
+        """Query all providers with quota left at once; first `count` good results win"""
+        with self._lock:
+            racing = [p for p in self.providers if p.available and self.quotas[p.name].allows()]
+            for provider in racing:
+                self.quotas[provider.name].spend()
+            self._dirty = self._dirty or bool(racing)
+        if not racing:
+            return []
         
-        if cache_key in self._cache:
-            return self._cache[cache_key][:count]
+        futures = {}
+        for provider in racing:
+            future = self._pool.submit(provider.search, query, count)
+            future.add_done_callback(lambda f, p=provider: self._record_call(p, f))
+            futures[future] = provider
         
-        results = []
+        results: List[ImageResult] = []
+        seen = set()
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                try:
+                    found = future.result()
+                except Exception as e:
+                    print(f"{futures[future].name} search failed: {e}")
+                    continue
+                for result in found:
+                    if self._is_good(result) and result.url not in seen:
+                        seen.add(result.url)
+                        results.append(result)
+                if len(results) >= count:
+                    break  # Slower providers finish in the background
+        except FutureTimeout:
+            print(f"Image search timed out after {self.timeout:.0f}s: '{query}'")
+        return results[:count]
+    
+    def search(self, query: str, count: int = 2, save: bool = True) -> List[ImageResult]:
+        """Search for images using available APIs (save=False leaves persisting to the caller)"""
+        cache_key = self._get_cache_key(query)
         
-        # Try Unsplash first
-        if self.unsplash.available:
-            results = self.unsplash.search(query, count)
+        with self._lock:
+            entry = self._cache.get(cache_key)
+        fresh = entry and time.time() - entry['time'] < self.cache_ttl
+        if fresh and len(entry['results']) >= count:
+            return [ImageResult(**r) for r in entry['results'][:count]]
         
-        # Try Pexels if Unsplash fails
-        if not results and self.pexels.available:
-            results = self.pexels.search(query, count)
+        results = self._race(query, count)
         
         # Cache results
         if results:
-            self._cache[cache_key] = results
+            with self._lock:
+                self._cache[cache_key] = {
+                    'time': time.time(),
+                    'results': [asdict(r) for r in results]
+                }
+                self._dirty = True
+        elif entry:
+            results = [ImageResult(**r) for r in entry['results']]  # Stale beats nothing
+        if save:
+            self._save()
         
         return results[:count]
     
@@ -300,7 +493,7 @@ class ImageSourcer:
                                    ("slide2", plan.slide2_images),
                                    ("slide3", plan.slide3_images)]:
             for query in queries[:2]:  # Max 2 queries per slide
-                results = self.search(query, count=1)
+                results = self.search(query, count=1, save=False)
                 if results:
                     images[slide_key].extend(results)
             
@@ -309,6 +502,7 @@ class ImageSourcer:
                 idx = {"slide1": 0, "slide2": 1, "slide3": 0}[slide_key]
                 images[slide_key].append(self.placeholder.get_placeholder(sector, idx))
         
+        self._save()
         return images
     
     def get_images_for_citations(self, images: Dict[str, List[ImageResult]]) -> List[Dict]:
@@ -0,0 +1,475 @@
+"""
+Content-Addressed Image Store
+=============================
+Persistent store for downloaded sector images.
+
+- Files are saved once under objects/<xx>/<sha1>.jpg, named by their content
+- Every image gets a perceptual hash (pHash) and difference hash (dHash), so
+  the same photo at another resolution or encoding is recognised as a
+  near-duplicate and not stored again
+- A SQLite index records sector, slide, query, dimensions, source URL and
+  licence; lookups by (sector, slide) use an index instead of glob scans
+
+One stored object can serve several sectors/slides: a near-duplicate of an
+object already used by another sector is linked rather than re-saved, while a
+near-duplicate within the same sector is rejected.
+
+The store is kept under a byte budget by evicting least recently used
+objects. Entries are also appended to entries.jsonl, so `rebuild` can
+recreate a lost or corrupt index from the object files:
+
+    python src/image_intelligence/image_store.py stats|repair|rebuild|evict [--root DIR]
+"""
+import io
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# ============================================================================
+# PERCEPTUAL HASHES
+# ============================================================================
+
+HASH_SIZE = 8  # 8x8 bits = 64-bit hashes
+
+_dct_matrices: Dict[int, "np.ndarray"] = {}
+
+
+def _dct_matrix(n: int) -> "np.ndarray":
+    """Orthonormal DCT-II matrix (cached per size)"""
+    if n not in _dct_matrices:
+        k = np.arange(n)[:, None]
+        i = np.arange(n)[None, :]
+        m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+        m[0] /= np.sqrt(2.0)
+        _dct_matrices[n] = m
+    return _dct_matrices[n]
+
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bool(bit))
+    return value
+
+
+def dhash(img: "Image.Image", hash_size: int = HASH_SIZE) -> int:
+    """Difference hash: sign of horizontal gradients on a tiny greyscale image"""
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    if HAS_NUMPY:
+        px = np.asarray(small, dtype=np.int16)
+        return _bits_to_int((px[:, 1:] > px[:, :-1]).ravel())
+    px = list(small.getdata())
+    w = hash_size + 1
+    return _bits_to_int(
+        px[row * w + col + 1] > px[row * w + col]
+        for row in range(hash_size) for col in range(hash_size)
+    )
+
+
+def phash(img: "Image.Image", hash_size: int = HASH_SIZE, highfreq_factor: int = 4) -> int:
+    """
+    DCT perceptual hash: low-frequency DCT coefficients above their median.
+    Falls back to dHash when numpy is unavailable.
+    """
+    if not HAS_NUMPY:
+        return dhash(img, hash_size)
+    n = hash_size * highfreq_factor
+    px = np.asarray(img.convert('L').resize((n, n), Image.LANCZOS), dtype=np.float64)
+    m = _dct_matrix(n)
+    low = (m @ px @ m.T)[:hash_size, :hash_size].ravel()
+    return _bits_to_int(low > np.median(low[1:]))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+@dataclass
+class StoredImage:
+    """One (object, sector, slide) entry in the store"""
+    digest: str
+    path: Path
+    sector: str
+    slide_type: str
+    query: str
+    width: int
+    height: int
+    source: str = ""
+    source_url: str = ""
+    license_info: str = ""
+    phash: int = 0
+    dhash: int = 0
+    size_bytes: int = 0
+
+
+class ImageStore:
+    """
+    Content-addressed image files plus a SQLite metadata index.
+
+    Thread-safe: downloads are processed in worker threads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS objects (
+            digest TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            phash TEXT NOT NULL,
+            dhash TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            digest TEXT NOT NULL REFERENCES objects(digest),
+            sector TEXT NOT NULL,
+            slide_type TEXT NOT NULL,
+            query TEXT,
+            source TEXT,
+            source_url TEXT,
+            license TEXT,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (digest, sector, slide_type)
+        );
+        CREATE INDEX IF NOT EXISTS entries_sector_slide ON entries(sector, slide_type);
+    """
+
+    def __init__(self, root: Path, near_dup_distance: int = 6, jpeg_quality: int = 85,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.root / "entries.jsonl"
+        self.near_dup_distance = near_dup_distance  # Max Hamming distance (of 64 bits)
+        self.jpeg_quality = jpeg_quality
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(objects)")]
+        if 'accessed_at' not in columns:  # Indexes created before LRU tracking
+            self.conn.execute("ALTER TABLE objects ADD COLUMN accessed_at REAL")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS objects_accessed ON objects(accessed_at)")
+        self.conn.commit()
+        self._load_hashes()
+
+    def _load_hashes(self) -> None:
+        """Hashes of all objects, kept in memory for near-duplicate checks"""
+        self._hashes: List[Tuple[str, int, int]] = [
+            (digest, int(p, 16), int(d, 16))
+            for digest, p, d in self.conn.execute("SELECT digest, phash, dhash FROM objects")
+        ]
+        self._total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM objects"
+        ).fetchone()[0]
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.jpg"
+
+    def find_near_duplicate(self, p: int, d: int) -> Optional[str]:
+        """Digest of a stored object perceptually equal to the hashes, if any"""
+        limit = self.near_dup_distance
+        for digest, sp, sd in self._hashes:
+            if hamming(p, sp) <= limit and hamming(d, sd) <= limit:
+                return digest
+        return None
+
+    def add(self, img: "Image.Image", sector: str, slide_type: str = "", query: str = "",
+            source: str = "", source_url: str = "", license_info: str = "") -> Optional[StoredImage]:
+        """
+        Store a decoded image for a sector/slide.
+
+        Returns:
+            The stored entry, or None if the sector already has this image
+            (exactly or as a near-duplicate)
+        """
+        p, d = phash(img), dhash(img)
+        now = time.time()
+
+        with self._lock:
+            digest = self.find_near_duplicate(p, d)
+            if digest is not None:
+                if self.conn.execute(
+                    "SELECT 1 FROM entries WHERE digest = ? AND sector = ?", (digest, sector)
+                ).fetchone():
+                    return None  # Same photo already in this sector
+            else:
+                buf = io.BytesIO()
+                img.save(buf, "JPEG", quality=self.jpeg_quality)
+                data = buf.getvalue()
+                digest = hashlib.sha1(data).hexdigest()
+                path = self._object_path(digest)
+                path.parent.mkdir(exist_ok=True)
+                path.write_bytes(data)
+                self._insert_object(digest, path, img.width, img.height, p, d, len(data), now)
+
+            entry = {'digest': digest, 'sector': sector, 'slide_type': slide_type,
+                     'query': query, 'source': source, 'source_url': source_url,
+                     'license': license_info, 'created_at': now}
+            self._insert_entry(entry)
+            self.conn.execute("UPDATE objects SET accessed_at = ? WHERE digest = ?", (now, digest))
+            self.conn.commit()
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+            if self._total_bytes > self.max_bytes:
+                self._evict(self.max_bytes, keep=digest)
+            return self._entries("e.digest = ? AND e.sector = ? AND e.slide_type = ?",
+                                 (digest, sector, slide_type))[0]
+
+    def _insert_object(self, digest: str, path: Path, width: int, height: int,
+                       p: int, d: int, size: int, now: float) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO objects "
+            "(digest, path, width, height, phash, dhash, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (digest, str(path.relative_to(self.root)), width, height,
+             f"{p:016x}", f"{d:016x}", size, now, now)
+        )
+        self._hashes.append((digest, p, d))
+        self._total_bytes += size
+
+    def _insert_entry(self, entry: Dict) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO entries "
+            "(digest, sector, slide_type, query, source, source_url, license, created_at) "
+            "VALUES (:digest, :sector, :slide_type, :query, :source, :source_url, :license, :created_at)",
+            entry
+        )
+
+    def _entries(self, where: str, params: tuple, limit: int = None) -> List[StoredImage]:
+        sql = (
+            "SELECT o.digest, o.path, e.sector, e.slide_type, e.query, o.width, o.height, "
+            "e.source, e.source_url, e.license, o.phash, o.dhash, o.size "
+            "FROM entries e JOIN objects o ON o.digest = e.digest "
+            f"WHERE {where} ORDER BY e.created_at"
+        )
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [
+            StoredImage(
+                digest=row[0], path=self.root / row[1], sector=row[2], slide_type=row[3],
+                query=row[4] or "", width=row[5], height=row[6], source=row[7] or "",
+                source_url=row[8] or "", license_info=row[9] or "",
+                phash=int(row[10], 16), dhash=int(row[11], 16), size_bytes=row[12]
+            )
+            for row in self.conn.execute(sql, params)
+        ]
+
+    def find(self, sector: str, slide_type: str = None, limit: int = None) -> List[StoredImage]:
+        """Images stored for a sector (optionally one slide), oldest first"""
+        with self._lock:
+            if slide_type is None:
+                return self._entries("e.sector = ?", (sector,), limit)
+            return self._entries("e.sector = ? AND e.slide_type = ?", (sector, slide_type), limit)
+
+    def touch(self, digests: List[str]) -> None:
+        """Mark objects as used now (e.g. placed in a deck) for LRU eviction"""
+        now = time.time()
+        with self._lock:
+            self.conn.executemany("UPDATE objects SET accessed_at = ? WHERE digest = ?",
+                                  [(now, digest) for digest in digests])
+            self.conn.commit()
+
+    def count(self, sector: str) -> int:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(DISTINCT digest) FROM entries WHERE sector = ?", (sector,)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            objects, size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+            entries = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            sectors = self.conn.execute("SELECT COUNT(DISTINCT sector) FROM entries").fetchone()[0]
+        return {'objects': objects, 'entries': entries, 'sectors': sectors, 'bytes': size}
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _delete_objects(self, digests: List[str]) -> None:
+        for digest in digests:
+            self._object_path(digest).unlink(missing_ok=True)
+        rows = [(digest,) for digest in digests]
+        self.conn.executemany("DELETE FROM entries WHERE digest = ?", rows)
+        self.conn.executemany("DELETE FROM objects WHERE digest = ?", rows)
+        self.conn.commit()
+        self._load_hashes()
+
+    def _evict(self, max_bytes: int, keep: str = None) -> int:
+        excess = self._total_bytes - max_bytes
+        victims = []
+        for digest, size in self.conn.execute(
+            "SELECT digest, size FROM objects ORDER BY COALESCE(accessed_at, created_at) ASC"
+        ):
+            if excess <= 0:
+                break
+            if digest != keep:
+                victims.append(digest)
+                excess -= size
+        if victims:
+            self._delete_objects(victims)
+        return len(victims)
+
+    def evict(self, max_bytes: int = None) -> int:
+        """Delete least recently used objects until under max_bytes; returns the number removed"""
+        with self._lock:
+            return self._evict(self.max_bytes if max_bytes is None else max_bytes)
+
+    def repair(self) -> Dict[str, int]:
+        """
+        Reconcile the index with the files on disk:
+        drop rows whose file is gone, entries without an object, and files
+        the index does not know about; fix recorded sizes.
+        """
+        report = {'missing_files': 0, 'dangling_entries': 0, 'orphan_files': 0, 'resized': 0}
+        with self._lock:
+            indexed = {}
+            missing = []
+            for digest, rel_path, size in self.conn.execute("SELECT digest, path, size FROM objects"):
+                path = self.root / rel_path
+                if not path.exists():
+                    missing.append(digest)
+                    continue
+                indexed[str(path)] = digest
+                actual = path.stat().st_size
+                if actual != size:
+                    self.conn.execute("UPDATE objects SET size = ? WHERE digest = ?", (actual, digest))
+                    report['resized'] += 1
+            if missing:
+                self._delete_objects(missing)
+            report['missing_files'] = len(missing)
+
+            report['dangling_entries'] = self.conn.execute(
+                "DELETE FROM entries WHERE digest NOT IN (SELECT digest FROM objects)"
+            ).rowcount
+            for path in self.objects_dir.glob("*/*"):
+                if str(path) not in indexed:
+                    path.unlink(missing_ok=True)
+                    report['orphan_files'] += 1
+            self.conn.commit()
+            self._load_hashes()
+        return report
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Recreate the index from the object files and the entries journal
+        (use when index.db is lost or corrupt). The journal is compacted.
+        """
+        with self._lock:
+            self.conn.executescript("DELETE FROM entries; DELETE FROM objects;")
+            self._hashes, self._total_bytes = [], 0
+            now = time.time()
+
+            objects = 0
+            for path in self.objects_dir.glob("*/*.jpg"):
+                try:
+                    with Image.open(path) as img:
+                        img.load()
+                        self._insert_object(path.stem, path, img.width, img.height,
+                                            phash(img), dhash(img), path.stat().st_size, now)
+                    objects += 1
+                except Exception:
+                    path.unlink(missing_ok=True)  # Unreadable file
+
+            live = {}
+            if self.journal_path.exists():
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # Torn last line
+                        key = (entry['digest'], entry['sector'], entry['slide_type'])
+                        if key not in live:
+                            live[key] = entry
+            known = {digest for digest, _, _ in self._hashes}
+            live = [e for e in live.values() if e['digest'] in known]
+            for entry in live:
+                self._insert_entry(entry)
+            self.conn.commit()
+
+            tmp = self.journal_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for entry in live:
+                    f.write(json.dumps(entry) + '\n')
+            tmp.replace(self.journal_path)
+        return {'objects': objects, 'entries': len(live)}
+
+    def import_files(self, paths: List[Path], sector: str, source: str = "legacy",
+                     delete_source: bool = False) -> int:
+        """
+        Import loose image files for a sector (e.g. an old flat cache directory).
+
+        Returns:
+            Number of files stored (near-duplicates are skipped)
+        """
+        imported = 0
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    stored = self.add(img.convert('RGB'), sector, query="", source=source)
+                imported += stored is not None
+            except Exception:
+                continue  # Unreadable files are left in place
+            if delete_source:
+                path.unlink(missing_ok=True)
+        return imported
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from config.settings import OUTPUT_DIR
+
+    parser = argparse.ArgumentParser(description="Image store maintenance")
+    parser.add_argument("command", choices=["stats", "repair", "rebuild", "evict"])
+    parser.add_argument("--root", type=Path, default=OUTPUT_DIR / "image_cache" / "store",
+                        help="Store directory")
+    parser.add_argument("--max-mb", type=float, help="Byte budget for evict (MB)")
+    args = parser.parse_args()
+
+    store = ImageStore(args.root)
+    if args.command == "repair":
+        print("🔧 Repaired:", store.repair())
+    elif args.command == "rebuild":
+        print("🔧 Rebuilt:", store.rebuild())
+    elif args.command == "evict":
+        budget = int(args.max_mb * 1024 * 1024) if args.max_mb else None
+        print(f"🗑 Evicted {store.evict(budget)} objects")
+    print("📊 Store:", store.stats())
+    store.close()
@@ -6,9 +6,15 @@ from .ppt_generator import (
     KelpPPTGenerator,
     generate_teaser_ppt
 )
+from .image_renditions import (
+    Rendition,
+    RenditionCache
+)
 
 __all__ = [
     'SlideLayout',
     'KelpPPTGenerator',
-    'generate_teaser_ppt'
+    'generate_teaser_ppt',
+    'Rendition',
+    'RenditionCache'
 ]
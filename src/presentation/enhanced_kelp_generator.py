@@ -45,6 +45,7 @@ except ImportError:
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config.settings import OUTPUT_DIR
+from src.presentation.image_renditions import Rendition, RenditionCache, crop_fractions
 
 
 # ============================================================================
@@ -168,6 +169,10 @@ class EnhancedKelpGenerator:
         
         # Image storage per slide
         self.slide_images: Dict[str, List[Path]] = {}
+        
+        # Slide-sized renditions (shared across decks) and the ones embedded in this deck
+        self.renditions = RenditionCache() if HAS_PIL else None
+        self._deck_renditions: Dict[str, Rendition] = {}
     
     def _add_image_to_slide(self, slide, image_path: Path, x: float, y: float,
                            width: float = None, height: float = None,
@@ -179,7 +184,8 @@ class EnhancedKelpGenerator:
             slide: PowerPoint slide object
             image_path: Path to image file
             x, y: Position in inches
-            width, height: Size in inches (if None, uses image aspect ratio)
+            width, height: Size in inches (if None, uses image aspect ratio;
+                if both are set, a box-sized rendition is embedded)
             opacity: Image opacity (0.0 to 1.0) - placeholder for future use
             send_to_back: If True, send image behind other elements
         
@@ -190,6 +196,10 @@ class EnhancedKelpGenerator:
             return False
         
         try:
+            if self.renditions and width and height:
+                return self._add_rendition_to_slide(slide, image_path, x, y, width, height,
+                                                    send_to_back)
+            
             # Open image to get dimensions
             if HAS_PIL:
                 with Image.open(image_path) as img:
@@ -230,6 +240,45 @@ class EnhancedKelpGenerator:
             print(f"    ⚠ Failed to add image {image_path.name}: {e}")
             return False
     
+    def _add_rendition_to_slide(self, slide, image_path: Path, x: float, y: float,
+                                width: float, height: float, send_to_back: bool = False) -> bool:
+        """
+        Add a box-sized rendition of the image. Later placements of the same
+        source reuse the deck's rendition, cropped to their box, when it still
+        has enough pixels for that box at the target DPI; otherwise the new
+        box gets its own rendition, which replaces the deck's if larger.
+        """
+        source_key = str(Path(image_path).resolve())
+        rendition = self._deck_renditions.get(source_key)
+        if rendition is None or not self.renditions.covers(rendition, width, height):
+            fitted = self.renditions.get(image_path, width, height)
+            if fitted is not None:
+                if rendition is None or fitted.width * fitted.height > rendition.width * rendition.height:
+                    self._deck_renditions[source_key] = fitted
+                rendition = fitted
+            elif rendition is None:
+                return False
+        
+        picture = slide.shapes.add_picture(
+            str(rendition.path),
+            Inches(x), Inches(y),
+            Inches(width), Inches(height)
+        )
+        
+        # Crop instead of stretching when the rendition was made for another box
+        left, right, top, bottom = crop_fractions(rendition.aspect_ratio, width / height)
+        if max(left, top) > 0.005:
+            picture.crop_left, picture.crop_right = left, right
+            picture.crop_top, picture.crop_bottom = top, bottom
+        
+        if send_to_back:
+            spTree = slide.shapes._spTree
+            sp = picture._element
+            spTree.remove(sp)
+            spTree.insert(3, sp)  # Insert after background
+        
+        return True
+    
     def set_slide_images(self, slide_images: Dict[str, List[Path]]) -> None:
         """Set images for all slides before generation"""
         self.slide_images = slide_images or {}
@@ -1329,6 +1378,7 @@ This presentation contains forward-looking statements and financial projections
         self.prs = Presentation()
         self.prs.slide_width = KelpBrandV2.SLIDE_WIDTH
         self.prs.slide_height = KelpBrandV2.SLIDE_HEIGHT
+        self._deck_renditions = {}
         
         # Generate codename if not set
         if not data.codename:
@@ -1380,6 +1430,8 @@ This presentation contains forward-looking statements and financial projections
         
         self.prs.save(str(output_path))
         print(f"  ✓ Saved: {output_path.name}")
+        if self.renditions:
+            self.renditions.flush()
         
         return output_path
 
@@ -0,0 +1,165 @@
+"""
+Image Renditions for PPT Embedding
+==================================
+Slide-aware rendition cache: every image placement gets a copy cropped to the
+placement box's aspect ratio and resized to the box at the target DPI, so a
+2-inch thumbnail no longer embeds a 1920x1080 source.
+
+- Renditions are keyed by (source file, size, mtime, box, dpi) and reused
+  across decks; an index stores source and rendition dimensions, so cache
+  hits never re-open the image
+- JPEG sources are decoded with PIL draft mode (DCT-domain downscaling)
+- Sources are never upscaled; small sources are only cropped
+"""
+import json
+import hashlib
+import threading
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+import sys
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+@dataclass
+class Rendition:
+    """A resized crop of a source image for one placement box"""
+    path: Path
+    width: int          # Rendition pixels
+    height: int
+    source_width: int   # Source pixels
+    source_height: int
+
+    @property
+    def aspect_ratio(self) -> float:
+        return self.width / self.height if self.height else 1.0
+
+
+def crop_fractions(image_aspect: float, box_aspect: float) -> Tuple[float, float, float, float]:
+    """Centre crop (left, right, top, bottom) that fits an image to a box aspect ratio"""
+    if image_aspect > box_aspect:
+        side = (1 - box_aspect / image_aspect) / 2
+        return side, side, 0.0, 0.0
+    side = (1 - image_aspect / box_aspect) / 2
+    return 0.0, 0.0, side, side
+
+
+class RenditionCache:
+    """
+    On-disk cache of slide-sized image renditions.
+
+    Usage:
+        renditions = RenditionCache()
+        r = renditions.get(image_path, width_in=4.8, height_in=2.7)
+        slide.shapes.add_picture(str(r.path), ...)
+    """
+
+    def __init__(self, cache_dir: Path = None, dpi: int = 150, quality: int = 82):
+        self.cache_dir = cache_dir or OUTPUT_DIR / "image_cache" / "renditions"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.quality = quality
+        self.index_path = self.cache_dir / "index.json"
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.index: Dict[str, Dict] = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def _key(self, source: Path, box_px: Tuple[int, int]) -> str:
+        stat = source.stat()
+        raw = (f"{source.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+               f"|{box_px[0]}x{box_px[1]}|{self.dpi}")
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+    def covers(self, rendition: Rendition, width_in: float, height_in: float) -> bool:
+        """Whether cropping the rendition to a width x height inch box keeps the target DPI"""
+        box_aspect = width_in / height_in
+        # Rendition pixels left after cropping to the box; widths suffice as the aspect is fixed
+        visible_w = min(rendition.width, rendition.height * box_aspect)
+        # A box-specific rendition could not beat the source crop (no upscaling)
+        needed_w = min(width_in * self.dpi,
+                       rendition.source_width, rendition.source_height * box_aspect)
+        return visible_w >= needed_w - 1
+
+    def get(self, source: Path, width_in: float, height_in: float) -> Optional[Rendition]:
+        """Rendition of source for a width x height inch box (None if it cannot be read)"""
+        if not HAS_PIL:
+            return None
+        source = Path(source)
+        box_px = (max(1, round(width_in * self.dpi)), max(1, round(height_in * self.dpi)))
+        try:
+            key = self._key(source, box_px)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self.index.get(key)
+            if entry and (self.cache_dir / entry['file']).exists():
+                return Rendition(path=self.cache_dir / entry['file'], width=entry['width'],
+                                 height=entry['height'], source_width=entry['source_width'],
+                                 source_height=entry['source_height'])
+
+        rendition = self._render(source, box_px, key)
+        if rendition:
+            with self._lock:
+                entry = asdict(rendition)
+                entry['file'] = entry.pop('path').name
+                self.index[key] = entry
+                self._dirty = True
+        return rendition
+
+    def _render(self, source: Path, box_px: Tuple[int, int], key: str) -> Optional[Rendition]:
+        box_w, box_h = box_px
+        try:
+            with Image.open(source) as img:
+                src_w, src_h = img.size
+                box_aspect = box_w / box_h
+
+                # Centre crop in source pixels
+                if src_w / src_h > box_aspect:
+                    crop_w, crop_h = round(src_h * box_aspect), src_h
+                else:
+                    crop_w, crop_h = src_w, round(src_w / box_aspect)
+                out_w, out_h = min(box_w, crop_w), min(box_h, crop_h)  # Never upscale
+
+                # Let the JPEG decoder downscale by up to 8x before cropping
+                scale = 1.0
+                if img.format == 'JPEG':
+                    img.draft('RGB', (max(1, src_w * out_w // crop_w), max(1, src_h * out_h // crop_h)))
+                    scale = img.size[0] / src_w
+                left = (src_w - crop_w) / 2 * scale
+                top = (src_h - crop_h) / 2 * scale
+                box = (round(left), round(top), round(left + crop_w * scale), round(top + crop_h * scale))
+
+                out = img.convert('RGB').resize((out_w, out_h), Image.LANCZOS, box=box)
+                path = self.cache_dir / f"{key}.jpg"
+                out.save(str(path), "JPEG", quality=self.quality, optimize=True)
+        except Exception as e:
+            print(f"    ⚠ Rendition failed for {source.name}: {e}")
+            return None
+
+        return Rendition(path=path, width=out_w, height=out_h,
+                         source_width=src_w, source_height=src_h)
+
+    def flush(self) -> None:
+        """Persist the index"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = self.index_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            tmp.replace(self.index_path)
+            self._dirty = False
@@ -4,6 +4,7 @@ Contains VL engines for layout generation, image analysis, and image generation
 """
 from .vl_engine import Qwen3VLEngine, LayoutBlueprint, get_vl_engine
 from .janus_engine import JanusProEngine, JanusConfig, get_janus_engine, generate_sector_images
+from .janus_image_batch import BatchImageGenerator, get_batch_image_generator
 
 __all__ = [
     # Qwen VL Engine
@@ -14,5 +15,8 @@ __all__ = [
     'JanusProEngine',
     'JanusConfig',
     'get_janus_engine',
-    'generate_sector_images'
+    'generate_sector_images',
+    # Batched image generation
+    'BatchImageGenerator',
+    'get_batch_image_generator'
 ]
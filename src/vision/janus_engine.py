@@ -21,6 +21,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config.settings import OUTPUT_DIR
+from src.vision.janus_image_batch import BatchImageGenerator, TINY_MODEL
 
 
 @dataclass
@@ -42,10 +43,11 @@ class JanusConfig:
     # Timeout settings
     timeout: int = 120
     
-    # Image generation (optional HuggingFace)
-    hf_model_name: str = "deepseek-ai/Janus-Pro-7B"
+    # Image generation (optional HuggingFace; KELP_IMAGE_GEN_MODEL=tiny for CPU tests)
+    hf_model_name: str = os.environ.get("KELP_IMAGE_GEN_MODEL", "deepseek-ai/Janus-Pro-7B")
     device: str = "cuda" if torch.cuda.is_available() else "cpu"
     image_size: int = 384
+    image_batch_size: int = 4  # Prompts per forward batch
 
 
 class JanusProEngine:
@@ -66,13 +68,13 @@ class JanusProEngine:
         self.config = config or JanusConfig()
         self._ollama_available = None  # Cached availability
         
-        # Optional HuggingFace model for image generation
-        self.hf_model = None
-        self.hf_processor = None
+        # Optional HuggingFace model for image generation (resident, batched)
+        self._image_generator = None
         
         # Output directories
         self.image_output_dir = OUTPUT_DIR / "generated_images"
         self.image_output_dir.mkdir(parents=True, exist_ok=True)
+        self._placeholder_renderer = None  # Created on first placeholder
         
         print(f"   🚀 Janus Engine initialized (Ollama: {self.config.ollama_model})")
     
@@ -394,6 +396,42 @@ If information is not available, write "N/A" for that field."""
         return result
     
 
+    @property
+    def image_generator(self) -> BatchImageGenerator:
+        """Batched generator on the resident HuggingFace model"""
+        if self._image_generator is None:
+            tiny = self.config.hf_model_name == TINY_MODEL
+            self._image_generator = BatchImageGenerator(
+                cache_dir=self.image_output_dir / "cache",
+                model=self.config.hf_model_name,
+                device=self.config.device,
+                batch_size=self.config.image_batch_size,
+                size=None if tiny else self.config.image_size,
+                temperature=self.config.temperature
+            )
+        return self._image_generator
+    
+    def generate_sector_images(self, sector: str, image_types: List[str],
+                               seed: int = 0) -> List[Path]:
+        """
+        Generate one image per image type in shared forward batches.
+        
+        Prompts that were generated before (for any company) with the same
+        seed come straight from the cache.
+        """
+        prompts = []
+        for image_type in image_types:
+            options = self._get_image_prompts(sector, image_type)
+            prompts.append(random.choice(options) if isinstance(options, list) else options)
+        
+        paths = self.image_generator.generate(prompts, [seed] * len(prompts))
+        results = []
+        for image_type, path in zip(image_types, paths):
+            if path:
+                print(f"   🖼 Generated: {sector} {image_type} ({path.name})")
+            results.append(path or self._generate_placeholder_image(sector, image_type))
+        return results
+    
     def generate_sector_image(self, sector: str, image_type: str = "generic",
                              seed: int = None) -> Optional[Path]:
         """
@@ -407,59 +445,25 @@ If information is not available, write "N/A" for that field."""
         Returns:
             Path to generated image or None
         """
-        if not self.is_available():
-            return self._generate_placeholder_image(sector, image_type)
-        
-        # Build prompt based on sector and type
-        prompts = self._get_image_prompts(sector, image_type)
-        prompt = random.choice(prompts) if isinstance(prompts, list) else prompts
+        return self.generate_sector_images(sector, [image_type], seed or 0)[0]
+    
+    def pregenerate_sector_library(self, sectors: List[str], image_types: List[str] = None,
+                                   seeds_per_prompt: int = 1):
+        """
+        Generate every prompt for the given sectors on a background thread.
         
-        try:
-            # Set seed for reproducibility if provided
-            if seed:
-                torch.manual_seed(seed)
-            
-            # Generate image using Janus
-            with torch.no_grad():
-                # Prepare conversation for image generation
-                conversation = [
-                    {"role": "user", "content": f"Generate an image: {prompt}"}
-                ]
-                
-                # Process input
-                inputs = self.processor(
-                    conversations=conversation,
-                    images=None,
-                    force_batchify=True,
-                    return_tensors="pt"
-                ).to(self.config.device)
-                
-                # Generate
-                outputs = self.model.generate(
-                    **inputs,
-                    max_new_tokens=self.config.image_size * self.config.image_size,
-                    temperature=self.config.temperature,
-                    do_sample=True,
-                )
-                
-                # Decode image from tokens
-                image = self.image_gen_processor.decode(
-                    outputs[0],
-                    image_size=self.config.image_size
-                )
-                
-            # Save image
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{sector}_{image_type}_{timestamp}.png"
-            output_path = self.image_output_dir / filename
-            image.save(output_path)
-            
-            print(f"   🖼 Generated: {filename}")
-            return output_path
-            
-        except Exception as e:
-            print(f"   ⚠ Image generation failed: {e}")
-            return self._generate_placeholder_image(sector, image_type)
+        Returns:
+            Future resolving to {sector: [paths]}
+        """
+        image_types = image_types or ["product", "facility", "abstract"]
+        library = {}
+        for sector in sectors:
+            prompts = []
+            for image_type in image_types:
+                options = self._get_image_prompts(sector, image_type)
+                prompts.extend(options if isinstance(options, list) else [options])
+            library[sector] = prompts
+        return self.image_generator.pregenerate_library(library, seeds_per_prompt)
     
     def _get_image_prompts(self, sector: str, image_type: str) -> List[str]:
         """Get appropriate prompts for sector and image type"""
@@ -565,13 +569,13 @@ If information is not available, write "N/A" for that field."""
         return sector_data.get(image_type, sector_data.get("abstract", ["Professional business image"]))
     
     def _generate_placeholder_image(self, sector: str, image_type: str) -> Path:
-        """Generate a placeholder image when model not available"""
-        from PIL import Image, ImageDraw, ImageFont
+        """Generate a placeholder image when model not available (memoised per sector/type)"""
+        from src.image_intelligence.placeholder_renderer import PlaceholderRenderer
         
-        # Create gradient background
-        width, height = 800, 600
-        image = Image.new('RGB', (width, height))
-        draw = ImageDraw.Draw(image)
+        if self._placeholder_renderer is None:
+            self._placeholder_renderer = PlaceholderRenderer(
+                self.image_output_dir, image_format="PNG", prefix="janus_placeholder"
+            )
         
         # Sector colors
         sector_colors = {
@@ -585,37 +589,10 @@ If information is not available, write "N/A" for that field."""
         
         colors = sector_colors.get(sector.lower().split()[0], [(45, 35, 75), (0, 191, 179)])
         
-        # Create gradient
-        for y in range(height):
-            r = int(colors[0][0] + (colors[1][0] - colors[0][0]) * y / height)
-            g = int(colors[0][1] + (colors[1][1] - colors[0][1]) * y / height)
-            b = int(colors[0][2] + (colors[1][2] - colors[0][2]) * y / height)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-        
-        # Add sector text
-        try:
-            font = ImageFont.truetype("arial.ttf", 40)
-            small_font = ImageFont.truetype("arial.ttf", 20)
-        except:
-            font = ImageFont.load_default()
-            small_font = font
-        
-        sector_text = sector.upper()
-        type_text = f"[ {image_type.upper()} ]"
-        
-        # Center text
-        draw.text((width//2, height//2 - 30), sector_text, fill=(255, 255, 255), 
-                  anchor="mm", font=font)
-        draw.text((width//2, height//2 + 30), type_text, fill=(200, 200, 200),
-                  anchor="mm", font=small_font)
-        
-        # Save
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{sector.split()[0].lower()}_{image_type}_{timestamp}.png"
-        output_path = self.image_output_dir / filename
-        image.save(output_path)
-        
-        return output_path
+        return self._placeholder_renderer.render(
+            sector, (800, 600), variant=image_type, colors=colors,
+            title=sector.upper(), subtitle=f"[ {image_type.upper()} ]"
+        )
     
     def analyze_image(self, image_path: Union[str, Path]) -> str:
         """
@@ -751,17 +728,8 @@ def generate_sector_images(sector: str, count: int = 3) -> List[Path]:
     Returns:
         List of paths to generated images
     """
-    engine = get_janus_engine()
-    images = []
-    
-    image_types = ["product", "facility", "abstract"]
-    
-    for i in range(min(count, len(image_types))):
-        image_path = engine.generate_sector_image(sector, image_types[i])
-        if image_path:
-            images.append(image_path)
-    
-    return images
+    image_types = ["product", "facility", "abstract"][:count]
+    return [p for p in get_janus_engine().generate_sector_images(sector, image_types) if p]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,393 @@
+"""
+Batched Janus Image Generation
+==============================
+Keeps one image-generation model resident per process and generates several
+prompts per forward batch.
+
+- Janus-Pro image generation is autoregressive over image tokens with
+  classifier-free guidance; all prompts of a batch share every forward step
+  (conditional and unconditional rows interleaved), on CPU or GPU
+- Outputs are cached on disk by (prompt, seed, size), so repeat prompts across
+  companies are a file lookup
+- pregenerate_library() fills the cache for whole sectors on a background
+  thread; foreground requests interleave between its batches
+- KELP_IMAGE_GEN_MODEL=tiny swaps in a tiny randomly initialised stand-in
+  model that runs the same batched loop on CPU in milliseconds (for tests)
+
+Sampling uses one RNG per prompt, so an image depends only on its own
+(prompt, seed, size) and not on which prompts it was batched with.
+"""
+import os
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import sys
+
+try:
+    import numpy as np
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import torch
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+JANUS_MODEL = "deepseek-ai/Janus-Pro-7B"
+TINY_MODEL = "tiny"
+
+
+def _cfg_batch(id_lists: List[List[int]], pad_id: int) -> Tuple["torch.Tensor", "torch.Tensor"]:
+    """
+    Left-padded token batch with conditional/unconditional rows interleaved
+    (2B rows). Unconditional rows keep only the first and last prompt token.
+    """
+    length = max(len(ids) for ids in id_lists)
+    tokens = torch.full((2 * len(id_lists), length), pad_id, dtype=torch.long)
+    mask = torch.zeros((2 * len(id_lists), length), dtype=torch.long)
+    for i, ids in enumerate(id_lists):
+        start = length - len(ids)
+        row = torch.tensor(ids, dtype=torch.long)
+        tokens[2 * i, start:] = row
+        tokens[2 * i + 1, start:] = row
+        tokens[2 * i + 1, start + 1:length - 1] = pad_id
+        mask[2 * i:2 * i + 2, start:] = 1
+    return tokens, mask
+
+
+# ============================================================================
+# MODEL ADAPTERS
+# ============================================================================
+
+class JanusGenAdapter:
+    """Janus-Pro MultiModalityCausalLM behind the batched generation loop"""
+
+    patch_size = 16
+    default_size = 384
+
+    def __init__(self, model_path: str = JANUS_MODEL, device: str = None):
+        from transformers import AutoModelForCausalLM
+        from janus.models import VLChatProcessor
+
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        dtype = torch.bfloat16 if self.device == "cuda" else torch.float32
+        self.processor = VLChatProcessor.from_pretrained(model_path)
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_path, trust_remote_code=True
+        ).to(dtype).to(self.device).eval()
+
+    def encode_prompts(self, prompts: Sequence[str]) -> Tuple["torch.Tensor", "torch.Tensor"]:
+        id_lists = []
+        for prompt in prompts:
+            text = self.processor.apply_sft_template_for_multi_turn_prompts(
+                conversations=[{"role": "<|User|>", "content": prompt},
+                               {"role": "<|Assistant|>", "content": ""}],
+                sft_format=self.processor.sft_format,
+                system_prompt=""
+            ) + self.processor.image_start_tag
+            id_lists.append(self.processor.tokenizer.encode(text))
+        tokens, mask = _cfg_batch(id_lists, self.processor.pad_id)
+        return tokens.to(self.device), mask.to(self.device)
+
+    def embed_tokens(self, tokens: "torch.Tensor") -> "torch.Tensor":
+        return self.model.language_model.get_input_embeddings()(tokens)
+
+    def forward(self, embeds, mask, positions, past):
+        out = self.model.language_model.model(
+            inputs_embeds=embeds, attention_mask=mask, position_ids=positions,
+            use_cache=True, past_key_values=past
+        )
+        return out.last_hidden_state[:, -1, :], out.past_key_values
+
+    def logits(self, hidden: "torch.Tensor") -> "torch.Tensor":
+        return self.model.gen_head(hidden)
+
+    def embed_image_tokens(self, codes: "torch.Tensor") -> "torch.Tensor":
+        return self.model.prepare_gen_img_embeds(codes)
+
+    def decode(self, codes: "torch.Tensor", size: int) -> "np.ndarray":
+        grid = size // self.patch_size
+        dec = self.model.gen_vision_model.decode_code(
+            codes.to(torch.int), shape=[codes.shape[0], 8, grid, grid]
+        )
+        dec = dec.to(torch.float32).cpu().numpy().transpose(0, 2, 3, 1)
+        return np.clip((dec + 1) / 2 * 255, 0, 255).astype(np.uint8)
+
+
+class TinyGenAdapter(torch.nn.Module if HAS_TORCH else object):
+    """
+    Tiny stand-in with the same adapter interface: byte tokens, a GRU as the
+    "language model" and a random patch codebook as the image decoder.
+
+    The GRU has no attention mask, so the prompt pass packs each row's unpadded
+    tokens; left padding from longer batch mates never reaches the state.
+    """
+
+    patch_size = 4
+    default_size = 32
+
+    def __init__(self, dim: int = 32, codes: int = 64, seed: int = 0, device: str = "cpu"):
+        super().__init__()
+        self.device = device
+        self.pad_id = 0
+        with torch.random.fork_rng():  # Fixed weights without touching the global RNG
+            torch.manual_seed(seed)
+            self.text_embed = torch.nn.Embedding(258, dim)
+            self.code_embed = torch.nn.Embedding(codes, dim)
+            self.rnn = torch.nn.GRU(dim, dim, batch_first=True)
+            self.head = torch.nn.Linear(dim, codes)
+            self.codebook = torch.nn.Parameter(torch.rand(codes, self.patch_size ** 2 * 3) * 2 - 1)
+        self.eval()
+
+    def encode_prompts(self, prompts: Sequence[str]):
+        id_lists = [[1] + [b + 2 for b in p.encode('utf-8')[:64]] + [1] for p in prompts]
+        return _cfg_batch(id_lists, self.pad_id)
+
+    def embed_tokens(self, tokens):
+        return self.text_embed(tokens)
+
+    def forward(self, embeds, mask, positions, past):
+        if past is None:
+            # Shift each left-padded row so its tokens start at 0, then pack by length
+            width = mask.shape[1]
+            lengths = mask.sum(dim=1)
+            index = (torch.arange(width, device=mask.device).unsqueeze(0)
+                     + (width - lengths).unsqueeze(1)) % width
+            shifted = embeds.gather(1, index.unsqueeze(-1).expand_as(embeds))
+            packed = torch.nn.utils.rnn.pack_padded_sequence(
+                shifted, lengths.cpu(), batch_first=True, enforce_sorted=False
+            )
+            _, hidden = self.rnn(packed)
+            return hidden[-1], hidden
+        out, hidden = self.rnn(embeds, past)
+        return out[:, -1, :], hidden
+
+    def logits(self, hidden):
+        return self.head(hidden)
+
+    def embed_image_tokens(self, codes):
+        return self.code_embed(codes)
+
+    def decode(self, codes, size: int):
+        grid, p = size // self.patch_size, self.patch_size
+        patches = self.codebook[codes].reshape(codes.shape[0], grid, grid, p, p, 3)
+        pixels = patches.permute(0, 1, 3, 2, 4, 5).reshape(codes.shape[0], size, size, 3)
+        return ((pixels.detach().numpy() + 1) / 2 * 255).clip(0, 255).astype(np.uint8)
+
+
+def generate_image_batch(adapter, prompts: Sequence[str], seeds: Sequence[int], size: int,
+                         cfg_weight: float = 5.0, temperature: float = 1.0) -> List["Image.Image"]:
+    """Generate one image per prompt, all prompts sharing each forward step"""
+    batch = len(prompts)
+    num_tokens = (size // adapter.patch_size) ** 2
+    generators = [torch.Generator().manual_seed(int(seed)) for seed in seeds]
+
+    with torch.inference_mode():
+        tokens, mask = adapter.encode_prompts(prompts)
+        positions = (mask.cumsum(-1) - 1).clamp(min=0)
+        embeds = adapter.embed_tokens(tokens)
+        past = None
+        codes = torch.zeros((batch, num_tokens), dtype=torch.long)
+
+        for step in range(num_tokens):
+            hidden, past = adapter.forward(embeds, mask, positions, past)
+            logits = adapter.logits(hidden).float()
+            cond, uncond = logits[0::2], logits[1::2]
+            probs = torch.softmax((uncond + cfg_weight * (cond - uncond)) / temperature, dim=-1).cpu()
+            for row in range(batch):
+                codes[row, step] = torch.multinomial(probs[row], 1, generator=generators[row])
+
+            next_codes = codes[:, step].repeat_interleave(2).to(mask.device)
+            embeds = adapter.embed_image_tokens(next_codes).unsqueeze(1)
+            mask = torch.cat([mask, mask.new_ones((mask.shape[0], 1))], dim=1)
+            positions = positions[:, -1:] + 1
+
+        pixels = adapter.decode(codes.to(mask.device), size)
+    return [Image.fromarray(img, 'RGB') for img in pixels]
+
+
+# Resident adapters, one per (model, device), shared by every generator
+_resident: Dict[Tuple[str, str], object] = {}
+_resident_lock = threading.Lock()
+
+
+def get_resident_adapter(model: str = None, device: str = None):
+    """Load a generation model once per process (None if it cannot be loaded)"""
+    if not (HAS_TORCH and HAS_PIL):
+        return None
+    model = model or os.environ.get('KELP_IMAGE_GEN_MODEL', JANUS_MODEL)
+    key = (model, device or "")
+    with _resident_lock:
+        if key not in _resident:
+            try:
+                if model == TINY_MODEL:
+                    _resident[key] = TinyGenAdapter(device=device or "cpu")
+                else:
+                    print(f"  🔄 Loading {model} for image generation...")
+                    _resident[key] = JanusGenAdapter(model, device)
+                    print("  ✓ Image generation model resident")
+            except Exception as e:
+                print(f"  ⚠ Image generation model not available: {e}")
+                _resident[key] = None
+        return _resident[key]
+
+
+# ============================================================================
+# BATCH GENERATOR WITH CACHE
+# ============================================================================
+
+class BatchImageGenerator:
+    """
+    Cached, batched prompt -> image generation on a resident model.
+
+    Usage:
+        generator = get_batch_image_generator()
+        paths = generator.generate(["modern factory floor", "pharma lab"], seeds=[0, 0])
+    """
+
+    def __init__(self, cache_dir: Path = None, model: str = None, device: str = None,
+                 batch_size: int = 4, size: int = None, cfg_weight: float = 5.0,
+                 temperature: float = 1.0,
+                 adapter_loader: Callable[[], object] = None):
+        self.cache_dir = cache_dir or OUTPUT_DIR / "generated_images" / "cache"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.cfg_weight = cfg_weight
+        self.temperature = temperature
+        self._size = size
+        self._load = adapter_loader or (lambda: get_resident_adapter(model, device))
+        self._adapter = None
+        self._loaded = False
+        self._model_lock = threading.Lock()  # One batch on the model at a time
+
+    @property
+    def adapter(self):
+        if not self._loaded:
+            self._adapter = self._load()
+            self._loaded = True
+        return self._adapter
+
+    @property
+    def available(self) -> bool:
+        return self.adapter is not None
+
+    @property
+    def size(self) -> int:
+        return self._size or getattr(self.adapter, 'default_size', 384)
+
+    def cache_path(self, prompt: str, seed: int, size: int = None) -> Path:
+        key = f"{prompt}|{seed}|{size or self.size}"
+        return self.cache_dir / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:24]}.png"
+
+    def generate(self, prompts: Sequence[str], seeds: Sequence[int] = None) -> List[Optional[Path]]:
+        """
+        Paths for each prompt (None where generation failed). Cached outputs are
+        returned directly; misses are generated batch_size prompts at a time.
+        """
+        seeds = list(seeds) if seeds is not None else [0] * len(prompts)
+        if not self.available:
+            return [None] * len(prompts)
+
+        size = self.size
+        results: List[Optional[Path]] = [None] * len(prompts)
+        pending: Dict[Path, List[int]] = {}  # Duplicate requests share one generation
+        for i, (prompt, seed) in enumerate(zip(prompts, seeds)):
+            path = self.cache_path(prompt, seed, size)
+            if path.exists():
+                results[i] = path
+            else:
+                pending.setdefault(path, []).append(i)
+
+        misses = list(pending.items())
+        for start in range(0, len(misses), self.batch_size):
+            chunk = misses[start:start + self.batch_size]
+            batch_prompts = [prompts[idx[0]] for _, idx in chunk]
+            batch_seeds = [seeds[idx[0]] for _, idx in chunk]
+            try:
+                with self._model_lock:
+                    images = generate_image_batch(self.adapter, batch_prompts, batch_seeds, size,
+                                                  self.cfg_weight, self.temperature)
+            except Exception as e:
+                print(f"  ⚠ Batch image generation failed: {e}")
+                continue
+            for (path, indices), image in zip(chunk, images):
+                tmp = path.with_name(path.name + ".tmp")
+                image.save(str(tmp), "PNG")
+                tmp.replace(path)
+                for i in indices:
+                    results[i] = path
+        return results
+
+    def generate_one(self, prompt: str, seed: int = 0) -> Optional[Path]:
+        return self.generate([prompt], [seed])[0]
+
+    def pregenerate_library(self, sector_prompts: Dict[str, List[str]],
+                            seeds_per_prompt: int = 1) -> Future:
+        """
+        Fill the cache for every sector prompt on a background thread.
+
+        Returns:
+            Future resolving to {sector: [paths]}
+        """
+        future: Future = Future()
+
+        def run():
+            try:
+                library = {}
+                for sector, prompts in sector_prompts.items():
+                    requests = [(p, s) for p in prompts for s in range(seeds_per_prompt)]
+                    paths = self.generate([p for p, _ in requests], [s for _, s in requests])
+                    library[sector] = [p for p in paths if p]
+                    print(f"  🖼 Pre-generated {len(library[sector])} images for {sector}")
+                future.set_result(library)
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="image-library-pregen", daemon=True).start()
+        return future
+
+
+# Shared generator so every caller reuses the resident model and cache
+_batch_generator = None
+
+
+def get_batch_image_generator() -> BatchImageGenerator:
+    """Get or create the batch image generator singleton"""
+    global _batch_generator
+    if _batch_generator is None:
+        _batch_generator = BatchImageGenerator()
+    return _batch_generator
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        generator = BatchImageGenerator(Path(tmp), model=TINY_MODEL, batch_size=4)
+        prompts = [f"industrial scene {i}" for i in range(8)]
+
+        start = time.perf_counter()
+        generator.generate(prompts)
+        print(f"cold batch of {len(prompts)}: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        generator.generate(prompts)
+        print(f"cached: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+        # Same (prompt, seed) gives the same image regardless of batch mates
+        alone = BatchImageGenerator(Path(tmp) / "alone", model=TINY_MODEL).generate_one(prompts[3])
+        batched = generator.cache_path(prompts[3], 0)
+        print("batch-independent:", alone.read_bytes() == batched.read_bytes())
+
+        library = generator.pregenerate_library({"pharma": ["lab bench", "clean room"]}).result()
+        print("library:", {k: len(v) for k, v in library.items()})
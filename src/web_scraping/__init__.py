@@ -4,6 +4,7 @@ Contains intelligent web scraper with DuckDuckGo search integration
 """
 from .scraper import (
     WebScrapedData,
+    ScrapeAccumulator,
     AsyncWebScraper,
     IntelligentWebScraper,
     scrape_company_website
@@ -20,9 +21,56 @@ from .web_search import (
     research_company_async
 )
 
+from .fact_extractor import (
+    ExtractedFact,
+    FactExtractor,
+    get_fact_extractor,
+    extract_facts
+)
+
+from .content_dedup import NearDuplicateIndex
+
+from .research_corpus import (
+    CorpusHit,
+    ResearchCorpus,
+    get_research_corpus
+)
+
+from .rate_limiter import HostRateLimiter
+
+from .endpoint_health import (
+    EndpointHealth,
+    get_endpoint_health
+)
+
+from .kv_store import CompressedKVStore
+
+from .text_extractor import (
+    ExtractedText,
+    HtmlTextExtractor,
+    get_text_extractor,
+    extract_main_text,
+    parse_lxml
+)
+
+from .site_metadata import (
+    SiteMetadata,
+    SiteMetadataCache,
+    get_site_metadata_cache
+)
+
+from .http_replay import (
+    Cassette,
+    CassetteMiss,
+    configure_http_replay,
+    wrap_aiohttp_session,
+    wrap_requests_session
+)
+
 __all__ = [
     # From scraper.py
     'WebScrapedData',
+    'ScrapeAccumulator',
     'AsyncWebScraper', 
     'IntelligentWebScraper',
     'scrape_company_website',
@@ -34,5 +82,39 @@ __all__ = [
     'IntelligentScraper',
     'WebSearchPipeline',
     'research_company',
-    'research_company_async'
+    'research_company_async',
+    # From fact_extractor.py
+    'ExtractedFact',
+    'FactExtractor',
+    'get_fact_extractor',
+    'extract_facts',
+    # From content_dedup.py
+    'NearDuplicateIndex',
+    # From research_corpus.py
+    'CorpusHit',
+    'ResearchCorpus',
+    'get_research_corpus',
+    # From rate_limiter.py
+    'HostRateLimiter',
+    # From endpoint_health.py
+    'EndpointHealth',
+    'get_endpoint_health',
+    # From kv_store.py
+    'CompressedKVStore',
+    # From text_extractor.py
+    'ExtractedText',
+    'HtmlTextExtractor',
+    'get_text_extractor',
+    'extract_main_text',
+    'parse_lxml',
+    # From site_metadata.py
+    'SiteMetadata',
+    'SiteMetadataCache',
+    'get_site_metadata_cache',
+    # From http_replay.py
+    'Cassette',
+    'CassetteMiss',
+    'configure_http_replay',
+    'wrap_aiohttp_session',
+    'wrap_requests_session'
 ]
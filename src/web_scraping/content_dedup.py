@@ -0,0 +1,228 @@
+"""
+Near-Duplicate Content Detection
+================================
+Shingling + MinHash index for fetched web pages.
+
+Market-research sites syndicate the same press release across many
+domains. The index lets the research engines collapse near-identical
+pages before LLM synthesis and remembers which URLs turned out to be
+syndicated copies, so they are not fetched again on later runs.
+
+- Shingles: overlapping word n-grams of the normalized text
+- Signature: MinHash over 64-bit shingle hashes
+- Lookup: LSH banding, so a query only compares against candidates that
+  share at least one band
+"""
+import re
+import json
+import random
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of page signatures keyed by URL.
+
+    Pages whose estimated Jaccard similarity is at or above `threshold`
+    are treated as copies of the first URL registered with that content.
+    """
+
+    def __init__(self, index_path: Path = None, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, threshold: float = 0.8,
+                 max_entries: int = 5000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.index_path = index_path or OUTPUT_DIR / "research_cache" / "near_duplicates.json"
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        # Fixed seed: signatures must stay comparable across runs
+        rng = random.Random(1)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        self.signatures: Dict[str, List[int]] = {}  # canonical url -> signature
+        self.duplicates: Dict[str, str] = {}  # duplicate url -> canonical url
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._dirty = False
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Signatures
+    # ------------------------------------------------------------------
+
+    def _shingles(self, text: str) -> Set[int]:
+        """Hash overlapping word n-grams of the normalized text"""
+        words = re.findall(r'\w+', text.lower())
+        if len(words) <= self.shingle_size:
+            grams = [' '.join(words)] if words else []
+        else:
+            grams = [
+                ' '.join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)
+            ]
+
+        return {
+            int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), 'big')
+            for g in grams
+        }
+
+    def signature(self, text: str) -> List[int]:
+        """Compute the MinHash signature of a text"""
+        shingles = self._shingles(text)
+        if not shingles:
+            return []
+        return [
+            min((a * x + b) % _MERSENNE_PRIME for x in shingles) & _MAX_HASH
+            for a, b in self._perms
+        ]
+
+    def similarity(self, sig_a: List[int], sig_b: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        if not sig_a or len(sig_a) != len(sig_b):
+            return 0.0
+        return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+    def _band_keys(self, signature: List[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    # ------------------------------------------------------------------
+    # Index operations
+    # ------------------------------------------------------------------
+
+    def find_duplicate(self, signature: List[int], exclude: str = None) -> Optional[str]:
+        """Return the canonical URL of a near-duplicate already indexed, if any"""
+        if not signature:
+            return None
+
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        candidates.discard(exclude)
+
+        best_url, best_score = None, 0.0
+        for url in candidates:
+            score = self.similarity(signature, self.signatures[url])
+            if score >= self.threshold and score > best_score:
+                best_url, best_score = url, score
+        return best_url
+
+    def _register(self, url: str, signature: List[int]) -> None:
+        self.signatures[url] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(url)
+
+    def add(self, url: str, text: str) -> Optional[str]:
+        """
+        Index a fetched page.
+
+        Returns:
+            Canonical URL if the page is a near-duplicate of an indexed page,
+            otherwise None (the page becomes canonical itself)
+        """
+        if url in self.duplicates:
+            return self.duplicates[url]
+
+        signature = self.signature(text)
+        if not signature:
+            return None
+
+        canonical = self.find_duplicate(signature, exclude=url)
+        if canonical:
+            self.duplicates[url] = canonical
+        elif url not in self.signatures:
+            self._register(url, signature)
+        else:
+            return None
+
+        self._dirty = True
+        return canonical
+
+    def is_known_duplicate(self, url: str) -> bool:
+        """True if the URL was seen before as a copy of another page"""
+        return url in self.duplicates
+
+    def canonical_for(self, url: str) -> Optional[str]:
+        """Canonical URL recorded for a known duplicate"""
+        return self.duplicates.get(url)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # Signatures from a different configuration are not comparable
+            if data.get('num_perm') != self.num_perm or data.get('shingle_size') != self.shingle_size:
+                return
+            for url, signature in data.get('signatures', {}).items():
+                self._register(url, signature)
+            self.duplicates = data.get('duplicates', {})
+        except Exception as e:
+            print(f"  ⚠ Could not load near-duplicate index: {e}")
+
+    def save(self) -> None:
+        """Persist the index (oldest entries are dropped beyond max_entries)"""
+        if not self._dirty:
+            return
+
+        signatures = dict(list(self.signatures.items())[-self.max_entries:])
+        duplicates = {
+            url: canonical for url, canonical in list(self.duplicates.items())[-self.max_entries:]
+        }
+
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'num_perm': self.num_perm,
+                    'shingle_size': self.shingle_size,
+                    'signatures': signatures,
+                    'duplicates': duplicates
+                }, f)
+            self._dirty = False
+        except Exception as e:
+            print(f"  ⚠ Could not save near-duplicate index: {e}")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    base = ("The India forging market is projected to grow at a CAGR of 8.2 percent "
+            "between 2024 and 2030 driven by automotive demand, defence indigenisation "
+            "and rising exports of precision components to global OEMs. ") * 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = NearDuplicateIndex(Path(tmp) / "index.json")
+        print("original :", index.add("https://a.example/report", base))
+        print("syndicated:", index.add("https://b.example/press", base + " Contact our sales team."))
+        print("different :", index.add("https://c.example/other", "Pharmaceutical exports rose sharply."))
+        index.save()
+
+        reloaded = NearDuplicateIndex(Path(tmp) / "index.json")
+        print("remembered:", reloaded.is_known_duplicate("https://b.example/press"))
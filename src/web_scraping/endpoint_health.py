@@ -0,0 +1,158 @@
+"""
+Search Endpoint Health
+======================
+Shared health tracking for search endpoints (DuckDuckGo HTML / Lite).
+
+Every search in a process reports its outcome here, so a rate limit seen by
+one query is respected by the next instead of being rediscovered. Throttled
+endpoints get a jittered exponential backoff that persists across queries,
+and callers try the healthiest endpoint first.
+"""
+import time
+import random
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, List, Optional
+
+from src.web_scraping.rate_limiter import THROTTLE_STATUSES
+
+
+@dataclass
+class EndpointStats:
+    """Outcome counters and backoff state for one endpoint"""
+    requests: int = 0
+    successes: int = 0
+    throttled: int = 0
+    errors: int = 0
+    consecutive_throttles: int = 0
+    backoff_until: float = 0.0
+    total_latency: float = 0.0
+    recent: Deque[bool] = field(default_factory=lambda: deque(maxlen=20))  # True = throttled
+
+    @property
+    def throttle_rate(self) -> float:
+        return sum(self.recent) / len(self.recent) if self.recent else 0.0
+
+    @property
+    def avg_latency(self) -> float:
+        return self.total_latency / self.requests if self.requests else 0.0
+
+
+class EndpointHealth:
+    """
+    Tracks throttling per endpoint and schedules retries.
+
+    Usage:
+        endpoint = health.best(endpoints)
+        await health.wait(endpoint)
+        ... request ...
+        health.record(endpoint, status, latency)
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: float = 0.5):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter  # Fraction of the delay that is randomised
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = EndpointStats()
+        return self.endpoints[endpoint]
+
+    def remaining_backoff(self, endpoint: str) -> float:
+        """Seconds until the endpoint may be used again"""
+        return max(0.0, self._stats(endpoint).backoff_until - time.monotonic())
+
+    def rank(self, endpoints: List[str]) -> List[str]:
+        """Order endpoints healthiest first (stable for ties)"""
+        return sorted(endpoints, key=lambda e: (
+            round(self.remaining_backoff(e), 1),
+            self._stats(e).throttle_rate,
+        ))
+
+    def best(self, endpoints: List[str]) -> str:
+        return self.rank(endpoints)[0]
+
+    async def wait(self, endpoint: str, max_wait: float = None) -> bool:
+        """
+        Sleep out the endpoint's backoff.
+
+        Returns:
+            False without sleeping if the backoff exceeds max_wait
+        """
+        delay = self.remaining_backoff(endpoint)
+        if max_wait is not None and delay > max_wait:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return True
+
+    def record(self, endpoint: str, status: int, latency: float = 0.0,
+               retry_after: Optional[str] = None,
+               throttle_statuses: FrozenSet[int] = THROTTLE_STATUSES) -> None:
+        """Record a response and update the endpoint's backoff"""
+        stats = self._stats(endpoint)
+        stats.requests += 1
+        stats.total_latency += latency
+
+        if status in throttle_statuses:
+            stats.throttled += 1
+            stats.consecutive_throttles += 1
+            stats.recent.append(True)
+
+            delay = min(self.max_delay,
+                        self.base_delay * 2 ** (stats.consecutive_throttles - 1))
+            delay *= 1 - self.jitter * random.random()
+            try:
+                if retry_after:
+                    delay = max(delay, min(float(retry_after), self.max_delay))
+            except ValueError:
+                pass
+            stats.backoff_until = max(stats.backoff_until, time.monotonic() + delay)
+        else:
+            stats.recent.append(False)
+            if status == 200:
+                stats.successes += 1
+                stats.consecutive_throttles = 0
+            else:
+                stats.errors += 1
+
+    def retry_delay(self) -> float:
+        """Jittered pause before retrying after an error that sets no backoff"""
+        return self.base_delay * (1 - self.jitter * random.random())
+
+    def record_error(self, endpoint: str) -> None:
+        """Record a connection error or timeout"""
+        stats = self._stats(endpoint)
+        stats.requests += 1
+        stats.errors += 1
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint counters, throttle rate and current backoff"""
+        return {
+            endpoint: {
+                'requests': stats.requests,
+                'successes': stats.successes,
+                'throttled': stats.throttled,
+                'errors': stats.errors,
+                'throttle_rate': round(stats.throttle_rate, 3),
+                'avg_latency': round(stats.avg_latency, 3),
+                'backoff_remaining': round(self.remaining_backoff(endpoint), 2)
+            }
+            for endpoint, stats in self.endpoints.items()
+        }
+
+
+# Shared instance so every search client sees the same endpoint state
+_endpoint_health = None
+
+
+def get_endpoint_health() -> EndpointHealth:
+    """Get or create the endpoint health singleton"""
+    global _endpoint_health
+    if _endpoint_health is None:
+        _endpoint_health = EndpointHealth()
+    return _endpoint_health
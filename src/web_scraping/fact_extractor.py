@@ -0,0 +1,199 @@
+"""
+Fact Extraction Engine
+======================
+Shared, precompiled extractor for statistics and facts in scraped text.
+
+All fact patterns are compiled into ONE alternation with a named group per
+fact kind, so a text is scanned in a single pass regardless of how many
+kinds are requested. Each match becomes a typed ExtractedFact carrying its
+character offsets, which lets research code build context windows and
+citation code point back into the source text.
+
+Used by:
+- AdvancedResearchEngine._extract_statistics
+- WebResearchEngine._extract_numbers
+- IntelligentScraper._extract_key_facts
+- AsyncWebScraper._extract_metrics
+- CitationTracker.cite_web_facts
+"""
+import re
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ExtractedFact:
+    """A single typed fact found in text"""
+    kind: str  # Key of FACT_PATTERNS, e.g. 'cagr', 'currency', 'year_range'
+    text: str
+    start: int  # Character offset in the scanned text
+    end: int
+    value: Optional[float] = None  # First number in the match
+    unit: str = ""  # '%', 'billion', 'crore', ...
+    currency: str = ""  # '$', '₹', 'USD', ...
+
+
+_SCALE = r'(?:billion|million|trillion|crore|lakh|Bn|Cr|B|M|T|L)'
+
+# Ordered by priority: at any position the first kind that matches wins, so
+# context-bearing kinds ("revenue of $5M") come before bare kinds ("$5M").
+FACT_PATTERNS: Dict[str, str] = {
+    # Context-bearing statistics
+    'market_size': (r'(?:market\s+size|market\s+valued|\bworth|\bestimated)\s*(?:at|of)?\s*'
+                    r'[\$₹]?\s*[\d,.]*\d\s*(?:billion|million|trillion|crore|Bn|B|M|Cr)\b'),
+    'projection': (r'\b(?:by|in|reach)\s*(?:20\d{2})\s*[\$₹]?\s*[\d,.]*\d\s*'
+                   r'(?:billion|million|trillion|crore)\b'),
+    'revenue': (r'\b(?:revenue|sales|turnover|profit)\s*(?:of|at|reached|:)?\s*'
+                r'(?:₹|\$|rs\.?|inr|usd)?\s*[\d,.]*\d\s*(?:billion|million|crore|Cr|B|M)\b'),
+    # Same context without a scale ("sales of 300"): a metric hint, not a statistic
+    'revenue_mention': (r'\b(?:revenue|sales|turnover|profit)\s*(?:of|at|reached|:)?\s*'
+                        r'(?:₹|\$|rs\.?|inr|usd)?\s*[\d,.]*\d\b'),
+    'cagr': r'\bCAGR\s*(?:of\s*)?[\d.]*\d\s*%|\b\d+(?:\.\d+)?\s*%\s*CAGR\b',
+    'growth': (r'\b(?:growing|growth)\s*(?:at|of)?\s*[\d.]*\d\s*%\s*(?:CAGR|annually)?'
+               r'|\b\d+(?:\.\d+)?\s*%\s*(?:growth|increase)\b'),
+    'margin': (r'\b(?:EBITDA|operating|profit|net)\s*margin\s*(?:of|at)?\s*[\d.]*\d\s*%'
+               r'|\b\d+(?:\.\d+)?\s*%\s*(?:EBITDA\s+|operating\s+|net\s+)?margins?\b'),
+    'share': r'\b(?:market\s+share|share)\s*(?:of|at)?\s*[\d.]*\d\s*%',
+    'change': r'\b(?:increased|grew|rose|declined)\s*(?:by)?\s*[\d.]*\d\s*%',
+    'founded': r'\b(?:founded|established|incorporated|since)\s+(?:in\s+)?(?:18|19|20)\d{2}\b',
+    # Counts
+    'headcount': (r'\b\d[\d,]*\+?\s*(?:employees?|workforce|workers?|staff|professionals'
+                  r'|people)\b'),
+    'customer_count': r'\b\d[\d,]*\+?\s*(?:clients?|customers?|users?)\b',
+    'presence': (r'\b\d[\d,]*\+?\s*(?:countries|states|cities|locations|plants|facilities'
+                 r'|years)\b'),
+    # Bare typed values
+    'year_range': r'\b(?:19|20)\d{2}\s*[-–]\s*(?:(?:19|20)\d{2}|\d{2})\b',
+    'fiscal_period': r"\b(?:FY|Q[1-4])\s*'?\d{2,4}\b",
+    'currency': (r'(?:[\$₹€£]|\b(?:USD|INR|EUR|Rs\.?)(?![a-z]))\s*\d[\d,]*(?:\.\d+)?'
+                 r'(?:\s*' + _SCALE + r'\b)?'),
+    'large_number': r'\b\d[\d,]*(?:\.\d+)?\s*(?:billion|million|trillion|crore|lakh)\b',
+    'percentage': r'\b\d+(?:\.\d+)?\s*%',
+}
+
+# Kind groups used by the existing extractors
+STATISTIC_KINDS = ('market_size', 'projection', 'revenue', 'cagr', 'growth',
+                   'margin', 'share', 'change', 'headcount')
+NUMBER_KINDS = ('cagr', 'currency', 'large_number', 'fiscal_period', 'percentage')
+KEY_FACT_KINDS = ('founded', 'headcount', 'customer_count', 'year_range',
+                  'currency', 'percentage')
+METRIC_KINDS = ('revenue', 'revenue_mention', 'cagr', 'growth', 'margin', 'founded',
+                'headcount', 'customer_count', 'presence', 'large_number')
+
+_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+_UNIT_RE = re.compile(r'%|\b(?:billion|million|trillion|crore|lakh|Bn|Cr)\b', re.IGNORECASE)
+_CURRENCY_RE = re.compile(r'[\$₹€£]|\b(?:USD|INR|EUR|Rs)\b', re.IGNORECASE)
+
+
+class FactExtractor:
+    """
+    Single-pass fact extractor over a precompiled alternation.
+
+    Use get_fact_extractor() to share compiled instances between callers.
+    """
+
+    def __init__(self, kinds: Iterable[str] = None):
+        requested = set(kinds) if kinds else set(FACT_PATTERNS)
+        unknown = requested - set(FACT_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown fact kinds: {sorted(unknown)}")
+
+        # Keep FACT_PATTERNS priority order regardless of the caller's order
+        self.kinds: Tuple[str, ...] = tuple(k for k in FACT_PATTERNS if k in requested)
+        self.pattern = re.compile(
+            '|'.join(f'(?P<{kind}>{FACT_PATTERNS[kind]})' for kind in self.kinds),
+            re.IGNORECASE
+        )
+
+    def _to_fact(self, match: 're.Match') -> ExtractedFact:
+        """Convert a regex match into a typed fact"""
+        text = match.group()
+        number = _NUMBER_RE.search(text)
+        unit = _UNIT_RE.search(text)
+        currency = _CURRENCY_RE.search(text)
+
+        value = None
+        if number and match.lastgroup != 'year_range':
+            try:
+                value = float(number.group().replace(',', ''))
+            except ValueError:
+                pass
+
+        return ExtractedFact(
+            kind=match.lastgroup,
+            text=text.strip(),
+            start=match.start(),
+            end=match.end(),
+            value=value,
+            unit=unit.group().lower() if unit else "",
+            currency=currency.group() if currency else ""
+        )
+
+    def extract(self, text: str) -> List[ExtractedFact]:
+        """Scan text once and return all facts in order of appearance"""
+        if not text:
+            return []
+        return [self._to_fact(m) for m in self.pattern.finditer(text)]
+
+    def extract_texts(self, text: str, per_kind: int = None, limit: int = None) -> List[str]:
+        """
+        Extract deduplicated fact strings.
+
+        Args:
+            text: Text to scan
+            per_kind: Maximum facts kept per kind
+            limit: Maximum facts returned overall
+        """
+        counts: Dict[str, int] = {}
+        seen = set()
+        results = []
+
+        for fact in self.extract(text):
+            if per_kind is not None and counts.get(fact.kind, 0) >= per_kind:
+                continue
+            counts[fact.kind] = counts.get(fact.kind, 0) + 1
+            if fact.text and fact.text not in seen:
+                seen.add(fact.text)
+                results.append(fact.text)
+
+        return results[:limit] if limit is not None else results
+
+    @staticmethod
+    def context(text: str, fact: ExtractedFact, window: int = 50) -> str:
+        """Return the fact with up to `window` characters on either side"""
+        return text[max(0, fact.start - window):min(len(text), fact.end + window)].strip()
+
+    @staticmethod
+    def clause(text: str, fact: ExtractedFact, max_chars: int = 200) -> str:
+        """Return the fact extended to the end of its clause (next period)"""
+        end = text.find('.', fact.end)
+        end = len(text) if end == -1 else end
+        return text[fact.start:min(end, fact.start + max_chars)].strip()
+
+
+@lru_cache(maxsize=None)
+def _cached_extractor(kinds: Tuple[str, ...]) -> FactExtractor:
+    return FactExtractor(kinds)
+
+
+def get_fact_extractor(kinds: Iterable[str] = None) -> FactExtractor:
+    """Get a shared compiled extractor for a set of fact kinds"""
+    key = tuple(sorted(set(kinds))) if kinds else tuple(FACT_PATTERNS)
+    return _cached_extractor(key)
+
+
+def extract_facts(text: str, kinds: Iterable[str] = None) -> List[ExtractedFact]:
+    """Extract typed facts from text in a single pass"""
+    return get_fact_extractor(kinds).extract(text)
+
+
+if __name__ == "__main__":
+    sample = ("The India forging market size is estimated at $4.5 billion in 2024, "
+              "growing at a CAGR of 8.2% during 2024-2030. EBITDA margin of 18.5% "
+              "and revenue of ₹1,250 crore in FY24. Founded in 1979, 2,500+ employees "
+              "serve 300 customers across 12 countries.")
+
+    for fact in extract_facts(sample):
+        print(f"  {fact.kind:<15} [{fact.start:>3}:{fact.end:<3}] {fact.text!r} "
+              f"value={fact.value} unit={fact.unit!r} currency={fact.currency!r}")
@@ -0,0 +1,397 @@
+"""
+HTTP Record / Replay
+====================
+Cassette layer under the aiohttp and requests sessions used by the research
+and image modules, so the web stack can be benchmarked and regression-tested
+without network access.
+
+Modes (environment, or configure_http_replay()):
+- KELP_HTTP_MODE=off      normal network access (default)
+- KELP_HTTP_MODE=record   real requests; every exchange is appended to the cassette
+- KELP_HTTP_MODE=replay   no network; responses come from the cassette, and
+                          unknown requests fail like a connection error
+
+KELP_HTTP_CASSETTE sets the cassette file and KELP_HTTP_LATENCY_SCALE scales
+the recorded latency on replay (1.0 = original timing, 0 = instant).
+
+A cassette is a gzip file of JSON lines, one exchange per line. Repeated
+requests to the same URL replay their recordings in order.
+
+Traffic made by third-party clients (duckduckgo_search, icrawler) does not go
+through these sessions and is not recorded.
+"""
+import os
+import gzip
+import json
+import time
+import atexit
+import base64
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+MODES = ('off', 'record', 'replay')
+
+# Only headers the pipeline reads are kept in cassettes
+_KEPT_HEADERS = ('content-type', 'content-length', 'retry-after', 'location', 'last-modified',
+                 'x-ratelimit-remaining')
+
+
+class CassetteMiss(ConnectionError):
+    """Replay mode request with no recorded response"""
+
+
+class Headers(dict):
+    """Case-insensitive header mapping for replayed responses"""
+
+    def __init__(self, items: Dict[str, str] = None):
+        super().__init__({k.lower(): v for k, v in (items or {}).items()})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return super().get(key.lower(), default)
+
+    def __getitem__(self, key: str) -> Any:
+        return super().__getitem__(key.lower())
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(str(key).lower())
+
+
+class Cassette:
+    """In-memory view of a cassette file; recordings are appended in batches"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.exchanges: Dict[Tuple[str, str, str], List[Dict]] = {}
+        self._cursor: Dict[Tuple[str, str, str], int] = {}
+        self._unsaved: List[Dict] = []
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @staticmethod
+    def request_key(method: str, url: str, body: Any = None) -> Tuple[str, str, str]:
+        """Identify a request by method, URL and a hash of its body"""
+        if body is None:
+            digest = ""
+        else:
+            if isinstance(body, dict):
+                body = json.dumps(body, sort_keys=True)
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            digest = hashlib.sha1(body).hexdigest()[:16]
+        return method.upper(), str(url), digest
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+        except Exception as e:
+            print(f"  ⚠ Could not read cassette {self.path.name}: {e}")
+
+    def _index(self, exchange: Dict) -> None:
+        key = (exchange['method'], exchange['url'], exchange.get('body_key', ""))
+        self.exchanges.setdefault(key, []).append(exchange)
+
+    def record(self, key: Tuple[str, str, str], status: int, headers: Dict[str, str],
+               content: bytes, latency: float) -> None:
+        exchange = {
+            'method': key[0],
+            'url': key[1],
+            'body_key': key[2],
+            'status': status,
+            'headers': {k: v for k, v in Headers(headers).items() if k in _KEPT_HEADERS},
+            'content': base64.b64encode(content).decode('ascii'),
+            'latency': round(latency, 4),
+        }
+        self._index(exchange)
+        self._unsaved.append(exchange)
+        if len(self._unsaved) >= 50:
+            self.save()
+
+    def lookup(self, key: Tuple[str, str, str]) -> Optional[Dict]:
+        """Next recording for a request (the last one repeats once exhausted)"""
+        recordings = self.exchanges.get(key)
+        if not recordings:
+            self.misses += 1
+            return None
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        self.hits += 1
+        return recordings[min(index, len(recordings) - 1)]
+
+    def save(self) -> None:
+        """Append unsaved recordings to the cassette file"""
+        if not self._unsaved:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                for exchange in self._unsaved:
+                    f.write(json.dumps(exchange, separators=(',', ':')) + '\n')
+            self._unsaved = []
+        except Exception as e:
+            print(f"  ⚠ Could not save cassette {self.path.name}: {e}")
+
+
+# ----------------------------------------------------------------------
+# Configuration
+# ----------------------------------------------------------------------
+
+_config = {
+    'mode': os.environ.get('KELP_HTTP_MODE', 'off').lower(),
+    'cassette': os.environ.get('KELP_HTTP_CASSETTE', ''),
+    'latency_scale': float(os.environ.get('KELP_HTTP_LATENCY_SCALE', '1.0')),
+}
+_cassette: Optional[Cassette] = None
+
+
+def configure_http_replay(mode: str = 'off', cassette: Path = None,
+                          latency_scale: float = 1.0) -> None:
+    """Set the record/replay mode for sessions wrapped from now on"""
+    global _cassette
+    if mode not in MODES:
+        raise ValueError(f"Unknown HTTP mode: {mode} (expected one of {MODES})")
+    if _cassette:
+        _cassette.save()
+    _config.update(mode=mode, cassette=str(cassette or ''), latency_scale=latency_scale)
+    _cassette = None
+
+
+def http_mode() -> str:
+    return _config['mode'] if _config['mode'] in MODES else 'off'
+
+
+def get_cassette() -> Cassette:
+    """Get or open the active cassette"""
+    global _cassette
+    if _cassette is None:
+        path = Path(_config['cassette']) if _config['cassette'] else \
+            OUTPUT_DIR / "cassettes" / "default.jsonl.gz"
+        _cassette = Cassette(path)
+        atexit.register(_cassette.save)
+    return _cassette
+
+
+def _replay_delay(exchange: Dict) -> float:
+    return max(0.0, exchange.get('latency', 0.0) * _config['latency_scale'])
+
+
+# ----------------------------------------------------------------------
+# aiohttp
+# ----------------------------------------------------------------------
+
+class _ReplayStream:
+    """Subset of aiohttp.StreamReader over a recorded body"""
+
+    def __init__(self, content: bytes):
+        self._content = content
+
+    async def iter_chunked(self, n: int):
+        for start in range(0, len(self._content), n):
+            yield self._content[start:start + n]
+
+
+class ReplayResponse:
+    """Subset of aiohttp.ClientResponse the pipeline uses"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status = status
+        self.headers = Headers(headers)
+        self._content = content
+        self.content = _ReplayStream(content)
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get('content-type', '').split(';')[0].strip()
+
+    @property
+    def charset(self) -> Optional[str]:
+        for part in self.headers.get('content-type', '').split(';')[1:]:
+            if part.strip().lower().startswith('charset='):
+                return part.split('=', 1)[1].strip()
+        return None
+
+    async def read(self) -> bytes:
+        return self._content
+
+    async def text(self, encoding: str = None, errors: str = 'replace') -> str:
+        return self._content.decode(encoding or self.charset or 'utf-8', errors)
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(await self.text())
+
+    def release(self) -> None:
+        pass
+
+
+class _RequestContext:
+    """Async context manager returned by ReplaySession.get/post"""
+
+    def __init__(self, session: 'ReplaySession', method: str, url: str, kwargs: Dict):
+        self.session = session
+        self.method = method
+        self.url = str(url)
+        self.kwargs = kwargs
+
+    async def __aenter__(self) -> Any:
+        return await self.session._request(self.method, self.url, **self.kwargs)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+class ReplaySession:
+    """
+    Wraps an aiohttp.ClientSession; records or replays exchanges depending on
+    the configured mode. Unknown attributes are delegated to the real session.
+    """
+
+    def __init__(self, session, mode: str):
+        self._session = session
+        self.mode = mode
+        self.cassette = get_cassette()
+
+    def get(self, url, **kwargs) -> _RequestContext:
+        return _RequestContext(self, 'GET', url, kwargs)
+
+    def post(self, url, **kwargs) -> _RequestContext:
+        return _RequestContext(self, 'POST', url, kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs) -> ReplayResponse:
+        key = Cassette.request_key(method, url, kwargs.get('data') or kwargs.get('json'))
+
+        if self.mode == 'replay':
+            exchange = self.cassette.lookup(key)
+            if exchange is None:
+                raise CassetteMiss(f"No recording for {method} {url}")
+            delay = _replay_delay(exchange)
+            if delay:
+                await asyncio.sleep(delay)
+            return ReplayResponse(url, exchange['status'], exchange['headers'],
+                                  base64.b64decode(exchange['content']))
+
+        start = time.monotonic()
+        async with self._session.request(method, url, **kwargs) as response:
+            content = await response.read()
+            status, headers = response.status, dict(response.headers)
+        self.cassette.record(key, status, headers, content, time.monotonic() - start)
+        return ReplayResponse(url, status, headers, content)
+
+    @property
+    def closed(self) -> bool:
+        return self._session.closed
+
+    async def close(self) -> None:
+        self.cassette.save()
+        await self._session.close()
+
+    async def __aenter__(self) -> 'ReplaySession':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+def wrap_aiohttp_session(session):
+    """Return the session unchanged, or wrapped for record/replay"""
+    mode = http_mode()
+    return session if mode == 'off' else ReplaySession(session, mode)
+
+
+# ----------------------------------------------------------------------
+# requests
+# ----------------------------------------------------------------------
+
+class ReplayRequestsResponse:
+    """Subset of requests.Response the pipeline uses"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status_code = status
+        self.headers = Headers(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def iter_content(self, chunk_size: int = 8192):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise ConnectionError(f"HTTP {self.status_code} for {self.url}")
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayRequestsSession:
+    """Wraps a requests.Session for record/replay; other attributes are delegated"""
+
+    def __init__(self, session, mode: str):
+        self._session = session
+        self.mode = mode
+        self.cassette = get_cassette()
+
+    def get(self, url, **kwargs) -> ReplayRequestsResponse:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs) -> ReplayRequestsResponse:
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> ReplayRequestsResponse:
+        key = Cassette.request_key(method, url, kwargs.get('data') or kwargs.get('json'))
+
+        if self.mode == 'replay':
+            exchange = self.cassette.lookup(key)
+            if exchange is None:
+                raise CassetteMiss(f"No recording for {method} {url}")
+            delay = _replay_delay(exchange)
+            if delay:
+                time.sleep(delay)
+            return ReplayRequestsResponse(url, exchange['status'], exchange['headers'],
+                                          base64.b64decode(exchange['content']))
+
+        start = time.monotonic()
+        response = self._session.request(method, url, **kwargs)
+        content = response.content
+        self.cassette.record(key, response.status_code, dict(response.headers),
+                             content, time.monotonic() - start)
+        return ReplayRequestsResponse(url, response.status_code, dict(response.headers), content)
+
+    def close(self) -> None:
+        self.cassette.save()
+        self._session.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+def wrap_requests_session(session):
+    """Return the session unchanged, or wrapped for record/replay"""
+    mode = http_mode()
+    return session if mode == 'off' else ReplayRequestsSession(session, mode)
@@ -0,0 +1,263 @@
+"""
+Compressed Key-Value Store
+==========================
+Single-file SQLite store for scraper caches.
+
+Replaces one-JSON-file-per-URL caches, which degrade badly (directory
+scans, inode counts) once they hold tens of thousands of pages.
+
+- Values are JSON, compressed with zstd when available (zlib otherwise);
+  the codec is stored per row so both can be read back
+- Optional TTL per entry
+- LRU eviction down to a byte budget
+- Writes and access-time updates are buffered and committed in batches
+- migrate_json_dir() imports an existing directory of JSON cache files
+"""
+import json
+import time
+import zlib
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+class CompressedKVStore:
+    """
+    SQLite-backed JSON value store with compression, TTL and LRU eviction.
+
+    Call flush() (or close()) to persist buffered writes.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            codec TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at);
+    """
+
+    def __init__(self, db_path: Path, ttl: float = None,
+                 max_bytes: int = 256 * 1024 * 1024, batch_size: int = 32):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl  # Default seconds to live; None = no expiry
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+
+        self.codec = 'zstd' if HAS_ZSTD else 'zlib'
+        self._compressor = zstandard.ZstdCompressor(level=6) if HAS_ZSTD else None
+        self._decompressor = zstandard.ZstdDecompressor() if HAS_ZSTD else None
+
+        self._pending: Dict[str, tuple] = {}  # key -> row awaiting commit
+        self._touched: Dict[str, float] = {}  # key -> access time awaiting commit
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _encode(self, value: Any) -> bytes:
+        raw = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        if self._compressor:
+            return self._compressor.compress(raw)
+        return zlib.compress(raw, 6)
+
+    def _decode(self, blob: bytes, codec: str) -> Any:
+        if codec == 'zstd':
+            if not self._decompressor:
+                raise ValueError("zstd entry but zstandard is not installed")
+            raw = self._decompressor.decompress(blob)
+        else:
+            raw = zlib.decompress(blob)
+        return json.loads(raw.decode('utf-8'))
+
+    # ------------------------------------------------------------------
+    # Reads and writes
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the stored value, or default if missing or expired"""
+        now = time.time()
+
+        row = self._pending.get(key)
+        if row is None:
+            row = self.conn.execute(
+                "SELECT key, value, codec, size, created_at, expires_at, accessed_at "
+                "FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return default
+
+        _, blob, codec, _, _, expires_at, _ = row
+        if expires_at is not None and expires_at < now:
+            self.delete(key)
+            return default
+
+        try:
+            value = self._decode(blob, codec)
+        except Exception:
+            self.delete(key)
+            return default
+
+        self._touched[key] = now
+        return value
+
+    def put(self, key: str, value: Any, ttl: float = None) -> None:
+        """Buffer a value for writing; committed every batch_size puts"""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        blob = self._encode(value)
+        self._pending[key] = (
+            key, blob, self.codec, len(blob), now,
+            now + ttl if ttl else None, now
+        )
+        self._touched.pop(key, None)
+
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def delete(self, key: str) -> None:
+        self._pending.pop(key, None)
+        self._touched.pop(key, None)
+        self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self.conn.commit()
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def flush(self) -> None:
+        """Commit buffered writes and access times, then enforce the byte budget"""
+        if not self._pending and not self._touched:
+            return
+
+        with self.conn:
+            if self._pending:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, value, codec, size, created_at, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    list(self._pending.values())
+                )
+            if self._touched:
+                self.conn.executemany(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                    [(t, k) for k, t in self._touched.items()]
+                )
+        self._pending.clear()
+        self._touched.clear()
+
+        self._evict()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns the number removed"""
+        with self.conn:
+            cur = self.conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time(),)
+            )
+        return cur.rowcount
+
+    def _evict(self) -> int:
+        """Drop expired, then least recently used entries until under max_bytes"""
+        removed = self.purge_expired()
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return removed
+
+        victims = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        return removed + len(victims)
+
+    def migrate_json_dir(self, directory: Path, delete_source: bool = False) -> int:
+        """
+        Import a directory of JSON cache files, keyed by file stem.
+
+        Returns:
+            Number of files imported
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            return 0
+
+        imported = []
+        for path in directory.glob("*.json"):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.put(path.stem, json.load(f))
+                imported.append(path)
+            except Exception:
+                continue  # Unreadable files are left in place
+        self.flush()
+
+        if delete_source:
+            for path in imported:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+        return len(imported)
+
+    def stats(self) -> Dict[str, Any]:
+        count = self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            'entries': count,
+            'bytes': self.total_bytes(),
+            'pending': len(self._pending),
+            'codec': self.codec
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "legacy"
+        legacy.mkdir()
+        for i in range(3):
+            with open(legacy / f"page{i}.json", 'w', encoding='utf-8') as f:
+                json.dump({'url': f'https://example.com/{i}', 'main_content': 'text ' * 500}, f)
+
+        store = CompressedKVStore(Path(tmp) / "cache.db", ttl=3600, max_bytes=200, batch_size=2)
+        print("migrated:", store.migrate_json_dir(legacy, delete_source=True))
+        print("leftover json:", len(list(legacy.glob("*.json"))))
+        store.get("page0")  # Recently used entries survive eviction
+        store.put("page3", {'url': 'https://example.com/3', 'main_content': 'new ' * 500})
+        store.flush()
+        print("stats:", store.stats())
+        print("page0 kept:", store.get("page0") is not None, "| page1 kept:", store.get("page1") is not None)
+        store.close()
@@ -0,0 +1,130 @@
+"""
+Adaptive Per-Host Rate Limiter
+==============================
+Replaces fixed asyncio.sleep() throttling in the scrapers.
+
+Each host gets its own request interval and concurrency limit. The
+interval backs off when the host signals throttling (429/503; DuckDuckGo
+callers also pass 202 via DDG_THROTTLE_STATUSES) and recovers gradually on
+successful responses, so fast hosts are not slowed down by slow ones.
+Callers that serve from cache simply never acquire a slot.
+"""
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+from urllib.parse import urlparse
+
+
+# Status codes a host uses to ask clients to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# DuckDuckGo serves 202 with an empty page instead of 429 when rate limiting
+DDG_THROTTLE_STATUSES = THROTTLE_STATUSES | {202}
+
+
+@dataclass
+class HostState:
+    """Rate limiting state for one host"""
+    interval: float
+    floor: float = 0.0  # Crawl-delay the host asked for; the interval never drops below it
+    next_slot: float = 0.0
+    requests: int = 0
+    throttled: int = 0
+    semaphore: Optional[asyncio.Semaphore] = field(default=None, repr=False)
+
+
+class HostRateLimiter:
+    """
+    Adaptive per-host rate limiter.
+
+    Usage:
+        async with limiter.slot(url):
+            async with session.get(url) as resp:
+                limiter.record(url, resp.status, resp.headers.get('Retry-After'))
+    """
+
+    def __init__(self, base_interval: float = 0.5, min_interval: float = 0.1,
+                 max_interval: float = 30.0, max_per_host: int = 2,
+                 backoff_factor: float = 2.0, recovery_factor: float = 0.8):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_per_host = max_per_host
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self.hosts: Dict[str, HostState] = {}
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower() or url
+
+    def _state(self, url: str) -> HostState:
+        host = self._host(url)
+        if host not in self.hosts:
+            self.hosts[host] = HostState(interval=self.base_interval)
+        return self.hosts[host]
+
+    async def wait(self, url: str) -> None:
+        """Wait for the host's next request slot"""
+        state = self._state(url)
+        now = time.monotonic()
+
+        # Reserve the slot before sleeping so concurrent callers queue up
+        slot = max(now, state.next_slot)
+        state.next_slot = slot + state.interval
+        state.requests += 1
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Hold one of the host's concurrent slots and respect its interval"""
+        state = self._state(url)
+        if state.semaphore is None:
+            state.semaphore = asyncio.Semaphore(self.max_per_host)
+
+        async with state.semaphore:
+            await self.wait(url)
+            yield state
+
+    def record(self, url: str, status: int, retry_after: Optional[str] = None,
+               throttle_statuses: FrozenSet[int] = THROTTLE_STATUSES) -> None:
+        """Adapt the host's interval to a response status"""
+        state = self._state(url)
+
+        if status in throttle_statuses:
+            state.throttled += 1
+            state.interval = min(self.max_interval,
+                                 max(state.interval, self.min_interval) * self.backoff_factor)
+            delay = state.interval
+            try:
+                if retry_after:
+                    delay = max(delay, min(float(retry_after), self.max_interval))
+            except ValueError:
+                pass  # HTTP-date Retry-After values fall back to the backoff interval
+            state.next_slot = max(state.next_slot, time.monotonic() + delay)
+        elif 200 <= status < 400:
+            state.interval = max(self.min_interval, state.floor,
+                                 state.interval * self.recovery_factor)
+    
+    def set_crawl_delay(self, url: str, delay: float) -> None:
+        """Honour a robots.txt crawl-delay for the URL's host"""
+        if delay <= 0:
+            return
+        state = self._state(url)
+        state.floor = min(delay, self.max_interval)
+        state.interval = max(state.interval, state.floor)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host request counts and current intervals"""
+        return {
+            host: {
+                'requests': state.requests,
+                'throttled': state.throttled,
+                'interval': round(state.interval, 3)
+            }
+            for host, state in self.hosts.items()
+        }
@@ -0,0 +1,272 @@
+"""
+Local Research Corpus
+=====================
+Persists every research page the pipeline reads into a local SQLite FTS5
+index with BM25 ranking.
+
+Research for a new company first queries this corpus and only goes to the
+web for the gaps, which makes repeated sector research near-instant and
+lets the pipeline produce useful market intelligence offline.
+
+Writers:
+- AdvancedResearchEngine.fetch_webpage_content
+- IntelligentScraper.extract_page
+"""
+import re
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Iterable, List, Optional
+from dataclasses import dataclass
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+
+
+# Words that carry no ranking signal in research queries
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'to', 'with', 'analysis', 'forecast', 'report',
+}
+
+
+@dataclass
+class CorpusHit:
+    """A page returned from the local corpus"""
+    url: str
+    title: str
+    content: str
+    sector: str
+    source: str
+    fetched_at: float
+    score: float = 0.0  # Higher is better (negated BM25)
+
+
+class ResearchCorpus:
+    """
+    SQLite FTS5 full-text index over fetched research pages.
+
+    Page metadata lives in a regular table keyed by URL; the FTS5 table is an
+    external-content index over it, kept in sync by triggers.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            id INTEGER PRIMARY KEY,
+            url TEXT UNIQUE NOT NULL,
+            title TEXT,
+            content TEXT,
+            sector TEXT,
+            source TEXT,
+            content_hash TEXT,
+            fetched_at REAL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+            title, content, sector,
+            content='pages', content_rowid='id',
+            tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+            INSERT INTO pages_fts(rowid, title, content, sector)
+            VALUES (new.id, new.title, new.content, new.sector);
+        END;
+        CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+            INSERT INTO pages_fts(pages_fts, rowid, title, content, sector)
+            VALUES ('delete', old.id, old.title, old.content, old.sector);
+        END;
+        CREATE TRIGGER IF NOT EXISTS pages_au AFTER UPDATE ON pages BEGIN
+            INSERT INTO pages_fts(pages_fts, rowid, title, content, sector)
+            VALUES ('delete', old.id, old.title, old.content, old.sector);
+            INSERT INTO pages_fts(rowid, title, content, sector)
+            VALUES (new.id, new.title, new.content, new.sector);
+        END;
+    """
+
+    def __init__(self, db_path: Path = None):
+        self.db_path = db_path or OUTPUT_DIR / "research_cache" / "research_corpus.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.available = True
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        try:
+            self.conn.executescript(self.SCHEMA)
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            # SQLite builds without FTS5 cannot host the corpus
+            print(f"  ⚠ Research corpus disabled: {e}")
+            self.available = False
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_page(self, url: str, title: str, content: str, sector: str = "",
+                 source: str = "", fetched_at: float = None, commit: bool = True) -> bool:
+        """
+        Insert or refresh a page.
+
+        Returns:
+            True if the page was new or its content changed
+        """
+        if not self.available or not url or not content:
+            return False
+
+        content_hash = hashlib.sha1(content.encode('utf-8', 'ignore')).hexdigest()
+        row = self.conn.execute(
+            "SELECT content_hash, sector FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row and row['content_hash'] == content_hash and (not sector or row['sector'] == sector):
+            return False
+
+        self.conn.execute(
+            """
+            INSERT INTO pages (url, title, content, sector, source, content_hash, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                content = excluded.content,
+                sector = CASE WHEN excluded.sector != '' THEN excluded.sector ELSE pages.sector END,
+                source = excluded.source,
+                content_hash = excluded.content_hash,
+                fetched_at = excluded.fetched_at
+            """,
+            (url, title or "", content, sector or "", source or "",
+             content_hash, fetched_at or time.time())
+        )
+        if commit:
+            self.conn.commit()
+        return True
+
+    def add_pages(self, pages: Iterable[dict]) -> int:
+        """Insert many pages in one transaction; returns the number written"""
+        written = sum(1 for page in pages if self.add_page(commit=False, **page))
+        if self.available:
+            self.conn.commit()
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _to_match_query(query: str, ignore: str = "") -> str:
+        """Turn free text into an FTS5 OR-query of quoted terms (minus the words of `ignore`)"""
+        skip = _STOPWORDS | set(re.findall(r'\w+', ignore.lower()))
+        terms = [
+            t for t in re.findall(r'\w+', query.lower())
+            if t not in skip and len(t) > 1
+        ]
+        return ' OR '.join(f'"{t}"' for t in dict.fromkeys(terms))
+
+    def search(self, query: str, limit: int = 10, sector: str = None,
+               max_age_days: float = None, source: str = None,
+               min_score: float = None) -> List[CorpusHit]:
+        """
+        BM25-ranked full-text search.
+
+        Args:
+            query: Free-text query
+            limit: Maximum hits
+            sector: Restrict to pages stored for this sector; its words are
+                    dropped from the query, since every page of the sector
+                    would match them
+            max_age_days: Ignore pages fetched longer ago than this
+            source: Restrict to pages stored by this writer
+            min_score: Drop hits scoring below this (negated BM25)
+        """
+        match = self._to_match_query(query, ignore=sector or "")
+        if not self.available or not match:
+            return []
+
+        sql = """
+            SELECT p.url, p.title, p.content, p.sector, p.source, p.fetched_at,
+                   bm25(pages_fts, 2.0, 1.0, 0.5) AS rank
+            FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid
+            WHERE pages_fts MATCH ?
+        """
+        params: list = [match]
+        if sector:
+            sql += " AND p.sector = ?"
+            params.append(sector)
+        if source:
+            sql += " AND p.source = ?"
+            params.append(source)
+        if max_age_days is not None:
+            sql += " AND p.fetched_at >= ?"
+            params.append(time.time() - max_age_days * 86400)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"  ⚠ Corpus search error: {e}")
+            return []
+
+        return [
+            CorpusHit(
+                url=row['url'], title=row['title'], content=row['content'],
+                sector=row['sector'], source=row['source'],
+                fetched_at=row['fetched_at'], score=-row['rank']
+            )
+            for row in rows
+            if min_score is None or -row['rank'] >= min_score
+        ]
+
+    def get(self, url: str, max_age_days: float = None) -> Optional[CorpusHit]:
+        """Look up a stored page by URL"""
+        if not self.available:
+            return None
+
+        row = self.conn.execute(
+            "SELECT url, title, content, sector, source, fetched_at FROM pages WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if not row:
+            return None
+        if max_age_days is not None and row['fetched_at'] < time.time() - max_age_days * 86400:
+            return None
+        return CorpusHit(**dict(row))
+
+    def count(self) -> int:
+        """Number of stored pages"""
+        if not self.available:
+            return 0
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# Shared instance so all research engines write to one connection
+_research_corpus = None
+
+
+def get_research_corpus() -> ResearchCorpus:
+    """Get or create the research corpus singleton"""
+    global _research_corpus
+    if _research_corpus is None:
+        _research_corpus = ResearchCorpus()
+    return _research_corpus
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = ResearchCorpus(Path(tmp) / "corpus.db")
+        corpus.add_pages([
+            {'url': 'https://a.example/forging', 'title': 'India forging market',
+             'content': 'The India forging market size is $4.5 billion with 8% CAGR.',
+             'sector': 'Manufacturing & Industrials'},
+            {'url': 'https://b.example/pharma', 'title': 'Pharma exports',
+             'content': 'Indian pharmaceutical exports grew 10% to $27 billion.',
+             'sector': 'Pharmaceuticals'},
+        ])
+        for hit in corpus.search("forging market size India CAGR"):
+            print(f"  {hit.score:.3f}  {hit.url}  {hit.title}")
+        print(f"  pages: {corpus.count()}")
+        corpus.close()
@@ -12,13 +12,19 @@ from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.robotparser import RobotFileParser
+from itertools import islice
+import lxml.html
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from config.settings import COMPANY_DATA_DIR
+from src.web_scraping.fact_extractor import get_fact_extractor, METRIC_KINDS
+from src.web_scraping.http_replay import wrap_aiohttp_session
+from src.web_scraping.site_metadata import get_site_metadata_cache
+from src.web_scraping.text_extractor import extract_main_text, parse_lxml
 
 
 @dataclass
@@ -41,17 +47,103 @@ class WebScrapedData:
     source_urls: List[str] = field(default_factory=list)
 
 
+class ScrapeAccumulator:
+    """
+    Bounded per-company accumulator for scraped pages.
+    
+    Text is kept only up to a hard character cap and list fields are
+    deduplicated as they arrive, stopping at their quotas, so memory stays
+    flat however large the site is.
+    """
+    
+    def __init__(self, text_budget: int = 20000, quotas: Dict[str, int] = None):
+        self.text_budget = text_budget
+        self.quotas = quotas or {'products': 15, 'services': 15, 'metrics': 10, 'certifications': 10}
+        self._chunks: List[str] = []
+        self._text_len = 0
+        self._items: Dict[str, Dict[str, None]] = {name: {} for name in self.quotas}
+    
+    def add_text(self, text: str) -> None:
+        """Append page text, truncating at the budget"""
+        remaining = self.text_budget - self._text_len
+        if remaining <= 0 or not text:
+            return
+        if self._chunks:
+            text = '\n\n' + text
+        chunk = text[:remaining]
+        self._chunks.append(chunk)
+        self._text_len += len(chunk)
+    
+    def add_items(self, name: str, items: List[str]) -> None:
+        """Add items to a field, deduplicating and stopping at its quota"""
+        seen = self._items[name]
+        quota = self.quotas[name]
+        for item in items:
+            if len(seen) >= quota:
+                return
+            seen.setdefault(item)
+    
+    @property
+    def full(self) -> bool:
+        """True once the text budget and every field quota are filled"""
+        return self._text_len >= self.text_budget and all(
+            len(self._items[name]) >= quota for name, quota in self.quotas.items()
+        )
+    
+    @property
+    def text(self) -> str:
+        return ''.join(self._chunks)
+    
+    def items(self, name: str) -> List[str]:
+        return list(self._items[name])
+
+
 class AsyncWebScraper:
     """
     Asynchronous web scraper optimized for company websites.
     Extracts text, images, and structured data.
+    
+    Candidate pages are discovered from the homepage navigation and the
+    site's sitemap.xml, filtered through robots.txt and fetched concurrently
+    within a per-site page and time budget.
     """
     
-    def __init__(self, cache_dir: Path = None):
+    # Used only when neither navigation links nor sitemap yield candidates
+    FALLBACK_PATHS = [
+        '/about', '/about-us', '/products', '/services',
+        '/investors', '/investor-relations',
+    ]
+    
+    # URL keywords that mark a page as useful for a company profile (weight)
+    PAGE_KEYWORDS = {
+        'about': 3, 'company': 2, 'overview': 2, 'who-we-are': 3, 'profile': 2,
+        'product': 3, 'solution': 2, 'service': 3, 'offering': 2, 'capabilit': 2,
+        'investor': 3, 'financial': 2, 'annual-report': 1, 'business': 1,
+        'industr': 1, 'quality': 1, 'certification': 1, 'infrastructure': 1,
+        'manufactur': 1, 'facilit': 1, 'leadership': 1, 'management': 1,
+    }
+    
+    # Paths that are never worth a request for profile extraction
+    SKIP_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg',
+                       '.zip', '.doc', '.docx', '.xls', '.xlsx', '.mp4', '.xml')
+    SKIP_KEYWORDS = ('login', 'signin', 'cart', 'careers/job', 'privacy',
+                     'terms', 'cookie', 'wp-admin', 'feed', 'tag/', 'author/')
+    
+    # Larger documents are truncated before parsing to bound tree memory
+    MAX_HTML_CHARS = 1_500_000
+    
+    def __init__(self, cache_dir: Path = None, max_pages: int = 6,
+                 max_concurrency: int = 4, site_timeout: float = 60.0):
         self.cache_dir = cache_dir or (COMPANY_DATA_DIR.parent / "cache" / "web")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.session: Optional[aiohttp.ClientSession] = None
         
+        # Per-site crawl budget
+        self.max_pages = max_pages
+        self.max_concurrency = max_concurrency
+        self.site_timeout = site_timeout
+        self.site_cache = get_site_metadata_cache()
+        
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -59,7 +151,7 @@ class AsyncWebScraper:
         }
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self.session = wrap_aiohttp_session(aiohttp.ClientSession(headers=self.headers))
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -106,46 +198,47 @@ class AsyncWebScraper:
             print(f"Error fetching {url}: {e}")
             return "", 0
     
-    def _extract_text_content(self, soup: BeautifulSoup) -> str:
-        """Extract meaningful text from page"""
-        # Remove script, style, nav, footer elements
-        for tag in soup.find_all(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-            tag.decompose()
-        
-        # Get text from main content areas
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
-        if main_content:
-            text = main_content.get_text(separator='\n', strip=True)
-            # Clean up excessive whitespace
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            text = re.sub(r' {2,}', ' ', text)
-            return text[:10000]  # Limit text length
-        return ""
-    
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_text_content(self, html: Any) -> str:
+        """Extract meaningful text from page HTML or its parsed tree (shared text-density engine)"""
+        return extract_main_text(html, max_chars=10000).text  # Limit text length
+    
+    @staticmethod
+    def _node_text(el) -> str:
+        """Stripped text of an element's strings, joined without separators"""
+        return ''.join(part.strip() for part in el.itertext())
+    
+    def _strip_boilerplate(self, root: lxml.html.HtmlElement) -> None:
+        """Remove script, style, nav, footer elements before list extraction"""
+        for el in list(root.iter('script', 'style', 'nav', 'footer', 'header', 'aside')):
+            el.drop_tree()
+    
+    def _extract_metadata(self, root: lxml.html.HtmlElement) -> Dict[str, str]:
         """Extract page metadata"""
         metadata = {}
         
+        def meta_content(attr: str, value: str) -> Optional[str]:
+            found = root.xpath(f'//meta[@{attr}=$value]', value=value)
+            return found[0].get('content', '') if found else None
+        
         # Title
-        title_tag = soup.find('title')
-        metadata['title'] = title_tag.get_text(strip=True) if title_tag else ""
+        title_tag = root.find('.//title')
+        metadata['title'] = self._node_text(title_tag) if title_tag is not None else ""
         
         # Meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        metadata['description'] = meta_desc.get('content', '') if meta_desc else ""
+        metadata['description'] = meta_content('name', 'description') or ""
         
         # OG tags
-        og_title = soup.find('meta', property='og:title')
-        if og_title:
-            metadata['og_title'] = og_title.get('content', '')
+        og_title = meta_content('property', 'og:title')
+        if og_title is not None:
+            metadata['og_title'] = og_title
         
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc:
-            metadata['og_description'] = og_desc.get('content', '')
+        og_desc = meta_content('property', 'og:description')
+        if og_desc is not None:
+            metadata['og_description'] = og_desc
         
         return metadata
     
-    def _extract_products_services(self, soup: BeautifulSoup, text: str) -> Tuple[List[str], List[str]]:
+    def _extract_products_services(self, root: lxml.html.HtmlElement, text: str) -> Tuple[List[str], List[str]]:
         """Extract products and services mentions"""
         products = []
         services = []
@@ -155,24 +248,24 @@ class AsyncWebScraper:
         service_keywords = ['service', 'consulting', 'support', 'maintenance']
         
         # Find lists in relevant sections
-        for section in soup.find_all(['section', 'div']):
-            section_text = section.get_text().lower()
+        for section in root.iter('section', 'div'):
+            section_text = section.text_content().lower()
             
             if any(kw in section_text for kw in product_keywords):
-                for li in section.find_all('li')[:10]:
-                    item = li.get_text(strip=True)
+                for li in islice(section.iterdescendants('li'), 10):
+                    item = self._node_text(li)
                     if 5 < len(item) < 100:
                         products.append(item)
             
             if any(kw in section_text for kw in service_keywords):
-                for li in section.find_all('li')[:10]:
-                    item = li.get_text(strip=True)
+                for li in islice(section.iterdescendants('li'), 10):
+                    item = self._node_text(li)
                     if 5 < len(item) < 100:
                         services.append(item)
         
         # Extract from headings
-        for heading in soup.find_all(['h2', 'h3', 'h4']):
-            heading_text = heading.get_text(strip=True)
+        for heading in root.iter('h2', 'h3', 'h4'):
+            heading_text = self._node_text(heading)
             if any(kw in heading_text.lower() for kw in product_keywords):
                 products.append(heading_text)
             if any(kw in heading_text.lower() for kw in service_keywords):
@@ -181,26 +274,14 @@ class AsyncWebScraper:
         return list(set(products))[:15], list(set(services))[:15]
     
     def _extract_metrics(self, text: str) -> List[str]:
-        """Extract numerical metrics from text"""
-        metrics = []
-        
-        # Patterns for common metrics
-        patterns = [
-            r'\b(\d+(?:,\d+)*(?:\.\d+)?)\s*(?:million|billion|crore|lakh)\b',
-            r'\b(\d+(?:\.\d+)?)\s*%\s*(?:growth|increase|margin|CAGR)',
-            r'\b(\d+)\+?\s*(?:employees?|customers?|clients?|countries?|years?)',
-            r'(?:revenue|sales|profit)\s*(?:of|:)?\s*(?:₹|rs\.?|inr|usd|\$)?\s*(\d+(?:,\d+)*(?:\.\d+)?)',
-            r'\b(\d{4})\s*(?:founded|established|since)',
-        ]
+        """Extract numerical metrics (with surrounding context) from text"""
+        extractor = get_fact_extractor(METRIC_KINDS)
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                context_start = max(0, match.start() - 50)
-                context_end = min(len(text), match.end() + 50)
-                context = text[context_start:context_end].strip()
-                if len(context) < 200:
-                    metrics.append(context)
+        metrics = []
+        for fact in extractor.extract(text):
+            context = extractor.context(text, fact, window=50)
+            if len(context) < 200:
+                metrics.append(context)
         
         return list(set(metrics))[:10]
     
@@ -235,11 +316,11 @@ class AsyncWebScraper:
         
         return list(set(certs))[:10]
     
-    def _extract_images(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+    def _extract_images(self, root: lxml.html.HtmlElement, base_url: str) -> List[Dict[str, str]]:
         """Extract relevant images from page"""
         images = []
         
-        for img in soup.find_all('img'):
+        for img in root.iter('img'):
             src = img.get('src', '')
             alt = img.get('alt', '')
             
@@ -264,10 +345,142 @@ class AsyncWebScraper:
         
         return images[:20]
     
+    # ------------------------------------------------------------------
+    # Page discovery (robots.txt, sitemap.xml, navigation links)
+    # ------------------------------------------------------------------
+    
+    def _extract_nav_links(self, root: lxml.html.HtmlElement, base_url: str) -> List[str]:
+        """Collect same-site links from navigation menus and header/footer"""
+        containers = list(root.iter('nav', 'header', 'footer'))
+        containers += root.xpath('//*[contains(@class, "menu") or contains(@id, "menu")'
+                                 ' or contains(@class, "nav") or contains(@id, "nav")]')
+        
+        links = []
+        for container in containers or [root]:
+            for a in container.iterdescendants('a'):
+                href = a.get('href')
+                if href is not None:
+                    links.append(urljoin(base_url, href))
+        return links
+    
+    def _score_candidate(self, url: str) -> int:
+        """Score a candidate URL by how likely it holds company-profile content"""
+        path = urlparse(url).path.lower()
+        if not path.strip('/'):
+            return 0
+        if path.endswith(self.SKIP_EXTENSIONS) or any(kw in path for kw in self.SKIP_KEYWORDS):
+            return 0
+        
+        score = sum(weight for kw, weight in self.PAGE_KEYWORDS.items() if kw in path)
+        # Deep pages are usually articles or product detail pages
+        depth = len([part for part in path.split('/') if part])
+        return max(0, score - max(0, depth - 2))
+    
+    def _select_candidates(self, base_url: str, nav_links: List[str],
+                           sitemap_urls: List[str], robots: RobotFileParser,
+                           limit: int) -> List[str]:
+        """Rank discovered URLs and keep the best same-site, robots-allowed ones"""
+        base_host = urlparse(base_url).netloc.lower().replace('www.', '')
+        user_agent = self.headers['User-Agent']
+        
+        scored = {}
+        for source_rank, urls in enumerate([nav_links, sitemap_urls]):
+            for url in urls:
+                url = urldefrag(url)[0].rstrip('/')
+                parsed = urlparse(url)
+                if parsed.scheme not in ('http', 'https'):
+                    continue
+                if parsed.netloc.lower().replace('www.', '') != base_host:
+                    continue
+                if url in scored or url == base_url.rstrip('/'):
+                    continue
+                
+                score = self._score_candidate(url)
+                if score > 0 and robots.can_fetch(user_agent, url):
+                    # Navigation links win ties over sitemap entries
+                    scored[url] = (-score, source_rank, len(url))
+        
+        ranked = sorted(scored, key=scored.get)
+        if not ranked:
+            ranked = [
+                urljoin(base_url, path) for path in self.FALLBACK_PATHS
+                if robots.can_fetch(user_agent, urljoin(base_url, path))
+            ]
+        return ranked[:limit]
+    
+    def _parse_page(self, html: str, page_url: str, base_url: str,
+                    is_home: bool) -> Dict[str, Any]:
+        """
+        Parse one page into extracted fields.
+        CPU-bound; called through asyncio.to_thread to keep the event loop free.
+        """
+        # One lxml parse feeds the text extractor and every DOM helper below
+        root = parse_lxml(html)
+        if root is None:
+            root = lxml.html.fromstring('<html><body></body></html>')
+        parsed: Dict[str, Any] = {}
+        
+        if is_home:
+            parsed['metadata'] = self._extract_metadata(root)
+            # Must run before _strip_boilerplate removes nav/header/footer
+            parsed['nav_links'] = self._extract_nav_links(root, base_url)
+        
+        text = self._extract_text_content(root)  # Reuses the parse; before boilerplate stripping
+        self._strip_boilerplate(root)
+        parsed['text'] = text
+        parsed['products'], parsed['services'] = self._extract_products_services(root, text)
+        parsed['metrics'] = self._extract_metrics(text)
+        parsed['certifications'] = self._extract_certifications(text)
+        
+        if is_home:
+            parsed['images'] = self._extract_images(root, base_url)
+        
+        return parsed
+    
+    async def _fetch_and_parse(self, page_url: str, base_url: str, is_home: bool,
+                               semaphore: asyncio.Semaphore,
+                               crawl_delay: float = 0.0) -> Optional[Dict[str, Any]]:
+        """Fetch a page under the concurrency limit, then parse it off-loop"""
+        async with semaphore:
+            html, status = await self.fetch_page(page_url)
+            if crawl_delay:
+                await asyncio.sleep(crawl_delay)
+        
+        if status != 200 or not html:
+            return None
+        html = html[:self.MAX_HTML_CHARS]
+        
+        try:
+            parsed = await asyncio.to_thread(self._parse_page, html, page_url, base_url, is_home)
+        except Exception as e:
+            print(f"   ⚠ Error parsing {page_url}: {e}")
+            return None
+        
+        parsed['url'] = page_url
+        return parsed
+    
+    def _merge_page(self, result: WebScrapedData, parsed: Dict[str, Any],
+                    acc: ScrapeAccumulator) -> None:
+        """Merge one parsed page into the aggregate result"""
+        result.source_urls.append(parsed['url'])
+        
+        if 'metadata' in parsed:
+            result.title = parsed['metadata'].get('title', '')
+            result.description = parsed['metadata'].get('description', '')
+        if 'images' in parsed:
+            result.images = parsed['images']
+        
+        acc.add_text(parsed['text'])
+        for name in acc.quotas:
+            acc.add_items(name, parsed[name])
+    
     async def scrape_company(self, base_url: str, company_name: str = "") -> WebScrapedData:
         """
         Scrape a company website comprehensively.
-        Visits multiple pages to gather complete information.
+        
+        Fetches robots.txt and the homepage, discovers candidate pages from
+        navigation links and sitemap.xml, then fetches the best candidates
+        concurrently within the per-site page and time budget.
         """
         # Check cache first
         cached = self._get_cached(base_url)
@@ -278,75 +491,74 @@ class AsyncWebScraper:
         print(f"   🌐 Scraping {base_url}...")
         
         result = WebScrapedData(url=base_url, title="", description="")
-        all_text = []
-        visited_urls = set()
-        
-        # Pages to visit
-        pages_to_visit = [
-            base_url,
-            urljoin(base_url, '/about'),
-            urljoin(base_url, '/about-us'),
-            urljoin(base_url, '/products'),
-            urljoin(base_url, '/services'),
-            urljoin(base_url, '/investors'),
-            urljoin(base_url, '/investor-relations'),
-        ]
+        acc = ScrapeAccumulator()
         
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with wrap_aiohttp_session(aiohttp.ClientSession(headers=self.headers)) as session:
             self.session = session
             
-            for page_url in pages_to_visit[:5]:  # Limit to 5 pages
-                if page_url in visited_urls:
-                    continue
-                
-                visited_urls.add(page_url)
-                html, status = await self.fetch_page(page_url)
-                
-                if status != 200 or not html:
-                    continue
-                
-                result.source_urls.append(page_url)
-                
+            # robots.txt and sitemap come from the shared per-domain cache
+            site = await self.site_cache.get(base_url, self.fetch_page)
+            robots = site.robots
+            if not robots.can_fetch(self.headers['User-Agent'], base_url):
+                print(f"   ⚠ robots.txt disallows {base_url}")
+                return result
+            
+            crawl_delay = site.crawl_delay(self.headers['User-Agent'])
+            # A crawl delay means requests to this host must be serialized
+            semaphore = asyncio.Semaphore(1 if crawl_delay else self.max_concurrency)
+            
+            home_task = self._fetch_and_parse(base_url, base_url, True, semaphore, crawl_delay)
+            home, site = await asyncio.gather(
+                home_task, self.site_cache.get(base_url, self.fetch_page, include_sitemap=True)
+            )
+            sitemap_urls = site.sitemap_urls or []
+            
+            nav_links = []
+            if home:
+                self._merge_page(result, home, acc)
+                nav_links = home.get('nav_links', [])
+            
+            candidates = self._select_candidates(
+                base_url, nav_links, sitemap_urls, robots, self.max_pages - 1
+            )
+            
+            tasks = [
+                asyncio.create_task(
+                    self._fetch_and_parse(url, base_url, False, semaphore, crawl_delay)
+                )
+                for url in candidates
+            ]
+            # Merge in ranking order so results are deterministic, stopping
+            # early once every field is filled or the site budget runs out
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.site_timeout
+            for task in tasks:
+                remaining = deadline - loop.time()
+                if acc.full or remaining <= 0:
+                    break
                 try:
-                    soup = BeautifulSoup(html, 'lxml')
-                    
-                    # Extract metadata from main page
-                    if page_url == base_url:
-                        metadata = self._extract_metadata(soup)
-                        result.title = metadata.get('title', '')
-                        result.description = metadata.get('description', '')
-                    
-                    # Extract text
-                    text = self._extract_text_content(soup)
-                    all_text.append(text)
-                    
-                    # Extract products/services
-                    products, services = self._extract_products_services(soup, text)
-                    result.products.extend(products)
-                    result.services.extend(services)
-                    
-                    # Extract metrics
-                    metrics = self._extract_metrics(text)
-                    result.metrics.extend(metrics)
-                    
-                    # Extract certifications
-                    certs = self._extract_certifications(text)
-                    result.certifications.extend(certs)
-                    
-                    # Extract images (from main page only)
-                    if page_url == base_url:
-                        images = self._extract_images(soup, base_url)
-                        result.images = images
-                    
-                except Exception as e:
-                    print(f"   ⚠ Error parsing {page_url}: {e}")
-        
-        # Combine and deduplicate
-        result.raw_text = '\n\n'.join(all_text)[:20000]
-        result.products = list(set(result.products))[:15]
-        result.services = list(set(result.services))[:15]
-        result.metrics = list(set(result.metrics))[:10]
-        result.certifications = list(set(result.certifications))[:10]
+                    parsed = await asyncio.wait_for(asyncio.shield(task), remaining)
+                except asyncio.TimeoutError:
+                    break
+                except Exception:
+                    continue
+                if parsed:
+                    self._merge_page(result, parsed, acc)
+            
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                reason = "All fields filled" if acc.full else "Site budget exhausted"
+                print(f"   ⚠ {reason}, skipped {len(pending)} pages")
+                await asyncio.gather(*pending, return_exceptions=True)
+        
+        # Already deduplicated and capped while merging
+        result.raw_text = acc.text
+        result.products = acc.items('products')
+        result.services = acc.items('services')
+        result.metrics = acc.items('metrics')
+        result.certifications = acc.items('certifications')
         
         # Cache results
         self._save_cache(base_url, result.__dict__)
@@ -0,0 +1,198 @@
+"""
+Site Metadata Cache
+===================
+Shared per-domain cache of robots.txt rules, crawl-delay and sitemap URLs.
+
+Every scraper asks this cache before fetching from a domain, so robots.txt
+and sitemaps are fetched once per domain per TTL instead of once per scraper
+run, and all scrapers honour the same rules and crawl delays.
+
+Users:
+- AsyncWebScraper.scrape_company (robots, crawl-delay, sitemap candidates)
+- IntelligentScraper.extract_page (robots, crawl-delay)
+- AdvancedResearchEngine.fetch_webpage_content (robots, crawl-delay)
+"""
+import re
+import time
+import atexit
+import asyncio
+import aiohttp
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from config.settings import OUTPUT_DIR
+from src.web_scraping.kv_store import CompressedKVStore
+
+
+# async (url, timeout) -> (text, status); status 0 means the request failed
+FetchText = Callable[[str, float], Awaitable[Tuple[str, int]]]
+
+
+async def fetch_text(session, url: str, timeout: float = 15) -> Tuple[str, int]:
+    """Fetch a URL's text with an aiohttp-style session, never raising"""
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status != 200:
+                return "", response.status
+            return await response.text(), response.status
+    except Exception:
+        return "", 0
+
+
+@dataclass
+class SiteMetadata:
+    """robots.txt rules and sitemap URLs for one domain"""
+    domain: str
+    robots_status: int = 0
+    robots_lines: List[str] = field(default_factory=list)
+    sitemap_urls: Optional[List[str]] = None  # None = sitemap not fetched yet
+    fetched_at: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        self._parser: Optional[RobotFileParser] = None
+
+    @property
+    def robots(self) -> RobotFileParser:
+        """Parsed robots rules (a missing robots.txt allows everything)"""
+        if self._parser is None:
+            parser = RobotFileParser(f"https://{self.domain}/robots.txt")
+            if self.robots_status in (401, 403):
+                parser.disallow_all = True
+            parser.parse(self.robots_lines if self.robots_status == 200 else [])
+            self._parser = parser
+        return self._parser
+
+    def can_fetch(self, url: str, user_agent: str = '*') -> bool:
+        return self.robots.can_fetch(user_agent, url)
+
+    def crawl_delay(self, user_agent: str = '*') -> float:
+        return float(self.robots.crawl_delay(user_agent) or 0)
+
+    def to_dict(self) -> Dict:
+        return {
+            'domain': self.domain,
+            'robots_status': self.robots_status,
+            'robots_lines': self.robots_lines,
+            'sitemap_urls': self.sitemap_urls,
+            'fetched_at': self.fetched_at
+        }
+
+
+class SiteMetadataCache:
+    """
+    Per-domain robots/sitemap cache with TTL.
+
+    Entries live in memory and in a compressed on-disk store, so the cache is
+    shared by all scrapers in a process and survives between runs.
+    """
+
+    def __init__(self, store_path: Path = None, ttl: float = 24 * 3600,
+                 max_sitemaps: int = 3, max_sitemap_urls: int = 2000):
+        self.ttl = ttl
+        self.max_sitemaps = max_sitemaps
+        self.max_sitemap_urls = max_sitemap_urls
+        self.store = CompressedKVStore(
+            store_path or OUTPUT_DIR / "web_cache" / "site_metadata.db",
+            ttl=ttl, max_bytes=32 * 1024 * 1024, batch_size=8
+        )
+        self._sites: Dict[str, SiteMetadata] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    @staticmethod
+    def domain(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _cached(self, domain: str) -> Optional[SiteMetadata]:
+        site = self._sites.get(domain)
+        if site is None:
+            data = self.store.get(domain)
+            if data:
+                site = SiteMetadata(**data)
+                self._sites[domain] = site
+        if site and time.time() - site.fetched_at > self.ttl:
+            del self._sites[domain]
+            return None
+        return site
+
+    async def get(self, url: str, fetch: FetchText,
+                  include_sitemap: bool = False) -> SiteMetadata:
+        """
+        Metadata for the URL's domain, fetched with `fetch` on a cache miss.
+
+        Args:
+            url: Any URL on the site
+            fetch: async (url, timeout) -> (text, status)
+            include_sitemap: Also collect sitemap page URLs
+        """
+        domain = self.domain(url)
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+
+        # One fetch per domain even when many pages are requested at once
+        async with lock:
+            site = self._cached(domain)
+            if site is None:
+                site = await self._fetch_robots(url, domain, fetch)
+            if include_sitemap and site.sitemap_urls is None:
+                site.sitemap_urls = await self._fetch_sitemap_urls(url, site, fetch)
+                self._save(site)
+        return site
+
+    async def _fetch_robots(self, url: str, domain: str, fetch: FetchText) -> SiteMetadata:
+        scheme = urlparse(url).scheme or 'https'
+        text, status = await fetch(f"{scheme}://{domain}/robots.txt", 10)
+        site = SiteMetadata(
+            domain=domain,
+            robots_status=status,
+            robots_lines=text.splitlines() if status == 200 else []
+        )
+        self._save(site)
+        return site
+
+    async def _fetch_sitemap_urls(self, url: str, site: SiteMetadata,
+                                  fetch: FetchText) -> List[str]:
+        """Collect page URLs from sitemap.xml, following sitemap indexes up to max_sitemaps files"""
+        base_url = f"{urlparse(url).scheme or 'https'}://{site.domain}/"
+        sitemaps = list(site.robots.site_maps() or []) or [urljoin(base_url, '/sitemap.xml')]
+        page_urls = []
+        fetched = 0
+
+        while sitemaps and fetched < self.max_sitemaps:
+            xml, status = await fetch(sitemaps.pop(0), 15)
+            fetched += 1
+            if status != 200 or not xml:
+                continue
+
+            locs = re.findall(r'<loc>\s*([^<\s]+)\s*</loc>', xml, re.IGNORECASE)
+            if re.search(r'<sitemapindex', xml, re.IGNORECASE):
+                # Prefer page sitemaps over post/product-detail sitemaps
+                locs.sort(key=lambda u: (0 if 'page' in u.lower() else 1, len(u)))
+                sitemaps.extend(locs)
+            else:
+                page_urls.extend(locs)
+
+        return page_urls[:self.max_sitemap_urls]
+
+    def _save(self, site: SiteMetadata) -> None:
+        self._sites[site.domain] = site
+        self.store.put(site.domain, site.to_dict())
+
+    def flush(self) -> None:
+        self.store.flush()
+
+
+# Shared instance so every scraper consults the same cache
+_site_metadata_cache = None
+
+
+def get_site_metadata_cache() -> SiteMetadataCache:
+    """Get or create the site metadata cache singleton"""
+    global _site_metadata_cache
+    if _site_metadata_cache is None:
+        _site_metadata_cache = SiteMetadataCache()
+        atexit.register(_site_metadata_cache.flush)
+    return _site_metadata_cache
@@ -0,0 +1,432 @@
+"""
+HTML Text Extraction Engine
+===========================
+Readability-style main-content extraction shared by all scrapers.
+
+The document is walked once and split into text blocks at block-level
+element boundaries. Each block records its word count and how much of its
+text sits inside links. Blocks are then classified in a single linear pass:
+long, link-poor blocks are content, link-heavy blocks (menus, tag clouds,
+footers) are boilerplate, and short blocks are kept only next to content.
+
+Backends, fastest available first:
+- selectolax (Lexbor)
+- lxml
+- BeautifulSoup (fallback)
+
+Callers that need the DOM for other extraction can parse once with
+parse_lxml() and pass the tree (or an existing BeautifulSoup) instead of
+the HTML string.
+
+Run this module with saved .html files, directories or HTTP cassettes
+(.jsonl.gz) to benchmark the available backends.
+"""
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterator, List, Tuple
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+    HAS_BS4 = True
+except ImportError:
+    HAS_BS4 = False
+
+
+# Subtrees that never contain main content
+SKIP_TAGS = frozenset({
+    'script', 'style', 'noscript', 'iframe', 'form', 'nav', 'header', 'footer',
+    'aside', 'svg', 'template', 'button', 'select', 'head',
+})
+
+# Elements that start a new text block
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'blockquote', 'body', 'br', 'dd', 'div', 'dl', 'dt',
+    'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'li', 'main',
+    'ol', 'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+})
+
+HEADING_TAGS = frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'})
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Walk events: ('start', tag) | ('end', tag) | ('text', text)
+Event = Tuple[str, str]
+
+
+@dataclass
+class TextBlock:
+    """A run of text between block-level boundaries"""
+    text: str
+    link_chars: int = 0
+    heading: bool = False
+
+    @property
+    def words(self) -> int:
+        return self.text.count(' ') + 1 if self.text else 0
+
+    @property
+    def link_density(self) -> float:
+        return self.link_chars / len(self.text) if self.text else 0.0
+
+
+@dataclass
+class ExtractedText:
+    """Main content extracted from one page"""
+    title: str
+    text: str
+    blocks: List[str] = field(default_factory=list)
+    backend: str = ""
+
+
+# ----------------------------------------------------------------------
+# Backend walkers (iterative, so deep DOMs cannot hit the recursion limit)
+# ----------------------------------------------------------------------
+
+def _walk_selectolax(root) -> Iterator[Event]:
+    stack = [(root, False)]
+    while stack:
+        node, done = stack.pop()
+        tag = node.tag
+        if done:
+            yield 'end', tag
+            continue
+        if tag == '-text':
+            yield 'text', node.text_content or ''
+            continue
+        if not tag or tag.startswith('-') or tag in SKIP_TAGS:  # Comments, PIs (no tag), doctype
+            continue
+
+        yield 'start', tag
+        stack.append((node, True))
+        children = []
+        child = node.child
+        while child is not None:
+            children.append(child)
+            child = child.next
+        stack.extend((c, False) for c in reversed(children))
+
+
+def _walk_lxml(root) -> Iterator[Event]:
+    # Tails belong to the parent's text flow; comments, processing
+    # instructions and skipped subtrees contribute only their tail
+    stack = [(root, False)]
+    while stack:
+        el, done = stack.pop()
+        if done:
+            yield 'end', el.tag
+            if el.tail and el is not root:
+                yield 'text', el.tail
+            continue
+        tag = el.tag if isinstance(el.tag, str) else ''
+        if not tag or tag in SKIP_TAGS:
+            if el.tail and el is not root:
+                yield 'text', el.tail
+            continue
+
+        yield 'start', tag
+        if el.text:
+            yield 'text', el.text
+        stack.append((el, True))
+        stack.extend((c, False) for c in reversed(el))
+
+
+def _walk_bs4(root) -> Iterator[Event]:
+    stack = [(root, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            yield 'end', node.name
+            continue
+        if isinstance(node, NavigableString):
+            if not isinstance(node, Comment) and type(node) is NavigableString:
+                yield 'text', str(node)
+            continue
+        if not isinstance(node, Tag) or node.name in SKIP_TAGS:
+            continue
+
+        yield 'start', node.name
+        stack.append((node, True))
+        stack.extend((c, False) for c in reversed(node.contents))
+
+
+def parse_lxml(html: str):
+    """Parse an HTML document with lxml; None if lxml is missing or the document is empty"""
+    if not HAS_LXML:
+        return None
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # Strings with an XML encoding declaration must be parsed as bytes
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+        try:
+            return lxml.html.document_fromstring(html.encode('utf-8'), parser=parser)
+        except (etree.ParserError, ValueError):
+            return None
+    except etree.ParserError:
+        return None
+
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+
+class HtmlTextExtractor:
+    """
+    Linear-time text-density content extractor.
+
+    Args:
+        backend: 'selectolax', 'lxml' or 'bs4'; defaults to the fastest installed
+        min_words: Words a block needs to count as content on its own
+        max_link_density: Share of link text above which a block is boilerplate
+    """
+
+    def __init__(self, backend: str = None, min_words: int = 10,
+                 max_link_density: float = 0.33):
+        self.backend = backend or self.available_backends()[0]
+        if self.backend not in self.available_backends():
+            raise ValueError(f"HTML backend not available: {self.backend}")
+        self.min_words = min_words
+        self.max_link_density = max_link_density
+
+    @staticmethod
+    def available_backends() -> List[str]:
+        backends = []
+        if HAS_SELECTOLAX:
+            backends.append('selectolax')
+        if HAS_LXML:
+            backends.append('lxml')
+        if HAS_BS4:
+            backends.append('bs4')
+        if not backends:
+            raise ImportError("No HTML parser installed (selectolax, lxml or beautifulsoup4)")
+        return backends
+
+    # ------------------------------------------------------------------
+
+    def _parse(self, html: str) -> Tuple[str, Iterator[Event]]:
+        """Parse HTML with the configured backend; returns (title, events)"""
+        if self.backend == 'selectolax':
+            tree = LexborHTMLParser(html)
+            title_node = tree.css_first('title')
+            title = title_node.text(strip=True) if title_node else ""
+            root = tree.body or tree.root
+            return title, (_walk_selectolax(root) if root is not None else iter(()))
+
+        if self.backend == 'lxml':
+            root = parse_lxml(html)
+            if root is None:
+                return "", iter(())
+            return self._parse_tree(root)
+
+        soup = BeautifulSoup(html, 'html.parser')
+        return self._parse_soup(soup)
+
+    @staticmethod
+    def _parse_tree(root) -> Tuple[str, Iterator[Event]]:
+        title = (root.findtext('.//title') or "").strip()
+        body = root.find('body')
+        return title, _walk_lxml(body if body is not None else root)
+
+    def _parse_soup(self, soup) -> Tuple[str, Iterator[Event]]:
+        title_tag = soup.find('title')
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        body = soup.find('body') or soup
+        return title, _walk_bs4(body)
+
+    @staticmethod
+    def _blocks(events: Iterator[Event]) -> List[TextBlock]:
+        """Group walk events into text blocks"""
+        blocks: List[TextBlock] = []
+        parts: List[str] = []
+        link_chars = 0
+        link_depth = 0
+        heading_depth = 0
+        in_heading = False
+
+        def flush():
+            nonlocal parts, link_chars, in_heading
+            text = _WHITESPACE_RE.sub(' ', ''.join(parts)).strip()
+            if text:
+                blocks.append(TextBlock(text, min(link_chars, len(text)), in_heading))
+            parts, link_chars, in_heading = [], 0, False
+
+        for kind, value in events:
+            if kind == 'text':
+                parts.append(value)
+                if link_depth:
+                    link_chars += len(value.strip())
+                if heading_depth:
+                    in_heading = True
+            elif kind == 'start':
+                if value in BLOCK_TAGS:
+                    flush()
+                if value == 'a':
+                    link_depth += 1
+                elif value in HEADING_TAGS:
+                    heading_depth += 1
+            else:
+                if value == 'a':
+                    link_depth = max(0, link_depth - 1)
+                elif value in HEADING_TAGS:
+                    heading_depth = max(0, heading_depth - 1)
+                if value in BLOCK_TAGS:
+                    flush()
+        flush()
+        return blocks
+
+    def _classify(self, blocks: List[TextBlock]) -> List[str]:
+        """Keep content blocks plus short blocks next to content"""
+        labels = []
+        for block in blocks:
+            if block.link_density > self.max_link_density:
+                labels.append('bad')
+            elif block.words >= self.min_words:
+                labels.append('good')
+            else:
+                labels.append('short')
+
+        kept = []
+        for i, block in enumerate(blocks):
+            if labels[i] == 'good':
+                kept.append(block.text)
+            elif labels[i] == 'short':
+                prev_good = i > 0 and labels[i - 1] == 'good'
+                next_good = i + 1 < len(blocks) and labels[i + 1] == 'good'
+                # Headings introduce the content that follows them
+                if next_good and (block.heading or prev_good) or (prev_good and block.words >= 3):
+                    kept.append(block.text)
+
+        if not kept:
+            # Pages made only of short blocks (landing pages): keep non-link text
+            kept = [b.text for b, label in zip(blocks, labels) if label != 'bad']
+        return kept
+
+    def extract(self, html: Any, max_chars: int = None, max_blocks: int = None) -> ExtractedText:
+        """
+        Extract the main text of a page.
+
+        Args:
+            html: HTML string, or an already parsed lxml tree (parse_lxml) or
+                  BeautifulSoup document/tag
+            max_chars: Truncate the joined text
+            max_blocks: Keep at most this many content blocks
+        """
+        if isinstance(html, str):
+            title, events = self._parse(html)
+            backend = self.backend
+        elif HAS_LXML and isinstance(html, etree._Element):
+            title, events = self._parse_tree(html)
+            backend = 'lxml'
+        elif HAS_BS4 and isinstance(html, Tag):
+            title, events = self._parse_soup(html)
+            backend = 'bs4'
+        else:
+            return ExtractedText(title="", text="", backend=self.backend)
+
+        blocks = self._classify(self._blocks(events))
+        if max_blocks is not None:
+            blocks = blocks[:max_blocks]
+        text = '\n\n'.join(blocks)
+        if max_chars is not None:
+            text = text[:max_chars]
+        return ExtractedText(title=title, text=text, blocks=blocks, backend=backend)
+
+
+@lru_cache(maxsize=None)
+def get_text_extractor(backend: str = None) -> HtmlTextExtractor:
+    """Get a shared extractor for a backend (default: fastest installed)"""
+    return HtmlTextExtractor(backend)
+
+
+def extract_main_text(html: Any, max_chars: int = None, max_blocks: int = None) -> ExtractedText:
+    """Extract the main text of a page with the fastest installed backend"""
+    return get_text_extractor().extract(html, max_chars=max_chars, max_blocks=max_blocks)
+
+
+# ----------------------------------------------------------------------
+# Micro-benchmark
+# ----------------------------------------------------------------------
+
+def _load_saved_pages(paths: List[str]) -> List[Tuple[str, str]]:
+    """Read (name, html) pairs from .html files, directories or cassettes"""
+    import gzip
+    import json
+    import base64
+    from pathlib import Path
+
+    pages = []
+    for raw in paths:
+        path = Path(raw)
+        files = sorted(path.rglob('*')) if path.is_dir() else [path]
+        for f in files:
+            if f.suffix in ('.html', '.htm'):
+                pages.append((f.name, f.read_text(encoding='utf-8', errors='replace')))
+            elif f.name.endswith('.jsonl.gz'):
+                with gzip.open(f, 'rt', encoding='utf-8') as fh:
+                    for line in fh:
+                        exchange = json.loads(line)
+                        if 'html' in exchange.get('headers', {}).get('content-type', ''):
+                            body = base64.b64decode(exchange['content'])
+                            pages.append((exchange['url'], body.decode('utf-8', 'replace')))
+    return pages
+
+
+def benchmark(pages: List[Tuple[str, str]], repeat: int = 5) -> None:
+    """Time every installed backend over the same pages"""
+    import time
+
+    total_kb = sum(len(html) for _, html in pages) / 1024
+    print(f"📊 {len(pages)} pages, {total_kb:.0f} KB of HTML, best of {repeat}")
+
+    for backend in HtmlTextExtractor.available_backends():
+        extractor = HtmlTextExtractor(backend)
+        best = float('inf')
+        chars = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            chars = sum(len(extractor.extract(html).text) for _, html in pages)
+            best = min(best, time.perf_counter() - start)
+        per_page = best / max(1, len(pages)) * 1000
+        print(f"   {backend:<11} {best * 1000:8.1f} ms total  {per_page:6.2f} ms/page  "
+              f"{chars:>8} chars kept")
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        saved = _load_saved_pages(sys.argv[1:])
+    else:
+        # Synthetic page: deep wrapper nesting plus menu boilerplate
+        article = ''.join(
+            f"<p>Paragraph {i}: the India forging market grew 8.2% in FY24 on strong "
+            f"automotive and defence demand, with exports rising across regions.</p>"
+            for i in range(40)
+        )
+        menu = '<ul>' + ''.join(f'<li><a href="/p{i}">Link {i}</a></li>' for i in range(60)) + '</ul>'
+        nested = '<div>' * 200 + article + '</div>' * 200
+        saved = [('synthetic.html',
+                  f"<html><head><title>Forging</title></head><body><nav>{menu}</nav>"
+                  f"{menu}{nested}<footer>{menu}</footer></body></html>")]
+
+    if not saved:
+        print("No pages found. Pass .html files, directories or .jsonl.gz cassettes.")
+    else:
+        sample = extract_main_text(saved[0][1])
+        print(f"   [{sample.backend}] {sample.title!r}: {len(sample.blocks)} blocks, "
+              f"{sample.text[:80]!r}...")
+        benchmark(saved)
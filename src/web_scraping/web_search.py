@@ -14,6 +14,7 @@ import json
 import asyncio
 import aiohttp
 import hashlib
+import time
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
@@ -24,6 +25,14 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from config.settings import OUTPUT_DIR
+from src.web_scraping.fact_extractor import get_fact_extractor, KEY_FACT_KINDS
+from src.web_scraping.research_corpus import get_research_corpus
+from src.web_scraping.rate_limiter import DDG_THROTTLE_STATUSES, HostRateLimiter
+from src.web_scraping.endpoint_health import EndpointHealth, get_endpoint_health
+from src.web_scraping.kv_store import CompressedKVStore
+from src.web_scraping.http_replay import wrap_aiohttp_session
+from src.web_scraping.site_metadata import fetch_text, get_site_metadata_cache
+from src.web_scraping.text_extractor import extract_main_text
 
 
 @dataclass
@@ -78,9 +87,11 @@ class DuckDuckGoSearch:
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     ]
     
-    def __init__(self):
+    def __init__(self, health: EndpointHealth = None, max_wait: float = 10.0):
         self.session = None
         self._ua_index = 0
+        self.health = health or get_endpoint_health()
+        self.max_wait = max_wait  # Longest backoff worth sleeping before falling back
     
     def _get_headers(self) -> Dict:
         """Get headers with rotating user agent"""
@@ -98,7 +109,9 @@ class DuckDuckGoSearch:
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30)
             connector = aiohttp.TCPConnector(limit=5, ssl=False)
-            self.session = aiohttp.ClientSession(timeout=timeout, connector=connector)
+            self.session = wrap_aiohttp_session(
+                aiohttp.ClientSession(timeout=timeout, connector=connector)
+            )
         return self.session
     
     async def search(self, query: str, max_results: int = 10, retries: int = 3) -> List[SearchResult]:
@@ -117,31 +130,36 @@ class DuckDuckGoSearch:
         results = []
         
         for attempt in range(retries):
+            # Healthiest endpoint first; backoff persists across queries
+            url = self.health.best([self.BASE_URL, self.LITE_URL])
+            if not await self.health.wait(url, max_wait=self.max_wait):
+                break
+            
+            start = time.monotonic()
             try:
                 # Prepare search request with rotating headers
                 data = {'q': query, 'b': ''}
                 headers = self._get_headers()
                 
-                # Try HTML endpoint first, then lite
-                url = self.BASE_URL if attempt < 2 else self.LITE_URL
-                
                 async with session.post(url, data=data, headers=headers) as response:
-                    if response.status == 202:
-                        # Rate limited, wait and retry
-                        await asyncio.sleep(2 * (attempt + 1))
-                        continue
-                    elif response.status != 200:
-                        continue
+                    self.health.record(url, response.status, time.monotonic() - start,
+                                       response.headers.get('Retry-After'),
+                                       throttle_statuses=DDG_THROTTLE_STATUSES)
+                    if response.status in DDG_THROTTLE_STATUSES:
+                        continue  # Backoff is applied by health.wait() on the next attempt
                     
-                    html = await response.text()
-                    results = self._parse_results(html, max_results)
-                    if results:
-                        return results
+                    if response.status == 200:
+                        html = await response.text()
+                        results = self._parse_results(html, max_results)
+                        if results:
+                            return results
                 
             except Exception as e:
-                if attempt < retries - 1:
-                    await asyncio.sleep(1)
-                    continue
+                self.health.record_error(url)
+            
+            # Errors and empty pages set no backoff; pause before retrying anyway
+            if attempt < retries - 1:
+                await asyncio.sleep(self.health.retry_delay())
         
         # If DDG fails, try direct company website search
         return await self._fallback_search(query, max_results)
@@ -243,6 +261,10 @@ class DuckDuckGoSearch:
             print(f"   ⚠ Image search error: {e}")
             return images
     
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Endpoint health metrics shared by all search clients"""
+        return self.health.metrics()
+    
     async def close(self):
         if self.session and not self.session.closed:
             await self.session.close()
@@ -254,68 +276,82 @@ class IntelligentScraper:
     Focuses on extracting business-relevant information.
     """
     
-    def __init__(self):
+    CACHE_TTL = 7 * 24 * 3600  # Seconds before a cached page is refetched
+    CACHE_MAX_BYTES = 256 * 1024 * 1024  # Compressed size budget
+    
+    def __init__(self, rate_limiter: HostRateLimiter = None):
         self.session = None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         }
+        self.rate_limiter = rate_limiter or HostRateLimiter()
         self.cache_dir = OUTPUT_DIR / "web_cache"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = CompressedKVStore(self.cache_dir / "pages.db",
+                                       ttl=self.CACHE_TTL, max_bytes=self.CACHE_MAX_BYTES)
+        self._migrate_json_cache()
+        self.corpus = get_research_corpus()
+        self.site_cache = get_site_metadata_cache()
         
     async def _get_session(self) -> aiohttp.ClientSession:
         if self.session is None or self.session.closed:
             timeout = aiohttp.ClientTimeout(total=30)
             connector = aiohttp.TCPConnector(limit=10, ssl=False)
-            self.session = aiohttp.ClientSession(
+            self.session = wrap_aiohttp_session(aiohttp.ClientSession(
                 timeout=timeout,
                 connector=connector,
                 headers=self.headers
-            )
+            ))
         return self.session
     
-    def _get_cache_path(self, url: str) -> Path:
-        """Get cache file path for URL"""
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        return self.cache_dir / f"{url_hash}.json"
+    def _cache_key(self, url: str) -> str:
+        """Cache key for URL (same hash the old per-file JSON cache used)"""
+        return hashlib.md5(url.encode()).hexdigest()
+    
+    def _migrate_json_cache(self):
+        """Move pages from the old one-JSON-file-per-URL cache into the store"""
+        if not any(self.cache_dir.glob("*.json")):
+            return
+        migrated = self.cache.migrate_json_dir(self.cache_dir, delete_source=True)
+        if migrated:
+            print(f"   ✓ Migrated {migrated} cached pages to {self.cache.db_path.name}")
     
     def _load_from_cache(self, url: str) -> Optional[ExtractedContent]:
         """Load cached content if available"""
-        cache_path = self._get_cache_path(url)
-        if cache_path.exists():
+        data = self.cache.get(self._cache_key(url))
+        if data:
             try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
                 return ExtractedContent(**data)
             except:
                 pass
         return None
     
     def _save_to_cache(self, content: ExtractedContent):
-        """Save content to cache"""
-        cache_path = self._get_cache_path(content.url)
+        """Save content to cache (written in batches)"""
         try:
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'url': content.url,
-                    'title': content.title,
-                    'main_content': content.main_content,
-                    'headings': content.headings,
-                    'key_facts': content.key_facts,
-                    'images': content.images,
-                    'metadata': content.metadata,
-                    'extraction_time': content.extraction_time
-                }, f)
+            self.cache.put(self._cache_key(content.url), {
+                'url': content.url,
+                'title': content.title,
+                'main_content': content.main_content,
+                'headings': content.headings,
+                'key_facts': content.key_facts,
+                'images': content.images,
+                'metadata': content.metadata,
+                'extraction_time': content.extraction_time
+            })
         except:
             pass
     
-    async def extract_page(self, url: str, use_cache: bool = True) -> Optional[ExtractedContent]:
+    async def extract_page(self, url: str, use_cache: bool = True,
+                           sector: str = "") -> Optional[ExtractedContent]:
         """
         Extract content from a webpage.
         
         Args:
             url: URL to scrape
             use_cache: Whether to use cached content
+            sector: Sector tag for the page in the local research corpus
             
         Returns:
             ExtractedContent or None
@@ -328,11 +364,21 @@ class IntelligentScraper:
         
         session = await self._get_session()
         
+        # Respect robots.txt and crawl-delay from the shared per-domain cache
+        site = await self.site_cache.get(url, lambda u, t: fetch_text(session, u, t))
+        if not site.can_fetch(url, self.headers['User-Agent']):
+            return None
+        self.rate_limiter.set_crawl_delay(url, site.crawl_delay(self.headers['User-Agent']))
+        
         try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return None
-                html = await response.text()
+            # Only network fetches are throttled; cache hits returned above
+            async with self.rate_limiter.slot(url):
+                async with session.get(url) as response:
+                    self.rate_limiter.record(url, response.status,
+                                             response.headers.get('Retry-After'))
+                    if response.status != 200:
+                        return None
+                    html = await response.text()
             
             soup = BeautifulSoup(html, 'lxml')
             
@@ -354,7 +400,7 @@ class IntelligentScraper:
                     headings.append(text)
             
             # Extract main content
-            main_content = self._extract_main_content(soup)
+            main_content = self._extract_main_content(html)
             
             # Extract key facts (numbers, dates, etc.)
             key_facts = self._extract_key_facts(main_content)
@@ -375,8 +421,10 @@ class IntelligentScraper:
                 metadata=metadata
             )
             
-            # Cache it
+            # Cache it, and keep it searchable in the local research corpus
             self._save_to_cache(content)
+            self.corpus.add_page(url, title, main_content, sector=sector,
+                                 source='company_research')
             
             return content
             
@@ -384,49 +432,26 @@ class IntelligentScraper:
             print(f"   ⚠ Scraping error for {url}: {e}")
             return None
     
-    def _extract_main_content(self, soup: BeautifulSoup) -> str:
-        """Extract main text content from page"""
-        # Try to find main content area
-        main_areas = ['main', 'article', '.content', '#content', '.main-content', '[role="main"]']
-        
-        main_elem = None
-        for selector in main_areas:
-            main_elem = soup.select_one(selector)
-            if main_elem:
-                break
-        
-        if not main_elem:
-            main_elem = soup.find('body')
-        
-        if not main_elem:
-            return ""
-        
-        # Get all text
-        paragraphs = []
-        for p in main_elem.find_all(['p', 'li', 'div']):
-            text = p.get_text(strip=True)
-            if len(text) > 50:  # Filter short snippets
-                paragraphs.append(text)
-        
-        return "\n\n".join(paragraphs[:30])  # Limit to first 30 paragraphs
+    def _extract_main_content(self, html: str) -> str:
+        """Extract main text content from page (shared text-density engine)"""
+        return extract_main_text(html, max_blocks=30).text  # Limit to first 30 blocks
     
     def _extract_key_facts(self, content: str) -> List[str]:
         """Extract key facts from content"""
-        facts = []
+        extractor = get_fact_extractor(KEY_FACT_KINDS)
         
-        # Pattern for numbers with context
-        patterns = [
-            r'\d+(?:\.\d+)?%[^.]*',  # Percentages
-            r'(?:₹|Rs\.?|USD|\$)\s*[\d,]+(?:\.\d+)?[^.]*',  # Currency
-            r'\d{4}\s*-\s*\d{4}',  # Year ranges
-            r'(?:founded|established|since)\s+\d{4}',  # Founding years
-            r'\d+(?:,\d{3})*\+?\s+(?:employees?|workers?|staff|people)',  # Employee counts
-            r'\d+(?:,\d{3})*\+?\s+(?:clients?|customers?|users?)',  # Customer counts
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            facts.extend(matches[:3])  # Limit per pattern
+        facts = []
+        per_kind: Dict[str, int] = {}
+        for fact in extractor.extract(content):
+            if per_kind.get(fact.kind, 0) >= 3:  # Limit per kind
+                continue
+            per_kind[fact.kind] = per_kind.get(fact.kind, 0) + 1
+            
+            # Percentages and amounts carry the rest of their clause as context
+            if fact.kind in ('percentage', 'currency'):
+                facts.append(extractor.clause(content, fact))
+            else:
+                facts.append(fact.text)
         
         return list(set(facts))[:15]  # Dedupe and limit
     
@@ -490,6 +515,7 @@ class IntelligentScraper:
         return metadata
     
     async def close(self):
+        self.cache.flush()
         if self.session and not self.session.closed:
             await self.session.close()
 
@@ -499,9 +525,12 @@ class WebSearchPipeline:
     Complete web search and scraping pipeline for company research.
     """
     
-    def __init__(self):
+    def __init__(self, scrape_workers: int = 3, max_pages: int = 5):
+        self.rate_limiter = HostRateLimiter()
         self.search = DuckDuckGoSearch()
-        self.scraper = IntelligentScraper()
+        self.scraper = IntelligentScraper(rate_limiter=self.rate_limiter)
+        self.scrape_workers = scrape_workers
+        self.max_pages = max_pages
         self.output_dir = OUTPUT_DIR / "web_data"
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
@@ -527,32 +556,52 @@ class WebSearchPipeline:
             f'"{company_name}" news recent'
         ]
         
-        # Perform searches
-        all_results = []
-        for query in queries[:3]:  # Limit queries
-            print(f"      Searching: {query[:40]}...")
-            results = await self.search.search(query, max_results=5)
-            all_results.extend(results)
-            await asyncio.sleep(1)  # Rate limiting
-        
-        # Dedupe by URL
+        # Searches feed a pool of scrape workers as soon as results arrive.
+        # Searches hold a DuckDuckGo slot on the per-host limiter, with endpoint
+        # health backoff on top; page fetches use the limiter, cached pages skip it.
+        unique_results: List[SearchResult] = []
         seen_urls = set()
-        unique_results = []
-        for r in all_results:
-            if r.url not in seen_urls:
-                seen_urls.add(r.url)
-                unique_results.append(r)
+        pages: Dict[str, ExtractedContent] = {}
+        url_queue: asyncio.Queue = asyncio.Queue()
+        
+        async def search_producer():
+            try:
+                for query in queries[:3]:  # Limit queries
+                    print(f"      Searching: {query[:40]}...")
+                    async with self.rate_limiter.slot(DuckDuckGoSearch.BASE_URL):
+                        results = await self.search.search(query, max_results=5)
+                    
+                    # Dedupe by URL, queue the first max_pages for scraping
+                    for r in results:
+                        if r.url in seen_urls:
+                            continue
+                        seen_urls.add(r.url)
+                        unique_results.append(r)
+                        if len(unique_results) <= self.max_pages:
+                            url_queue.put_nowait(r)
+            finally:
+                for _ in range(self.scrape_workers):
+                    url_queue.put_nowait(None)
+        
+        async def scrape_worker():
+            while True:
+                result = await url_queue.get()
+                if result is None:
+                    return
+                print(f"      Extracting: {result.source}...")
+                content = await self.scraper.extract_page(result.url, sector=sector)
+                if content:
+                    pages[result.url] = content
+        
+        await asyncio.gather(
+            search_producer(),
+            *[scrape_worker() for _ in range(self.scrape_workers)]
+        )
         
         print(f"      Found {len(unique_results)} unique results")
         
-        # Extract content from top pages
-        extracted_pages = []
-        for result in unique_results[:5]:  # Limit pages to scrape
-            print(f"      Extracting: {result.source}...")
-            content = await self.scraper.extract_page(result.url)
-            if content:
-                extracted_pages.append(content)
-            await asyncio.sleep(0.5)
+        # Keep search ranking order regardless of completion order
+        extracted_pages = [pages[r.url] for r in unique_results if r.url in pages]
         
         # Collect images from all pages
         all_images = []
@@ -598,6 +647,10 @@ class WebSearchPipeline:
         self._save_web_data(web_data)
         
         print(f"      ✓ Research complete: {len(extracted_pages)} pages, {len(unique_images)} images")
+        for endpoint, m in self.search.metrics().items():
+            if m['throttled']:
+                print(f"      ⚠ {urlparse(endpoint).netloc}: {m['throttled']}/{m['requests']} throttled, "
+                      f"backoff {m['backoff_remaining']}s")
         
         return web_data
     
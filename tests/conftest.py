@@ -0,0 +1,5 @@
+"""Make the repository root importable (src.*, config.*) when running pytest"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
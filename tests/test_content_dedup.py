@@ -0,0 +1,99 @@
+"""Tests for the MinHash near-duplicate index"""
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.web_scraping.content_dedup import NearDuplicateIndex
+
+REPORT = ("The India forging market is projected to grow at a CAGR of 8.2 percent "
+          "between 2024 and 2030 driven by automotive demand, defence indigenisation "
+          "and rising exports of precision components to global OEMs. ") * 4
+OTHER = ("Pharmaceutical exports from India rose sharply as generic drug makers "
+         "expanded capacity for regulated markets and biosimilars.")
+
+
+@pytest.fixture
+def index(tmp_path):
+    return NearDuplicateIndex(tmp_path / "index.json")
+
+
+def test_syndicated_copy_maps_to_first_url(index):
+    assert index.add("https://a.example/report", REPORT) is None
+    assert index.add("https://b.example/press", REPORT + " Contact our sales team.") \
+        == "https://a.example/report"
+    assert index.is_known_duplicate("https://b.example/press")
+    assert index.canonical_for("https://b.example/press") == "https://a.example/report"
+
+
+def test_different_text_is_canonical(index):
+    index.add("https://a.example/report", REPORT)
+    assert index.add("https://c.example/other", OTHER) is None
+    assert not index.is_known_duplicate("https://c.example/other")
+
+
+def test_similarity_estimates_jaccard(index):
+    same = index.similarity(index.signature(REPORT), index.signature(REPORT))
+    different = index.similarity(index.signature(REPORT), index.signature(OTHER))
+    assert same == 1.0
+    assert different < 0.2
+
+
+def test_signature_is_stable_across_instances(tmp_path):
+    a = NearDuplicateIndex(tmp_path / "a.json")
+    b = NearDuplicateIndex(tmp_path / "b.json")
+    assert a.signature(REPORT) == b.signature(REPORT)
+    assert a.signature("") == []
+
+
+def test_duplicates_persist(tmp_path):
+    path = tmp_path / "index.json"
+    index = NearDuplicateIndex(path)
+    index.add("https://a.example/report", REPORT)
+    index.add("https://b.example/press", REPORT + " Contact our sales team.")
+    index.save()
+
+    reloaded = NearDuplicateIndex(path)
+    assert reloaded.canonical_for("https://b.example/press") == "https://a.example/report"
+    assert reloaded.add("https://d.example/copy", REPORT) == "https://a.example/report"
+
+
+def test_index_from_other_configuration_is_ignored(tmp_path):
+    path = tmp_path / "index.json"
+    index = NearDuplicateIndex(path)
+    index.add("https://a.example/report", REPORT)
+    index.save()
+
+    assert NearDuplicateIndex(path, num_perm=32, bands=8).signatures == {}
+
+
+def test_bands_must_divide_permutations(tmp_path):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(tmp_path / "index.json", num_perm=64, bands=10)
+
+
+def load_research_engine():
+    # Loaded by path: the content_generation package pulls in the vision models
+    path = Path(__file__).parent.parent / "src" / "content_generation" / "advanced_research_engine.py"
+    spec = importlib.util.spec_from_file_location("advanced_research_engine", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_copies_collapse_when_canonical_is_not_in_batch(index):
+    engine = load_research_engine()
+    index.add("https://a.example/report", REPORT)  # Indexed by an earlier run
+
+    def page(url, *stats):
+        return engine.WebSource(url=url, title="", domain="", content=REPORT + url,
+                                snippet="", statistics=list(stats))
+
+    sources = [page("https://b.example/press", "8.2%"),
+               page("https://c.example/news", "8.2%", "USD 4 billion")]
+    kept = engine.AdvancedResearchEngine._collapse_duplicates(
+        SimpleNamespace(dedup_index=index), sources
+    )
+    assert [s.url for s in kept] == ["https://b.example/press"]
+    assert kept[0].statistics == ["8.2%", "USD 4 billion"]
@@ -0,0 +1,104 @@
+"""Tests for shared search endpoint health and backoff"""
+import asyncio
+
+import pytest
+
+from src.web_scraping import endpoint_health
+from src.web_scraping.endpoint_health import EndpointHealth, get_endpoint_health
+from src.web_scraping.rate_limiter import DDG_THROTTLE_STATUSES
+
+HTML = "https://html.duckduckgo.com/html/"
+LITE = "https://lite.duckduckgo.com/lite/"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(endpoint_health.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_backoff_doubles_per_consecutive_throttle(clock):
+    health = EndpointHealth(base_delay=1.0, max_delay=5.0, jitter=0.0)
+    for expected in (1.0, 2.0, 4.0, 5.0):
+        clock[0] += 100  # Previous backoff has passed
+        health.record(HTML, 429)
+        assert health.remaining_backoff(HTML) == pytest.approx(expected)
+
+
+def test_success_resets_consecutive_throttles(clock):
+    health = EndpointHealth(base_delay=1.0, jitter=0.0)
+    health.record(HTML, 429)
+    health.record(HTML, 429)
+    health.record(HTML, 200)
+    clock[0] += 100
+    health.record(HTML, 429)
+    assert health.remaining_backoff(HTML) == pytest.approx(1.0)
+
+
+def test_jitter_only_shortens_delay(clock):
+    health = EndpointHealth(base_delay=4.0, jitter=0.5)
+    for _ in range(20):
+        clock[0] += 100
+        health.endpoints.clear()
+        health.record(HTML, 503)
+        assert 2.0 <= health.remaining_backoff(HTML) <= 4.0
+
+
+def test_retry_after_extends_backoff(clock):
+    health = EndpointHealth(base_delay=1.0, max_delay=60.0, jitter=0.0)
+    health.record(HTML, 429, retry_after="30")
+    assert health.remaining_backoff(HTML) == pytest.approx(30.0)
+
+
+def test_202_counts_only_with_ddg_statuses(clock):
+    health = EndpointHealth(jitter=0.0)
+    health.record(HTML, 202)
+    assert health.remaining_backoff(HTML) == 0.0
+    assert health.metrics()[HTML]['errors'] == 1
+
+    health.record(LITE, 202, throttle_statuses=DDG_THROTTLE_STATUSES)
+    assert health.remaining_backoff(LITE) > 0
+    assert health.metrics()[LITE]['throttled'] == 1
+
+
+def test_best_prefers_endpoint_not_in_backoff(clock):
+    health = EndpointHealth(jitter=0.0)
+    assert health.best([HTML, LITE]) == HTML
+    health.record(HTML, 429)
+    assert health.best([HTML, LITE]) == LITE
+    clock[0] += 100
+    # Backoff over; LITE still wins on its lower recent throttle rate
+    health.record(LITE, 200)
+    assert health.rank([HTML, LITE]) == [LITE, HTML]
+
+
+def test_metrics_and_errors():
+    health = EndpointHealth()
+    health.record(HTML, 200, latency=0.2)
+    health.record(HTML, 200, latency=0.4)
+    health.record_error(HTML)
+    metrics = health.metrics()[HTML]
+    assert metrics['requests'] == 3
+    assert metrics['successes'] == 2
+    assert metrics['errors'] == 1
+    assert metrics['avg_latency'] == pytest.approx(0.2)
+
+
+def test_wait_gives_up_beyond_max_wait():
+    health = EndpointHealth(base_delay=30.0, jitter=0.0)
+    health.record(HTML, 429)
+    assert asyncio.run(health.wait(HTML, max_wait=1.0)) is False
+    assert asyncio.run(health.wait(LITE, max_wait=1.0)) is True
+
+
+def test_singleton_is_shared():
+    assert get_endpoint_health() is get_endpoint_health()
+
+
+def test_retry_delay_is_jittered_base_delay():
+    health = EndpointHealth(base_delay=2.0, jitter=0.5)
+    delays = [health.retry_delay() for _ in range(50)]
+    assert all(1.0 <= d <= 2.0 for d in delays)
+    assert len(set(delays)) > 1
+    assert EndpointHealth(base_delay=2.0, jitter=0.0).retry_delay() == 2.0
@@ -0,0 +1,99 @@
+"""Tests for the single-pass fact extraction engine"""
+import re
+
+import pytest
+
+from src.web_scraping.fact_extractor import (
+    FactExtractor, KEY_FACT_KINDS, METRIC_KINDS, STATISTIC_KINDS, extract_facts,
+    get_fact_extractor
+)
+
+SAMPLE = ("The India forging market size is estimated at $4.5 billion in 2024, "
+          "growing at a CAGR of 8.2% during 2024-2030. EBITDA margin of 18.5% "
+          "and revenue of ₹1,250 crore in FY24. Founded in 1979, 2,500+ employees "
+          "serve 300 customers across 12 countries.")
+
+
+def kinds_of(text, kinds=None):
+    return {fact.kind: fact for fact in extract_facts(text, kinds)}
+
+
+def test_typed_kinds_and_values():
+    facts = kinds_of(SAMPLE)
+    assert facts['market_size'].value == 4.5
+    assert facts['market_size'].unit == 'billion'
+    assert facts['cagr'].text == 'CAGR of 8.2%'
+    assert facts['margin'].value == 18.5
+    assert facts['revenue'].currency == '₹'
+    assert facts['revenue'].unit == 'crore'
+    assert facts['year_range'].text == '2024-2030'
+    assert facts['year_range'].value is None
+    assert facts['fiscal_period'].text == 'FY24'
+    assert facts['founded'].text == 'Founded in 1979'
+    assert facts['headcount'].value == 2500
+    assert facts['customer_count'].text == '300 customers'
+    assert facts['presence'].text == '12 countries'
+
+
+def test_offsets_point_into_text():
+    for fact in extract_facts(SAMPLE):
+        assert SAMPLE[fact.start:fact.end].strip() == fact.text
+
+
+def test_context_bearing_kind_wins_over_bare_kind():
+    facts = extract_facts("Profit margin of 12% this year")
+    assert [f.kind for f in facts] == ['margin']
+    # With only bare kinds requested, the same number is a percentage
+    assert [f.kind for f in extract_facts("Profit margin of 12% this year", ['percentage'])] \
+        == ['percentage']
+
+
+def test_unknown_kind_rejected():
+    with pytest.raises(ValueError):
+        FactExtractor(['not_a_kind'])
+
+
+def test_shared_extractor_ignores_kind_order():
+    assert get_fact_extractor(['cagr', 'percentage']) is get_fact_extractor(['percentage', 'cagr'])
+
+
+def test_extract_texts_limits_and_dedups():
+    extractor = get_fact_extractor(['percentage'])
+    text = "Up 5%, then 5% again, then 7% and 9%."
+    assert extractor.extract_texts(text) == ['5%', '7%', '9%']
+    assert extractor.extract_texts(text, per_kind=2) == ['5%']
+    assert extractor.extract_texts(text, limit=2) == ['5%', '7%']
+
+
+def test_clause_matches_legacy_key_fact_patterns():
+    """Percentages and amounts with clause context read like the old regexes"""
+    text = ("Exports rose to 45% of sales in FY24. Revenue reached ₹1,250 crore "
+            "on strong demand. Net debt is $12 million")
+    legacy = set(re.findall(r'\d+(?:\.\d+)?%[^.]*', text, re.IGNORECASE))
+    legacy |= set(re.findall(r'(?:₹|Rs\.?|USD|\$)\s*[\d,]+(?:\.\d+)?[^.]*', text, re.IGNORECASE))
+
+    extractor = get_fact_extractor(KEY_FACT_KINDS)
+    clauses = {extractor.clause(text, fact) for fact in extractor.extract(text)
+               if fact.kind in ('percentage', 'currency')}
+    assert clauses == {c.strip() for c in legacy}
+
+
+def test_clause_and_context_windows():
+    text = "Sales grew 20% in 2023. Costs fell."
+    fact = extract_facts(text, ['percentage'])[0]
+    assert FactExtractor.clause(text, fact) == "20% in 2023"
+    assert FactExtractor.clause(text, fact, max_chars=3) == "20%"
+    assert FactExtractor.context(text, fact, window=5) == "grew 20% in 2"
+
+
+@pytest.mark.parametrize("text", ["Revenue 2024 was a record year", "sales of 300 units",
+                                  "turnover: 12 percent higher"])
+def test_statistics_need_a_scaled_revenue(text):
+    assert extract_facts(text, STATISTIC_KINDS) == []
+
+
+def test_unscaled_revenue_is_only_a_metric():
+    text = "sales of 300 units and revenue of $5 million"
+    assert [(f.kind, f.text) for f in extract_facts(text, STATISTIC_KINDS)] \
+        == [('revenue', 'revenue of $5 million')]
+    assert [f.kind for f in extract_facts(text, METRIC_KINDS)] == ['revenue_mention', 'revenue']
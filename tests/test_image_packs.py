@@ -0,0 +1,111 @@
+"""Tests for sector image packs"""
+import io
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from src.image_intelligence.image_packs import (
+    ImagePack, ImagePackLibrary, pack_path, write_pack
+)
+
+
+def jpeg(colour, size=(160, 90)) -> bytes:
+    buf = io.BytesIO()
+    Image.new('RGB', size, colour).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def entry(colour, slide_type, **meta):
+    return jpeg(colour), dict(slide_type=slide_type, width=160, height=90, **meta)
+
+
+@pytest.fixture
+def pack_file(tmp_path):
+    images = [entry((i * 20, 0, 0), "slide1_cover", query=f"cover {i}", source="pexels")
+              for i in range(4)]
+    images += [entry((0, 40 + i * 20, 0), "slide3_finance") for i in range(2)]
+    images.append(entry((0, 0, 0), "slide3_finance"))  # Same bytes as the first cover
+    path = pack_path("Pharmaceuticals", tmp_path)
+    assert write_pack(path, "Pharmaceuticals", images) == 6
+    return path
+
+
+def test_pack_path_uses_sector_key(tmp_path):
+    assert pack_path("Auto Components & EV", tmp_path).name == "auto_components___ev.kpack"
+
+
+def test_round_trip(pack_file):
+    pack = ImagePack(pack_file)
+    try:
+        assert pack.sector == "Pharmaceuticals"
+        assert len(pack.images) == 6
+        first = pack.images[0]
+        assert (first.slide_type, first.query, first.source) == ("slide1_cover", "cover 0", "pexels")
+        assert bytes(pack.read(first)) == jpeg((0, 0, 0))
+        with Image.open(pack.extract(first)) as img:
+            assert img.size == (160, 90)
+    finally:
+        pack.close()
+
+
+def test_extract_is_content_addressed(pack_file, tmp_path):
+    pack = ImagePack(pack_file, extract_dir=tmp_path / "out")
+    path = pack.extract(pack.images[1])
+    assert path == tmp_path / "out" / f"{pack.images[1].sha1}.jpg"
+    mtime = path.stat().st_mtime_ns
+    assert pack.extract(pack.images[1]).stat().st_mtime_ns == mtime  # Written once
+    pack.close()
+
+
+def test_select_is_deterministic_per_codename(pack_file):
+    counts = {"slide1_cover": 2, "slide3_finance": 1}
+    pack = ImagePack(pack_file)
+    first = pack.select("AURORA", counts)
+    assert pack.select("AURORA", counts) == first
+    pack.close()
+
+    reopened = ImagePack(pack_file)
+    assert reopened.select("AURORA", counts) == first
+    others = {tuple(reopened.select(name, {"slide1_cover": 2})["slide1_cover"])
+              for name in ("BOREALIS", "CASCADE", "DELTA", "EMBER", "FALCON")}
+    assert len(others) > 1  # Different companies spread across the pack
+    reopened.close()
+
+
+def test_select_prefers_own_slide_type_and_never_repeats(pack_file):
+    pack = ImagePack(pack_file)
+    by_sha = {image.sha1: image for image in pack.images}
+    picks = pack.select("AURORA", {"slide1_cover": 4, "slide3_finance": 2})
+    assert all(by_sha[p.stem].slide_type == "slide1_cover" for p in picks["slide1_cover"])
+    assert all(by_sha[p.stem].slide_type == "slide3_finance" for p in picks["slide3_finance"])
+
+    # A slide type the pack lacks borrows unused images; nothing is used twice
+    picks = pack.select("AURORA", {"slide1_cover": 3, "slide2_business": 3})
+    used = picks["slide1_cover"] + picks["slide2_business"]
+    assert len(picks["slide2_business"]) == 3
+    assert len(set(used)) == len(used)
+
+    picks = pack.select("AURORA", {"slide1_cover": 10})
+    assert len(picks["slide1_cover"]) == 6  # Capped by the pack size
+    pack.close()
+
+
+def test_rejects_other_files(tmp_path):
+    bogus = tmp_path / "bogus.kpack"
+    bogus.write_bytes(b"NOTAPACK" + b"\0" * 32)
+    with pytest.raises(ValueError):
+        ImagePack(bogus)
+
+
+def test_library_caches_packs_and_missing_sectors(pack_file, tmp_path, capsys):
+    library = ImagePackLibrary(tmp_path)
+    pack = library.get("Pharmaceuticals")
+    assert pack is not None and library.get("Pharmaceuticals") is pack
+    assert library.has("Pharmaceuticals")
+    assert not library.has("Steel")
+
+    pack_path("Broken", tmp_path).write_bytes(b"garbage")
+    assert library.get("Broken") is None
+    assert "unreadable" in capsys.readouterr().out
+    pack.close()
@@ -0,0 +1,45 @@
+"""Tests for slide-sized image renditions"""
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from src.presentation.image_renditions import RenditionCache
+
+
+@pytest.fixture
+def photo(tmp_path):
+    path = tmp_path / "plant.jpg"
+    Image.new('RGB', (1600, 900), (30, 90, 150)).save(path, "JPEG")
+    return path
+
+
+def test_rendition_fits_box_at_dpi(tmp_path, photo):
+    rendition = RenditionCache(tmp_path / "cache", dpi=100).get(photo, 4.0, 2.0)
+    assert (rendition.width, rendition.height) == (400, 200)
+    assert (rendition.source_width, rendition.source_height) == (1600, 900)
+
+
+def test_dpi_is_part_of_the_key(tmp_path, photo):
+    low = RenditionCache(tmp_path / "cache", dpi=100)
+    low.get(photo, 4.0, 2.0)
+    low.flush()
+    high = RenditionCache(tmp_path / "cache", dpi=200).get(photo, 4.0, 2.0)
+    assert (high.width, high.height) == (800, 400)
+
+
+def test_covers_smaller_box_but_not_larger(tmp_path, photo):
+    cache = RenditionCache(tmp_path / "cache", dpi=100)
+    rendition = cache.get(photo, 4.0, 2.0)
+    assert cache.covers(rendition, 2.0, 1.0)
+    assert cache.covers(rendition, 2.0, 2.0)   # Square crop keeps 200x200
+    assert not cache.covers(rendition, 8.0, 4.0)
+    assert not cache.covers(rendition, 2.0, 4.0)  # Tall crop leaves 100 px of 200
+
+
+def test_covers_accepts_source_limited_rendition(tmp_path):
+    small = tmp_path / "small.png"
+    Image.new('RGB', (300, 150), (200, 40, 40)).save(small)
+    cache = RenditionCache(tmp_path / "cache", dpi=150)
+    rendition = cache.get(small, 2.0, 1.0)
+    # The source cannot give 1200 px; a new rendition would be no larger
+    assert cache.covers(rendition, 8.0, 4.0)
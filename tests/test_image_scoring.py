@@ -0,0 +1,113 @@
+"""Tests for batched image quality scoring and selection"""
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+ImageFilter = pytest.importorskip("PIL.ImageFilter")
+
+from src.image_intelligence.image_scoring import (
+    ImageScorer, aspect_fit, colour_entropy, hamming_matrix, laplacian_variance
+)
+
+
+@dataclass
+class Candidate:
+    path: Path
+
+
+def save(img, path) -> Path:
+    img.save(path, "JPEG", quality=90)
+    return path
+
+
+def detailed(seed: int, size=(800, 500)) -> "Image.Image":
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (size[1] // 10, size[0] // 10, 3), dtype=np.uint8)
+    return Image.fromarray(blocks).resize(size, Image.NEAREST)
+
+
+@pytest.fixture
+def images(tmp_path):
+    return {
+        'sharp': save(detailed(1), tmp_path / "sharp.jpg"),
+        'other': save(detailed(2), tmp_path / "other.jpg"),
+        'blurred': save(detailed(1).filter(ImageFilter.GaussianBlur(8)), tmp_path / "blurred.jpg"),
+        'flat': save(Image.new('RGB', (800, 500), (200, 200, 200)), tmp_path / "flat.jpg"),
+        'tall': save(detailed(3, size=(400, 900)), tmp_path / "tall.jpg"),
+    }
+
+
+@pytest.fixture
+def scorer():
+    return ImageScorer(use_clip=False)
+
+
+def test_batch_features():
+    flat = np.zeros((1, 16, 16))
+    checker = (np.indices((16, 16)).sum(axis=0) % 2 * 255.0)[None]
+    assert laplacian_variance(np.concatenate([flat, checker])).tolist()[0] == 0
+    assert laplacian_variance(checker)[0] > 1000
+
+    one_colour = np.zeros((1, 8, 8, 3), np.uint8)
+    noise = np.random.default_rng(0).integers(0, 256, (1, 64, 64, 3), dtype=np.uint8)
+    assert colour_entropy(one_colour)[0] == 0
+    assert colour_entropy(noise)[0] > 8
+
+    assert aspect_fit(np.array([1.6, 0.8, 3.2]), 1.6).tolist() == [1.0, 0.5, 0.5]
+
+    bits = np.array([[True, False, True], [True, True, False]])
+    assert hamming_matrix(bits).tolist() == [[0, 2], [2, 0]]
+
+
+def test_sharp_detailed_image_ranks_first(scorer, images):
+    ranked = scorer.score([images['flat'], images['blurred'], images['sharp']])
+    assert [s.path.name for s in ranked] == ["sharp.jpg", "blurred.jpg", "flat.jpg"]
+    assert ranked[0].sharpness > ranked[1].sharpness > ranked[2].sharpness
+    assert ranked[2].entropy < 1
+    assert ranked[0].relevance is None
+
+
+def test_aspect_fit_follows_slot(scorer, images):
+    wide = {s.path.name: s for s in scorer.score([images['sharp'], images['tall']], 1.6)}
+    tall = {s.path.name: s for s in scorer.score([images['sharp'], images['tall']], 0.45)}
+    assert wide['sharp.jpg'].aspect_fit > wide['tall.jpg'].aspect_fit
+    assert tall['tall.jpg'].aspect_fit > tall['sharp.jpg'].aspect_fit
+
+
+def test_unreadable_file_scores_zero(scorer, images, tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    ranked = scorer.score([broken, images['sharp']])
+    assert ranked[-1].path == broken and ranked[-1].total == 0.0
+
+    picked = scorer.select({'slide1': [Candidate(broken)]}, {'slide1': 1})
+    assert picked == {'slide1': []}
+
+
+def test_select_uses_each_image_once_per_deck(scorer, images):
+    shared = [Candidate(images['sharp']), Candidate(images['other']), Candidate(images['flat'])]
+    picked = scorer.select({'slide1': shared, 'slide2': list(shared)},
+                           {'slide1': 1, 'slide2': 2})
+    names = [c.path.name for slide in ('slide1', 'slide2') for c in picked[slide]]
+    assert len(names) == len(set(names)) == 3
+    assert picked['slide1'][0].path.name in ("sharp.jpg", "other.jpg")
+
+
+def test_select_skips_near_copies(scorer, images, tmp_path):
+    copy = save(detailed(1).resize((1200, 750)), tmp_path / "copy.jpg")
+    picked = scorer.select(
+        {'slide1': [Candidate(images['sharp'])], 'slide2': [Candidate(copy), Candidate(images['other'])]},
+        {'slide1': 1, 'slide2': 1}
+    )
+    assert picked['slide2'][0].path.name == "other.jpg"
+
+
+def test_weights_prefer_slide_specific_images(scorer, images):
+    candidates = {'slide1': [Candidate(images['sharp']), Candidate(images['other'])]}
+    for preferred in (0, 1):
+        weights = {'slide1': [2.0 if i == preferred else 1.0 for i in range(2)]}
+        picked = scorer.select(candidates, {'slide1': 1}, weights=weights)
+        assert picked['slide1'][0] is candidates['slide1'][preferred]
@@ -0,0 +1,149 @@
+"""Tests for the content-addressed image store"""
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from src.image_intelligence.image_store import ImageStore, dhash, hamming, phash
+
+
+def photo(seed: int, size=(640, 480)) -> "Image.Image":
+    """Smooth random image: stable perceptual hashes, distinct per seed"""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(small).resize(size, Image.BICUBIC)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ImageStore(tmp_path / "store")
+    yield store
+    store.close()
+
+
+def test_hashes_survive_resizing():
+    img = photo(1)
+    smaller = img.resize((320, 240))
+    assert hamming(phash(img), phash(smaller)) <= 6
+    assert hamming(dhash(img), dhash(smaller)) <= 6
+    assert hamming(phash(img), phash(photo(2))) > 6
+
+
+def test_add_and_find(store):
+    stored = store.add(photo(1), "pharma", "slide1_cover", query="lab", source="pexels",
+                       license_info="Pexels License")
+    assert stored.path.exists()
+    assert stored.path.name == f"{stored.digest}.jpg"
+    assert (stored.width, stored.height) == (640, 480)
+
+    store.add(photo(2), "pharma", "slide2_business")
+    assert [s.digest for s in store.find("pharma", "slide1_cover")] == [stored.digest]
+    assert len(store.find("pharma")) == 2
+    assert store.count("pharma") == 2
+    assert store.find("steel") == []
+
+
+def test_near_duplicate_rejected_in_sector_linked_across_sectors(store):
+    original = store.add(photo(1), "pharma", "slide1_cover")
+    assert store.add(photo(1).resize((800, 600)), "pharma", "slide2_business") is None
+
+    linked = store.add(photo(1).resize((800, 600)), "chemicals", "slide1_cover")
+    assert linked.digest == original.digest
+    assert store.stats() == {'objects': 1, 'entries': 2, 'sectors': 2,
+                             'bytes': original.size_bytes}
+
+
+def test_lru_eviction_keeps_recently_used(store):
+    first = store.add(photo(1), "pharma")
+    second = store.add(photo(2), "pharma")
+    store.touch([first.digest])
+    third = store.add(photo(3), "pharma")
+
+    budget = first.size_bytes + third.size_bytes
+    assert store.evict(budget) == 1
+    assert {s.digest for s in store.find("pharma")} == {first.digest, third.digest}
+    assert not second.path.exists()
+
+
+def test_budget_enforced_on_add(tmp_path):
+    store = ImageStore(tmp_path / "store", max_bytes=1)
+    store.add(photo(1), "pharma")
+    newest = store.add(photo(2), "pharma")
+    assert [s.digest for s in store.find("pharma")] == [newest.digest]  # The new image is kept
+    store.close()
+
+
+def test_repair_reconciles_index_and_files(store):
+    kept = store.add(photo(1), "pharma")
+    lost = store.add(photo(2), "pharma")
+    lost.path.unlink()
+    orphan = store.objects_dir / "ab" / "abandoned.jpg"
+    orphan.parent.mkdir(exist_ok=True)
+    orphan.write_bytes(b"not indexed")
+    kept.path.write_bytes(kept.path.read_bytes() + b"\0" * 10)
+
+    report = store.repair()
+    assert report == {'missing_files': 1, 'dangling_entries': 0, 'orphan_files': 1, 'resized': 1}
+    assert [s.digest for s in store.find("pharma")] == [kept.digest]
+    assert store.stats()['bytes'] == kept.size_bytes + 10
+    assert not orphan.exists()
+    assert store.repair() == {'missing_files': 0, 'dangling_entries': 0,
+                              'orphan_files': 0, 'resized': 0}
+
+
+def test_rebuild_recovers_lost_index(tmp_path):
+    root = tmp_path / "store"
+    store = ImageStore(root)
+    a = store.add(photo(1), "pharma", "slide1_cover", query="lab", source="pexels")
+    b = store.add(photo(2), "pharma", "slide2_business")
+    store.add(photo(1), "chemicals", "slide1_cover")
+    store.close()
+
+    (root / "index.db").unlink()
+    for sidecar in root.glob("index.db-*"):
+        sidecar.unlink()
+    with open(root / "entries.jsonl", 'a', encoding='utf-8') as f:
+        f.write('{"digest": "torn')  # Crash mid-write
+
+    store = ImageStore(root)
+    assert store.stats()['entries'] == 0
+    assert store.rebuild() == {'objects': 2, 'entries': 3}
+
+    cover = store.find("pharma", "slide1_cover")[0]
+    assert (cover.digest, cover.query, cover.source) == (a.digest, "lab", "pexels")
+    assert store.find("pharma", "slide2_business")[0].digest == b.digest
+    assert store.count("chemicals") == 1
+    # Near-duplicate detection works again after the rebuild
+    assert store.add(photo(2).resize((320, 240)), "pharma") is None
+
+    lines = (root / "entries.jsonl").read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 3 and all(json.loads(line) for line in lines)  # Compacted
+    store.close()
+
+
+def test_rebuild_drops_journal_entries_without_files(tmp_path):
+    root = tmp_path / "store"
+    store = ImageStore(root)
+    gone = store.add(photo(1), "pharma")
+    store.add(photo(2), "pharma")
+    gone.path.unlink()
+
+    assert store.rebuild() == {'objects': 1, 'entries': 1}
+    assert gone.digest not in (root / "entries.jsonl").read_text(encoding='utf-8')
+    store.close()
+
+
+def test_import_files(tmp_path, store):
+    paths = []
+    for seed in (1, 2, 1):
+        path = tmp_path / f"legacy_{len(paths)}.png"
+        photo(seed).save(path)
+        paths.append(path)
+    (tmp_path / "broken.jpg").write_bytes(b"nope")
+    paths.append(tmp_path / "broken.jpg")
+
+    assert store.import_files(paths, "pharma", delete_source=True) == 2
+    assert not paths[0].exists()
+    assert paths[-1].exists()
@@ -0,0 +1,58 @@
+"""Tests for batched image generation on the tiny stand-in model"""
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("PIL")
+
+from src.vision import janus_image_batch
+from src.vision.janus_image_batch import (
+    BatchImageGenerator, TinyGenAdapter, generate_image_batch
+)
+
+SHORT = "lab bench"
+LONG = "modern automotive forging plant with robotic press lines and quality lab"
+
+
+def prompt_state(adapter, prompts):
+    tokens, mask = adapter.encode_prompts(prompts)
+    with torch.inference_mode():
+        hidden, _ = adapter.forward(adapter.embed_tokens(tokens), mask, None, None)
+    return hidden
+
+
+def test_prompt_state_ignores_left_padding():
+    adapter = TinyGenAdapter()
+    alone = prompt_state(adapter, [SHORT])
+    batched = prompt_state(adapter, [LONG, SHORT])
+    # Rows interleave conditional/unconditional, so SHORT is rows 2 and 3
+    assert torch.allclose(alone, batched[2:4], atol=1e-6)
+
+
+def test_image_does_not_depend_on_batch_mates():
+    adapter = TinyGenAdapter()
+    alone = generate_image_batch(adapter, [SHORT], [7], 16)[0]
+    batched = generate_image_batch(adapter, [LONG, SHORT, "x"], [3, 7, 1], 16)[1]
+    assert np.array_equal(np.asarray(alone), np.asarray(batched))
+
+
+def test_cache_hit_skips_generation(tmp_path, monkeypatch):
+    monkeypatch.setenv("KELP_IMAGE_GEN_MODEL", "tiny")
+    generator = BatchImageGenerator(tmp_path / "batched", batch_size=4)
+    assert isinstance(generator.adapter, TinyGenAdapter)
+    first = generator.generate([LONG, SHORT], seeds=[0, 5])
+    assert all(path and path.exists() for path in first)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(janus_image_batch, "generate_image_batch", fail)
+    assert generator.generate([SHORT, LONG], seeds=[5, 0]) == first[::-1]
+
+
+def test_cached_image_matches_unbatched_generation(tmp_path, monkeypatch):
+    monkeypatch.setenv("KELP_IMAGE_GEN_MODEL", "tiny")
+    batched = BatchImageGenerator(tmp_path / "batched").generate([LONG, SHORT], seeds=[0, 5])[1]
+    alone = BatchImageGenerator(tmp_path / "alone").generate_one(SHORT, seed=5)
+    assert batched.name == alone.name
+    assert batched.read_bytes() == alone.read_bytes()
@@ -0,0 +1,124 @@
+"""Tests for the compressed SQLite key-value store"""
+import json
+
+import pytest
+
+from src.web_scraping import kv_store
+from src.web_scraping.kv_store import CompressedKVStore
+
+
+class Clock:
+    """Controllable time.time() for the store module"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(kv_store.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CompressedKVStore(tmp_path / "cache.db", batch_size=100)
+    yield store
+    store.close()
+
+
+def test_round_trip_pending_and_committed(store):
+    store.put("page", {'url': 'https://example.com', 'text': 'é' * 10})
+    assert store.get("page") == {'url': 'https://example.com', 'text': 'é' * 10}
+    store.flush()
+    assert store.stats()['pending'] == 0
+    assert store.get("page")['url'] == 'https://example.com'
+    assert "missing" not in store
+    assert store.get("missing", default=1) == 1
+
+
+def test_batch_size_commits_automatically(tmp_path):
+    store = CompressedKVStore(tmp_path / "cache.db", batch_size=2)
+    store.put("a", 1)
+    assert store.stats()['pending'] == 1
+    store.put("b", 2)
+    assert store.stats() == {'entries': 2, 'bytes': store.total_bytes(),
+                             'pending': 0, 'codec': store.codec}
+    store.close()
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    store = CompressedKVStore(tmp_path / "cache.db", ttl=60)
+    store.put("default_ttl", 1)
+    store.put("own_ttl", 2, ttl=600)
+    store.flush()
+
+    clock.now += 61
+    assert store.get("default_ttl") is None
+    assert store.get("own_ttl") == 2
+
+    clock.now += 600
+    assert store.purge_expired() == 1
+    assert store.stats()['entries'] == 0
+    store.close()
+
+
+def test_lru_eviction_to_byte_budget(tmp_path, clock):
+    store = CompressedKVStore(tmp_path / "cache.db", max_bytes=5_000, batch_size=100)
+    # Incompressible-ish values of a few KB each
+    for i in range(4):
+        clock.now += 1
+        store.put(f"page{i}", [f"{i}-{n}-{n * 7919 % 104729}" for n in range(400)])
+    store.flush()
+    assert store.total_bytes() <= 5_000
+
+    kept = [f"page{i}" for i in range(4) if store.get(f"page{i}") is not None]
+    assert 0 < len(kept) < 4
+    assert kept == [f"page{i}" for i in range(4 - len(kept), 4)]  # Newest survive
+
+
+def test_reads_protect_entries_from_eviction(tmp_path, clock):
+    value = [f"{n}-{n * 7919 % 104729}" for n in range(400)]
+    store = CompressedKVStore(tmp_path / "cache.db", batch_size=100)
+    for key in ("old", "middle"):
+        clock.now += 1
+        store.put(key, value)
+    store.flush()
+    one_entry = store.total_bytes() // 2
+
+    clock.now += 1
+    store.get("old")  # Now the most recently used
+    store.max_bytes = 2 * one_entry + one_entry // 2
+    clock.now += 1
+    store.put("new", value)
+    store.flush()
+
+    assert store.get("old") is not None
+    assert store.get("middle") is None
+    assert store.get("new") is not None
+
+
+def test_migrate_json_dir(tmp_path, store):
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    for i in range(3):
+        (legacy / f"page{i}.json").write_text(json.dumps({'i': i}), encoding='utf-8')
+    (legacy / "broken.json").write_text("{not json", encoding='utf-8')
+
+    assert store.migrate_json_dir(legacy, delete_source=True) == 3
+    assert store.get("page2") == {'i': 2}
+    assert [p.name for p in legacy.glob("*.json")] == ["broken.json"]
+
+
+def test_values_persist_across_instances(tmp_path):
+    store = CompressedKVStore(tmp_path / "cache.db")
+    store.put("page", {'a': 1})
+    store.close()
+
+    reopened = CompressedKVStore(tmp_path / "cache.db")
+    assert reopened.get("page") == {'a': 1}
+    reopened.close()
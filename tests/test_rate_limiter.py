@@ -0,0 +1,97 @@
+"""Tests for the adaptive per-host rate limiter"""
+import asyncio
+
+import pytest
+
+from src.web_scraping import rate_limiter
+from src.web_scraping.rate_limiter import (
+    DDG_THROTTLE_STATUSES, THROTTLE_STATUSES, HostRateLimiter
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def interval(limiter, url):
+    return limiter._state(url).interval
+
+
+def test_hosts_are_tracked_separately():
+    limiter = HostRateLimiter(base_interval=0.5)
+    limiter.record("https://slow.example/a", 429)
+    assert interval(limiter, "https://slow.example/b") == 1.0
+    assert interval(limiter, "https://FAST.example/") == 0.5
+
+
+def test_throttling_backs_off_up_to_max():
+    limiter = HostRateLimiter(base_interval=0.5, max_interval=3.0)
+    for expected in (1.0, 2.0, 3.0, 3.0):
+        limiter.record("https://a.example/", 503)
+        assert interval(limiter, "https://a.example/") == expected
+    assert limiter.stats()['a.example']['throttled'] == 4
+
+
+def test_success_recovers_to_min_interval():
+    limiter = HostRateLimiter(base_interval=1.0, min_interval=0.5, recovery_factor=0.5)
+    limiter.record("https://a.example/", 200)
+    assert interval(limiter, "https://a.example/") == 0.5
+    limiter.record("https://a.example/", 304)
+    assert interval(limiter, "https://a.example/") == 0.5
+
+
+def test_errors_leave_interval_unchanged():
+    limiter = HostRateLimiter(base_interval=1.0)
+    limiter.record("https://a.example/", 404)
+    limiter.record("https://a.example/", 500)
+    assert interval(limiter, "https://a.example/") == 1.0
+
+
+def test_202_throttles_only_when_the_caller_asks():
+    assert 202 not in THROTTLE_STATUSES
+    assert 202 in DDG_THROTTLE_STATUSES
+
+    limiter = HostRateLimiter(base_interval=1.0, recovery_factor=0.5)
+    limiter.record("https://api.example/", 202)
+    assert interval(limiter, "https://api.example/") == 0.5
+
+    limiter.record("https://html.duckduckgo.com/", 202, throttle_statuses=DDG_THROTTLE_STATUSES)
+    assert interval(limiter, "https://html.duckduckgo.com/") == 2.0
+
+
+def test_retry_after_pushes_next_slot(clock):
+    limiter = HostRateLimiter(base_interval=0.5, max_interval=30.0)
+    limiter.record("https://a.example/", 429, retry_after="10")
+    assert limiter.hosts['a.example'].next_slot == 110.0
+
+    # HTTP-date values fall back to the backoff interval
+    limiter.record("https://b.example/", 429, retry_after="Wed, 21 Oct 2026 07:28:00 GMT")
+    assert limiter.hosts['b.example'].next_slot == 101.0
+
+
+def test_crawl_delay_is_a_floor():
+    limiter = HostRateLimiter(base_interval=0.5, min_interval=0.1)
+    limiter.set_crawl_delay("https://a.example/", 2.0)
+    assert interval(limiter, "https://a.example/") == 2.0
+    limiter.record("https://a.example/", 200)
+    assert interval(limiter, "https://a.example/") == 2.0
+
+
+def test_concurrent_callers_queue_for_slots():
+    limiter = HostRateLimiter(base_interval=0.05, max_per_host=4)
+    starts = []
+
+    async def fetch():
+        async with limiter.slot("https://a.example/"):
+            starts.append(asyncio.get_running_loop().time())
+
+    async def main():
+        await asyncio.gather(*(fetch() for _ in range(3)))
+
+    asyncio.run(main())
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+    assert limiter.stats()['a.example']['requests'] == 3
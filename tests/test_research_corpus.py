@@ -0,0 +1,81 @@
+"""Tests for the local FTS5 research corpus"""
+import time
+
+import pytest
+
+from src.web_scraping.research_corpus import ResearchCorpus
+
+SECTOR = "Pharmaceuticals"
+PAGES = [
+    {'url': 'https://acme.example/careers', 'title': 'Careers at Acme Pharma',
+     'content': 'Join Acme Pharmaceuticals India. We are hiring chemists and engineers '
+                'at our plants in India.', 'source': 'scraper'},
+    {'url': 'https://acme.example/plant', 'title': 'Plant tour',
+     'content': 'Our pharmaceuticals plant in Gujarat, India runs with WHO-GMP approval '
+                'and a 2024 expansion.', 'source': 'scraper'},
+    {'url': 'https://r.example/size', 'title': 'India pharmaceuticals market size',
+     'content': 'The India pharmaceuticals market size was USD 50 billion in 2024 and is '
+                'expected to reach 130 billion by 2030, a CAGR of 10%.',
+     'source': 'advanced_research'},
+    {'url': 'https://r.example/share', 'title': 'Top pharma companies by market share',
+     'content': 'Sun Pharma, Cipla and Dr Reddys are the top companies in India by '
+                'market share.', 'source': 'advanced_research'},
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    corpus = ResearchCorpus(tmp_path / "corpus.db")
+    if not corpus.available:
+        pytest.skip("SQLite without FTS5")
+    corpus.add_pages([dict(page, sector=SECTOR) for page in PAGES])
+    yield corpus
+    corpus.close()
+
+
+def urls(hits):
+    return [hit.url for hit in hits]
+
+
+def test_sector_words_do_not_match_every_page(corpus):
+    hits = corpus.search(f"{SECTOR} industry CAGR growth rate", sector=SECTOR)
+    assert urls(hits) == ['https://r.example/size']
+
+
+def test_company_pages_do_not_answer_market_queries(corpus):
+    for query in (f"{SECTOR} India market size 2024 2025 billion",
+                  f"{SECTOR} India top companies market share"):
+        hits = corpus.search(query, limit=4, sector=SECTOR, source='advanced_research',
+                             min_score=1.0)
+        assert not any('acme.example' in url for url in urls(hits))
+        assert len(hits) == 1  # One good page is not enough to skip the web
+
+
+def test_min_score_drops_weak_matches(corpus):
+    query = f"{SECTOR} India market size 2024 2025 billion"
+    everything = corpus.search(query, sector=SECTOR)
+    strong = corpus.search(query, sector=SECTOR, min_score=1.0)
+    assert len(strong) < len(everything)
+    assert all(hit.score >= 1.0 for hit in strong)
+    assert urls(strong)[0] == 'https://r.example/size'
+
+
+def test_match_query_ignores_stopwords_and_given_words():
+    assert ResearchCorpus._to_match_query("the pharma market analysis") == '"pharma" OR "market"'
+    assert ResearchCorpus._to_match_query("Auto Components market", ignore="Auto Components") \
+        == '"market"'
+
+
+def test_unchanged_page_is_not_rewritten_and_age_filter(corpus):
+    page = dict(PAGES[2], sector=SECTOR)
+    assert corpus.add_page(**page) is False
+    assert corpus.add_page(**dict(page, content=page['content'] + ' Updated.')) is True
+
+    old = dict(PAGES[3], url='https://r.example/old', sector=SECTOR,
+               fetched_at=time.time() - 90 * 86400)
+    corpus.add_page(**old)
+    assert 'https://r.example/old' in urls(corpus.search("top companies", sector=SECTOR))
+    assert 'https://r.example/old' not in urls(
+        corpus.search("top companies", sector=SECTOR, max_age_days=30))
+    assert corpus.get('https://r.example/old', max_age_days=30) is None
+    assert corpus.count() == 5
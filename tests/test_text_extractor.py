@@ -0,0 +1,119 @@
+"""Tests for the text-density main-content extractor"""
+import pytest
+
+from src.web_scraping.text_extractor import HtmlTextExtractor, extract_main_text
+
+ARTICLE = ("Acme Forgings supplies crankshafts and connecting rods to forty automotive "
+           "OEMs and exports precision components to twelve countries.")
+SECOND = ("The company commissioned a new press line in Pune last year, lifting "
+          "capacity by a third while keeping margins steady.")
+
+PAGE = f"""<html><head><title> Acme Forgings | About </title>
+<script>var tracking = "do not extract this script text at all";</script></head>
+<body>
+  <nav><a href="/">Home</a> <a href="/about">About</a> <a href="/contact">Contact</a></nav>
+  <main>
+    <h2>About us</h2>
+    <p>{ARTICLE}</p>
+    <p>{SECOND}</p>
+    <div class="related"><a href="/a">Forging news roundup</a> <a href="/b">Steel prices today</a>
+      <a href="/c">Press release archive</a> <a href="/d">Investor relations updates</a></div>
+  </main>
+  <footer>Copyright 2026 Acme Forgings. All rights reserved worldwide for all content.</footer>
+</body></html>"""
+
+BACKENDS = HtmlTextExtractor.available_backends()
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_keeps_content_and_drops_boilerplate(backend):
+    result = HtmlTextExtractor(backend).extract(PAGE)
+    assert result.backend == backend
+    assert result.title == "Acme Forgings | About"
+    assert result.blocks == ["About us", ARTICLE, SECOND]
+    assert "script" not in result.text
+    assert "Copyright" not in result.text
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_link_heavy_block_is_dropped(backend):
+    result = HtmlTextExtractor(backend).extract(PAGE)
+    assert "roundup" not in result.text
+    assert "Investor relations" not in result.text
+
+
+def test_link_inside_prose_is_kept():
+    html = f"<body><p>{ARTICLE} See the <a href='/r'>annual report</a>.</p></body>"
+    assert "annual report" in extract_main_text(html).text
+
+
+def test_backends_agree():
+    texts = {HtmlTextExtractor(backend).extract(PAGE).text for backend in BACKENDS}
+    assert len(texts) == 1
+
+
+def test_accepts_parsed_soup():
+    bs4 = pytest.importorskip("bs4")
+    soup = bs4.BeautifulSoup(PAGE, 'html.parser')
+    result = extract_main_text(soup)
+    assert result.backend == 'bs4'
+    assert result.text == extract_main_text(PAGE).text
+
+
+def test_landing_page_of_short_blocks_keeps_non_link_text():
+    html = ("<body><h1>Acme</h1><p>Forgings since 1979</p>"
+            "<p><a href='/x'>Products</a></p></body>")
+    assert extract_main_text(html).blocks == ["Acme", "Forgings since 1979"]
+
+
+def test_limits_and_empty_input():
+    result = extract_main_text(PAGE, max_chars=20, max_blocks=2)
+    assert len(result.blocks) == 2
+    assert result.text == "About us\n\n" + ARTICLE[:10]
+    assert extract_main_text(None).text == ""
+
+
+def test_deep_nesting_does_not_recurse():
+    html = "<body>" + "<div>" * 3000 + ARTICLE + "</div>" * 3000 + "</body>"
+    assert extract_main_text(html).text == ARTICLE
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        HtmlTextExtractor("html5lib-but-misspelled")
+
+
+COMMENTED = f"""<html><head><title>Notes</title></head><body><main>
+  <p>Acme Forgings<!-- vendor name --> supplies crankshafts<?php echo 1; ?> to forty OEMs
+  <!-- trailing --> and exports precision components to twelve countries worldwide.</p>
+  <p>{SECOND}<!-- end --></p>
+</main></body></html>"""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_comment_and_pi_tails_are_kept(backend):
+    result = HtmlTextExtractor(backend).extract(COMMENTED)
+    assert result.blocks[0] == ("Acme Forgings supplies crankshafts to forty OEMs "
+                                "and exports precision components to twelve countries worldwide.")
+    assert "vendor" not in result.text and "echo" not in result.text
+
+
+def test_backends_agree_with_comments():
+    results = {HtmlTextExtractor(backend).extract(COMMENTED).text for backend in BACKENDS}
+    assert len(results) == 1
+
+
+def test_accepts_lxml_tree():
+    pytest.importorskip("lxml")
+    from src.web_scraping.text_extractor import parse_lxml
+    result = extract_main_text(parse_lxml(COMMENTED))
+    assert result.backend == 'lxml'
+    assert result.title == "Notes"
+    assert result.text == HtmlTextExtractor('lxml').extract(COMMENTED).text
+
+
+def test_parse_lxml_handles_encoding_declaration():
+    pytest.importorskip("lxml")
+    from src.web_scraping.text_extractor import parse_lxml
+    root = parse_lxml(f'<?xml version="1.0" encoding="utf-8"?><html><body><p>{ARTICLE}</p></body></html>')
+    assert extract_main_text(root).text == ARTICLE
@@ -0,0 +1,71 @@
+"""Tests for DuckDuckGo search retries"""
+import asyncio
+
+import pytest
+
+from src.web_scraping import web_search
+from src.web_scraping.endpoint_health import EndpointHealth
+from src.web_scraping.web_search import DuckDuckGoSearch
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+
+    def post(self, url, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(web_search.asyncio, 'sleep', fake_sleep)
+    return recorded
+
+
+def run_search(outcomes, monkeypatch):
+    search = DuckDuckGoSearch(health=EndpointHealth(base_delay=2.0, jitter=0.5))
+    search.session = FakeSession(outcomes)
+
+    async def no_fallback(query, max_results):
+        return []
+
+    async def session():
+        return search.session
+
+    monkeypatch.setattr(search, '_get_session', session)
+    monkeypatch.setattr(search, '_fallback_search', no_fallback)
+    return asyncio.run(search.search("acme forgings", retries=3))
+
+
+def test_errors_pause_with_jitter_between_attempts(sleeps, monkeypatch):
+    assert run_search([500, ConnectionError("reset"), 500], monkeypatch) == []
+    # No pause after the final attempt
+    assert len(sleeps) == 2
+    assert all(1.0 <= d <= 2.0 for d in sleeps)
+
+
+def test_throttle_uses_endpoint_backoff_not_retry_pause(sleeps, monkeypatch):
+    run_search([429, 429, 429], monkeypatch)
+    # Second attempt switches to the idle Lite endpoint; only the third, with
+    # both endpoints backing off, sleeps (health.wait(), not a retry pause)
+    assert len(sleeps) == 1